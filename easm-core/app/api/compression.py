@@ -0,0 +1,140 @@
+import zlib
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional - without it responses are only gzip-compressed
+    brotli = None
+
+# Streams whose chunks must reach the client as soon as they are sent
+UNCOMPRESSED_MEDIA_TYPES = ("text/event-stream",)
+# Larger chunks are compressed in the threadpool - a multi-megabyte scan status takes
+# hundreds of milliseconds to compress and would otherwise stall the event loop
+THREADPOOL_MIN_SIZE = 256 * 1024
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Best supported encoding the client accepts: br, then gzip, None for neither"""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if coding:
+            accepted[coding.strip()] = quality
+
+    for coding in ("br", "gzip"):
+        if coding == "br" and brotli is None:
+            continue
+        if accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+
+class CompressionMiddleware:
+    """
+    Brotli / gzip compression of responses of at least ``minimum_size`` bytes
+
+    Unlike Starlette's GZipMiddleware it leaves alone server-sent event streams and
+    responses that set their own Content-Encoding (e.g. the gzip findings export), and
+    flushes the compressor after every chunk of a streaming response.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http":
+            encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+            if encoding:
+                await CompressionResponder(self, encoding)(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+class CompressionResponder:
+    """Compresses one response - holds back its start message until the first body chunk"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str):
+        self.app = middleware.app
+        self.minimum_size = middleware.minimum_size
+        self.encoding = encoding
+        if encoding == "br":
+            self.compressor = brotli.Compressor(quality=middleware.brotli_quality)
+        else:
+            self.compressor = zlib.compressobj(middleware.gzip_level, wbits=31)  # wbits=31 - gzip container
+        self.send = None
+        self.start_message: Optional[Message] = None
+        self.started = False
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def compress(self, data: bytes, last: bool) -> bytes:
+        if len(data) >= THREADPOOL_MIN_SIZE:
+            return await run_in_threadpool(self._compress, data, last)
+        return self._compress(data, last)
+
+    def _compress(self, data: bytes, last: bool) -> bytes:
+        if self.encoding == "br":
+            return self.compressor.process(data) + (self.compressor.finish() if last else self.compressor.flush())
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+    async def send_compressed(self, message: Message):
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = (
+                "content-encoding" in headers
+                or headers.get("content-type", "").startswith(UNCOMPRESSED_MEDIA_TYPES)
+            )
+            return
+
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.started:
+            self.started = True
+            if self.passthrough or (not more_body and len(body) < self.minimum_size):
+                self.passthrough = True
+                await self.send(self.start_message)
+                await self.send(message)
+                return
+
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                # The compressed body differs byte for byte - a strong ETag would claim otherwise
+                headers["ETag"] = "W/" + etag
+            if more_body:
+                del headers["Content-Length"]
+                message["body"] = await self.compress(body, last=False)
+            else:
+                message["body"] = await self.compress(body, last=True)
+                headers["Content-Length"] = str(len(message["body"]))
+            await self.send(self.start_message)
+            await self.send(message)
+            return
+
+        if not self.passthrough:
+            message["body"] = await self.compress(body, last=not more_body)
+        await self.send(message)
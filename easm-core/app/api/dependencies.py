@@ -1,12 +1,18 @@
 from fastapi import Depends, Request
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..services.scan_service import ScanService
+from ..services.scan_cache import ScanStatusCache
+from ..services.finding_service import FindingService
 from ..core.settings import settings
 from ..database import get_db
 
-def get_scan_service(db: Session = Depends(get_db)) -> ScanService:
-    """Dependency to get scan service instance with database session"""
-    return ScanService(db=db)
+def get_scan_service(request: Request, db: AsyncSession = Depends(get_db)) -> ScanService:
+    """Dependency to get scan service instance with database session and scan status cache"""
+    return ScanService(db=db, cache=ScanStatusCache(getattr(request.app.state, "redis", None)))
+
+def get_finding_service(db: AsyncSession = Depends(get_db)) -> FindingService:
+    """Dependency to get finding service instance with database session"""
+    return FindingService(db=db)
 
 def get_settings():
     """Dependency to get application settings"""
@@ -15,3 +21,7 @@ def get_settings():
 async def get_redis(request: Request):
     """Dependency to get ARQ Redis connection pool from app state"""
     return request.app.state.redis
+
+async def get_scan_event_hub(request: Request):
+    """Dependency to get the scan event hub (pub/sub fan-out for SSE streams) from app state"""
+    return request.app.state.scan_events
@@ -0,0 +1,91 @@
+import asyncio
+import contextlib
+import json
+from typing import Dict, Any, AsyncIterator, List, Set
+from ..core.logging import get_logger
+from ..tasks.tasks.scan_events import SCAN_EVENTS_CHANNEL_PREFIX
+
+logger = get_logger(__name__)
+
+
+class ScanEventHub:
+    """
+    Fan-out of scan events to the SSE streams of one API process
+
+    A single Redis pub/sub connection pattern-subscribes to all scan event channels and
+    hands every event to the in-process queues watching that scan, so the number of
+    open streams costs no extra Redis connections and no database queries.
+    """
+
+    def __init__(self, redis, queue_size: int = 256):
+        self.redis = redis
+        self.queue_size = queue_size
+        self._watchers: Dict[str, Set[asyncio.Queue]] = {}
+        self._pubsub = None
+        self._task = None
+
+    async def start(self):
+        self._pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.psubscribe(SCAN_EVENTS_CHANNEL_PREFIX + "*")
+        self._task = asyncio.create_task(self._run())
+        logger.info("Scan event hub started")
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+
+    @property
+    def watcher_count(self) -> int:
+        return sum(len(queues) for queues in self._watchers.values())
+
+    @contextlib.asynccontextmanager
+    async def watch(self, scan_ids: List[str]) -> AsyncIterator[asyncio.Queue]:
+        """Queue receiving the events of the given scans while the context is open"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        for scan_id in scan_ids:
+            self._watchers.setdefault(scan_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            for scan_id in scan_ids:
+                queues = self._watchers.get(scan_id)
+                if queues is not None:
+                    queues.discard(queue)
+                    if not queues:
+                        del self._watchers[scan_id]
+
+    async def _run(self):
+        """Read pub/sub messages forever - reconnects (and re-subscribes) after Redis errors"""
+        while True:
+            try:
+                async for message in self._pubsub.listen():
+                    if message["type"] == "pmessage":
+                        self._dispatch(message["channel"], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Scan event hub lost its Redis subscription, retrying: {e}")
+                await asyncio.sleep(1)
+
+    def _dispatch(self, channel, data):
+        if isinstance(channel, bytes):
+            channel = channel.decode()
+        queues = self._watchers.get(channel[len(SCAN_EVENTS_CHANNEL_PREFIX):])
+        if not queues:
+            return
+
+        try:
+            event: Dict[str, Any] = json.loads(data)
+        except ValueError:
+            logger.warning(f"Ignoring malformed scan event on {channel}")
+            return
+
+        for queue in list(queues):
+            if queue.full():
+                # Slow client - drop its oldest event rather than block every other stream
+                queue.get_nowait()
+            queue.put_nowait(event)
@@ -0,0 +1,75 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import Literal, Optional
+from datetime import datetime
+
+from ...services.finding_service import FindingService
+from ...core.logging import get_logger
+from ..compression import negotiate_encoding
+from .scan import parse_csv_param, to_naive_utc
+
+logger = get_logger(__name__)
+
+router = APIRouter()
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",  # charset=utf-8 is appended by the response
+}
+
+@router.get("/findings/export",
+           summary="Export Findings",
+           description="""
+Stream all findings matching the filters as NDJSON (one JSON object per line) or CSV.
+
+**Filters:** `since` / `until` (finding created_at, ISO 8601), `target`, `severity`
+(comma-separated) and `scan_id`.
+
+**Compression:** send `Accept-Encoding: gzip` (e.g. `curl --compressed`) and the stream is
+gzip-compressed on the fly with `Content-Encoding: gzip`. q-values are honoured
+(`gzip;q=0` disables it) and brotli is preferred when the client accepts it.
+
+Rows are read from the database in batches and sent as they are encoded, so exports of
+any size run in constant memory.
+           """,
+           response_class=StreamingResponse,
+           responses={200: {"content": {"application/x-ndjson": {}, "text/csv": {}}}},
+           tags=["Findings"])
+async def export_findings(
+    request: Request,
+    format: Literal["ndjson", "csv"] = Query(default="ndjson", description="Export format"),
+    since: Optional[datetime] = Query(default=None, description="Findings created at or after"),
+    until: Optional[datetime] = Query(default=None, description="Findings created before"),
+    target: Optional[str] = Query(default=None, description="Only findings of this target"),
+    severity: Optional[str] = Query(default=None, description="Severities, comma-separated", example="critical,high"),
+    scan_id: Optional[str] = Query(default=None, description="Only findings of this scan")
+):
+    """Stream findings as NDJSON or CSV"""
+    severities = parse_csv_param(severity, {"critical", "high", "medium", "low", "info"}, "severity")
+    if since and until and to_naive_utc(since) >= to_naive_utc(until):
+        raise HTTPException(status_code=400, detail="since must be before until")
+
+    # Same negotiation as CompressionMiddleware - when it picks brotli the middleware
+    # compresses the plain stream, only gzip is encoded by the export itself
+    gzip = negotiate_encoding(request.headers.get("accept-encoding", "")) == "gzip"
+    headers = {"Content-Disposition": f'attachment; filename="findings.{format}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+
+    logger.info(f"Findings export started", format=format, gzip=gzip, target=target, severity=severity)
+
+    # No request-scoped session - the service opens its own for the lifetime of the stream
+    return StreamingResponse(
+        FindingService().export_findings(
+            format,
+            gzip=gzip,
+            since=to_naive_utc(since),
+            until=to_naive_utc(until),
+            target=target,
+            severity=severities,
+            scan_id=scan_id
+        ),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers=headers
+    )
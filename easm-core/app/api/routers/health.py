@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 from typing import Dict
 
 from app.services.scan_service import ScanService
 from app.schemas.health import HealthCheck
 from app.core.settings import settings
 from app.api.dependencies import get_settings
+from app.tasks.monitoring import update_redis_pool_metrics
 
 router = APIRouter()
 
@@ -16,3 +18,12 @@ async def health_check():
         service="easm-core",
         version=settings.version
     )
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Prometheus metrics endpoint"""
+    redis = getattr(request.app.state, "redis", None)
+    if redis is not None:
+        update_redis_pool_metrics(redis, "api")
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
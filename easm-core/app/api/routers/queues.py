@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from ...schemas.queue import QueueBacklog, QueueStatusResponse
+from ..dependencies import get_redis
+from ...core.settings import settings
+from ...core.logging import get_logger
+from ...tasks import SCANNER_ROUTES, get_queue_backlogs
+
+logger = get_logger(__name__)
+
+router = APIRouter()
+
+@router.get("/queues",
+           response_model=QueueStatusResponse,
+           summary="Scanner Queue Backlog",
+           description="""
+Current backlog of every scanner queue and the admission control limits.
+
+`drain_seconds` estimates how long the queued jobs take to start, from the queue depth,
+the moving average of the scanner's job run time and the number of parallel job slots.
+While a queue is `saturated`, new scans for its scanner get `429 Too Many Requests` with
+`Retry-After` (`ADMISSION_MODE=reject`) or are accepted but deferred until the backlog
+is expected to be back within the limits (`ADMISSION_MODE=defer`).
+           """,
+           tags=["Queues"])
+async def get_queue_status(redis = Depends(get_redis)):
+    """Backlog estimates of the scanner queues"""
+    try:
+        backlogs = await get_queue_backlogs(redis)
+    except Exception as e:
+        logger.error(f"Failed to read queue backlogs: {e}")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Queue state unavailable")
+
+    queue_scanners = {route["queue"]: scanner for scanner, route in SCANNER_ROUTES.items()}
+    return QueueStatusResponse(
+        admission_mode=settings.admission_mode,
+        max_queue_depth=settings.admission_max_queue_depth,
+        max_drain_seconds=settings.admission_max_drain_seconds,
+        queues=[QueueBacklog(scanner=queue_scanners[queue], **backlog) for queue, backlog in backlogs.items()]
+    )
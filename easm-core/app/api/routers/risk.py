@@ -0,0 +1,76 @@
+from arq.constants import result_key_prefix
+from arq.jobs import Job, JobStatus
+from fastapi import APIRouter, Depends, HTTPException, Path, status
+
+from ...schemas.risk import RiskRecomputeJob, RiskRecomputeSummary
+from ..dependencies import get_redis
+from ...core.logging import get_logger
+
+logger = get_logger(__name__)
+
+router = APIRouter()
+
+# Fixed job id - ARQ enqueues nothing while a job with this id is queued or running,
+# so recomputations never overlap
+RECOMPUTE_JOB_ID = "recompute-risk-scores"
+
+@router.post("/risk/recompute",
+            response_model=RiskRecomputeJob,
+            status_code=status.HTTP_202_ACCEPTED,
+            summary="Recompute All Risk Scores",
+            description="""
+Rescore every asset with the current risk rules - after a change of the risk weights,
+port or service lists.
+
+Runs as a background job on the core worker: the risk aggregates of all assets (the
+latest findings of every scanner) are scored in one vectorized pass and written back
+with bulk upserts.
+Poll `GET /risk/recompute/{job_id}` for the outcome.
+
+Only one recomputation runs at a time: while one is queued or running, this returns
+that job with its current status instead of starting another.
+            """,
+            tags=["Risk"])
+async def recompute_risk_scores(redis = Depends(get_redis)):
+    """Enqueue a whole-portfolio risk recomputation, unless one is already queued or running"""
+    try:
+        job = await redis.enqueue_job('recompute_risk_scores', _job_id=RECOMPUTE_JOB_ID, _queue_name='core')
+        if job is None:
+            previous = Job(RECOMPUTE_JOB_ID, redis, _queue_name='core', _deserializer=redis.job_deserializer)
+            job_status = await previous.status()
+            if job_status not in (JobStatus.complete, JobStatus.not_found):
+                return RiskRecomputeJob(job_id=RECOMPUTE_JOB_ID, status=job_status.value)
+            # The kept result of the previous run holds the id - a new run replaces it
+            await redis.delete(result_key_prefix + RECOMPUTE_JOB_ID)
+            job = await redis.enqueue_job('recompute_risk_scores', _job_id=RECOMPUTE_JOB_ID, _queue_name='core')
+            if job is None:
+                # Another request enqueued it in between
+                return RiskRecomputeJob(job_id=RECOMPUTE_JOB_ID, status=JobStatus.queued.value)
+    except Exception as e:
+        logger.error(f"Failed to enqueue risk recomputation: {e}")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Job queue unavailable")
+    return RiskRecomputeJob(job_id=job.job_id, status="queued")
+
+@router.get("/risk/recompute/{job_id}",
+           response_model=RiskRecomputeJob,
+           summary="Risk Recomputation Status",
+           description="Status of a risk recomputation job and, once it finished, its summary or error.",
+           tags=["Risk"])
+async def get_risk_recompute_status(
+    job_id: str = Path(..., description="Job id returned by POST /risk/recompute"),
+    redis = Depends(get_redis)
+):
+    """Status and outcome of a risk recomputation job"""
+    job = Job(job_id, redis, _queue_name='core', _deserializer=redis.job_deserializer)
+    job_status = await job.status()
+    if job_status == JobStatus.not_found:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job_status != JobStatus.complete:
+        return RiskRecomputeJob(job_id=job_id, status=job_status.value)
+
+    info = await job.result_info()
+    if info is None or info.function != 'recompute_risk_scores':
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not info.success:
+        return RiskRecomputeJob(job_id=job_id, status="failed", error=str(info.result))
+    return RiskRecomputeJob(job_id=job_id, status="complete", result=RiskRecomputeSummary(**info.result))
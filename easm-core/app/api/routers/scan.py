@@ -1,23 +1,56 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
-from typing import Dict, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from typing import Dict, Any, AsyncIterator, List, Optional
+from datetime import datetime, timezone
 import json
+import orjson
 
-from ...services.scan_service import ScanService
+from ...services.scan_service import ScanService, SCAN_STATUS_INCLUDES, blob_reference, scan_status_etag
+from ...services.finding_service import FindingService
 from ...schemas.scan import (
     ScanRequest, ScanResponse, ScanStatus,
-    NmapScanRequest, MasscanScanRequest, NucleiScanRequest, ScannerType
+    BatchScanRequest, BatchScanResponse, BatchScanItemResult,
+    NmapScanRequest, MasscanScanRequest, NucleiScanRequest, ScannerType, ScanPriority,
+    ScanSummary, ScanListResponse, ScanResults, ScanFindingsPage
 )
-from ..dependencies import get_scan_service
+from ..dependencies import get_scan_service, get_finding_service, get_redis
 from ..errors import ScanNotFoundException
 from ...core.settings import settings
 from ...core.logging import get_logger
-from ...tasks import get_redis_pool
+from ...tasks import submit_scan, submit_scans_pipelined, check_admission
+from ...tasks.tasks.scan_events import build_scan_event, publish_scan_events
 
 # Configure logging
 logger = get_logger(__name__)
 
 router = APIRouter()
 
+# Validator for a single item of a batch request (same rules as POST /scan body)
+scan_request_adapter = TypeAdapter(ScanRequest)
+
+async def admit_scans(redis, scan_counts: Dict[str, int]) -> Dict[str, int]:
+    """
+    Admission control of new scans, counted per scanner - returns each scanner's spill delay in seconds
+
+    Raises 429 with Retry-After when a scanner queue cannot take its scans (see check_admission).
+    """
+    spill_seconds = {}
+    retry_after = 0
+    for scanner, count in scan_counts.items():
+        decision = await check_admission(redis, scanner, count)
+        if not decision["admitted"]:
+            retry_after = max(retry_after, decision["retry_after"])
+        spill_seconds[scanner] = decision["spill_seconds"]
+
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Scanner queue backlog is full, retry in {retry_after} seconds",
+            headers={"Retry-After": str(retry_after)}
+        )
+    return spill_seconds
+
 @router.post("/scan", 
             response_model=ScanResponse,
             summary="Create New Scan", 
@@ -73,11 +106,17 @@ Create a new security scan for a target using specified scanner.
   }
 }
 ```
+
+**Duplicate requests:** a request with the same target, scanner and options as a scan that
+is queued, running or completed in the last `SCAN_COALESCE_FRESH_SECONDS` (15 minutes by
+default) starts no new scan - the response carries that scan's `scan_id` and status with
+`coalesced: true`. Set `"force": true` to always start a new scan.
             """,
             tags=["Scanning"])
 async def create_scan(
     request: ScanRequest,
-    scan_service: ScanService = Depends(get_scan_service)
+    scan_service: ScanService = Depends(get_scan_service),
+    redis = Depends(get_redis)
 ):
     """
     Create a new scan request (supports all scanner types)
@@ -89,36 +128,53 @@ async def create_scan(
             "Creating scan request",
             extra={"target": request.target, "scanner": request.scanner}
         )
+        options = request.options.dict() if hasattr(request.options, "dict") else request.options
+
+        # Admission control applies to new scans only - a coalesced request enqueues nothing
+        if not request.force:
+            existing = await scan_service.find_coalesced_scan(request.target, request.scanner, options)
+            if existing:
+                return ScanResponse(**existing)
+        spill_seconds = (await admit_scans(redis, {request.scanner: 1}))[request.scanner]
         
         # Use service layer for business logic
         result = await scan_service.create_scan(
             target=request.target,
             scanner=request.scanner,
-            options=request.options.dict() if hasattr(request.options, "dict") else request.options
+            options=options,
+            force=request.force
         )
+        if result["coalesced"]:
+            # Identical scan already queued, running or fresh - nothing to enqueue
+            return ScanResponse(**result)
         
-        # Create Redis connection and enqueue job
-        redis = await get_redis_pool()
+        # Enqueue job using the app-level Redis pool (scanner queue directly or scan_asset on 'core')
         payload = {
             "target": request.target,
             "scanner": request.scanner,
-            "options": request.options.dict() if hasattr(request.options, "dict") else request.options
+            "options": options,
+            "priority": (request.priority or ScanPriority.NORMAL).value
         }
-        logger.info(f"Enqueueing job scan_asset with scan_id={result['scan_id']}, payload={payload}")
-        job = await redis.enqueue_job(
-            'scan_asset',
-            result["scan_id"],
-            payload,
-            _queue_name='core'  # Upewnij się, że zadanie trafia do kolejki 'core'
-        )
+        if spill_seconds:
+            payload["spill_seconds"] = spill_seconds
+            result["deferred_seconds"] = spill_seconds
+        logger.info(f"Enqueueing scan with scan_id={result['scan_id']}, payload={payload}")
+        try:
+            job_id = await submit_scan(redis, result["scan_id"], payload)
+        except Exception:
+            # Never leave it 'queued' - identical requests would be coalesced into a scan that never runs
+            await scan_service.fail_scans([result["scan_id"]], "Failed to enqueue scan job")
+            raise
         
         logger.info(
-            f"Scan job queued with ID: {job.job_id}",
-            extra={"scan_id": result["scan_id"], "job_id": job.job_id}
+            f"Scan job queued with ID: {job_id}",
+            extra={"scan_id": result["scan_id"], "job_id": job_id}
         )
         
         return ScanResponse(**result)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to create scan: {str(e)}")
         raise HTTPException(
@@ -126,8 +182,145 @@ async def create_scan(
             detail=f"Failed to create scan: {str(e)}"
         )
 
+@router.post("/scan/batch",
+            response_model=BatchScanResponse,
+            summary="Create Scans in Batch",
+            description="""
+Create many scans in a single call - intended for onboarding large numbers of targets.
+
+All valid items are written with one bulk INSERT and jobs are enqueued with one
+Redis pipeline per queue. Each item is validated separately: results are returned in request
+order, with a `scan_id` for queued items and an `error` for items that failed.
+
+Batch items default to `low` priority, so interactive scans overtake a large sweep;
+set `priority` on an item to override.
+
+**Example:**
+```json
+{
+  "scans": [
+    {"target": "scanme.nmap.org", "scanner": "nmap", "options": {"ports": "80,443"}},
+    {"target": "192.168.1.0/24", "scanner": "masscan", "options": {"ports": "1-1000"}}
+  ]
+}
+```
+            """,
+            tags=["Scanning"])
+async def create_scan_batch(
+    request: BatchScanRequest,
+    scan_service: ScanService = Depends(get_scan_service),
+    redis = Depends(get_redis)
+):
+    """Create a batch of scans and return per-item scan_id or error"""
+    if len(request.scans) > settings.scan_batch_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch too large: {len(request.scans)} items (max {settings.scan_batch_max_items})"
+        )
+
+    results = [None] * len(request.scans)
+    valid_items = []  # (index, {target, scanner, options}, priority)
+
+    # Validate every item on its own so a single bad target does not fail the batch
+    for index, item in enumerate(request.scans):
+        try:
+            scan_request = scan_request_adapter.validate_python(item)
+        except ValidationError as e:
+            # Skip "wrong scanner literal" noise from the other members of the ScanRequest union
+            errors = [error for error in e.errors() if error["type"] != "literal_error"] or e.errors()
+            messages = list(dict.fromkeys(error["msg"] for error in errors))
+            results[index] = BatchScanItemResult(index=index, status="failed", error="; ".join(messages))
+            continue
+
+        valid_items.append((index, {
+            "target": scan_request.target,
+            "scanner": scan_request.scanner,
+            "options": scan_request.options.dict() if hasattr(scan_request.options, "dict") else scan_request.options,
+            "force": scan_request.force
+        }, (scan_request.priority or ScanPriority.LOW).value))
+
+    try:
+        logger.info(f"Creating scan batch - items: {len(request.scans)}, valid: {len(valid_items)}")
+
+        # Only scans that will be enqueued count against admission - coalesced items do not.
+        # The whole batch is refused when any of its scanner queues is saturated
+        scan_counts = await scan_service.count_new_scans([item for _, item, _ in valid_items])
+        spill_seconds = await admit_scans(redis, scan_counts)
+
+        created = await scan_service.create_scans_batch([item for _, item, _ in valid_items])
+
+        # Coalesced items reuse an existing scan - only new scans are enqueued
+        new_scans = [
+            (index, scan, priority)
+            for (index, _, priority), scan in zip(valid_items, created)
+            if not scan["coalesced"]
+        ]
+        try:
+            job_ids = await submit_scans_pipelined(redis, [
+                (scan["scan_id"], {
+                    "target": scan["target"],
+                    "scanner": scan["scanner"],
+                    "options": scan["options"],
+                    "priority": priority,
+                    "spill_seconds": spill_seconds.get(scan["scanner"]) or None
+                })
+                for _, scan, priority in new_scans
+            ])
+        except Exception as e:
+            # The scans are already stored - they are failed below instead of staying 'queued'
+            logger.error(f"Failed to enqueue scan batch: {str(e)}")
+            job_ids = [None] * len(new_scans)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to create scan batch: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to create scan batch: {str(e)}"
+        )
+
+    for (index, _, _), scan in zip(valid_items, created):
+        if scan["coalesced"]:
+            results[index] = BatchScanItemResult(
+                index=index, scan_id=scan["scan_id"], status=scan["status"], coalesced=True
+            )
+
+    not_enqueued = []
+    for (index, scan, _), job_id in zip(new_scans, job_ids):
+        if job_id is None:
+            not_enqueued.append(scan["scan_id"])
+            results[index] = BatchScanItemResult(
+                index=index, scan_id=scan["scan_id"], status="failed", error="Failed to enqueue scan job"
+            )
+        else:
+            results[index] = BatchScanItemResult(
+                index=index, scan_id=scan["scan_id"], status="queued",
+                deferred_seconds=spill_seconds.get(scan["scanner"]) or None
+            )
+
+    # Scans whose job never reached the queue would stay 'queued' forever
+    if not_enqueued:
+        await scan_service.fail_scans(not_enqueued, "Failed to enqueue scan job")
+        await publish_scan_events(redis, [
+            build_scan_event(scan_id, "failed", error="Failed to enqueue scan job") for scan_id in not_enqueued
+        ])
+
+    queued = sum(1 for result in results if result.status != "failed")
+    coalesced = sum(1 for result in results if result.coalesced)
+    logger.info(f"Scan batch queued - queued: {queued}, coalesced: {coalesced}, failed: {len(results) - queued}")
+
+    return BatchScanResponse(
+        total=len(results),
+        queued=queued,
+        failed=len(results) - queued,
+        coalesced=coalesced,
+        results=results
+    )
+
 @router.get("/scan/{scan_id}", 
            response_model=ScanStatus,
+           response_model_exclude_unset=True,
            summary="Get Scan Results",
            description="""
 Get comprehensive scan status and results by scan ID.
@@ -146,17 +339,217 @@ Get comprehensive scan status and results by scan ID.
 - `failed`: Scan encountered an error
 
 Use the scan_id returned from the POST /scan endpoint to track your scan progress.
+
+**Polling:** responses carry an `ETag`. Send it back in `If-None-Match` to get an
+empty `304 Not Modified` while the scan has not changed.
+
+**Smaller responses:**
+- `include=` lists the heavy parts to return: `results`, `findings` and `risk_score`.
+  All three are returned by default; `include=` with an empty value returns none of them.
+  Parts left out are not loaded from the database at all.
+- `fields=` returns only the given top-level fields, e.g. `fields=status,progress` for a
+  status badge.
+- The full raw results and paginated findings are available as sub-resources:
+  `GET /scan/{scan_id}/results` and `GET /scan/{scan_id}/findings`.
            """,
+           responses={304: {"description": "Scan unchanged since the ETag sent in If-None-Match"}},
            tags=["Scanning"])
 async def get_scan_status(
+    request: Request,
     scan_id: str = Path(..., description="Unique scan identifier returned from scan creation", example="12345678-1234-5678-9abc-123456789abc"), 
+    include: Optional[str] = Query(default=None, description="Heavy parts to return: results, findings, risk_score (comma-separated, default all)"),
+    fields: Optional[str] = Query(default=None, description="Only return these top-level fields (comma-separated)", example="status,progress"),
     scan_service: ScanService = Depends(get_scan_service)
 ):
     """Get detailed scan status, progress, and results by scan_id"""
-    result = await scan_service.get_scan_status(scan_id)
+    includes = parse_csv_param(include, SCAN_STATUS_INCLUDES, "include")
+    field_names = parse_csv_param(fields, ScanStatus.model_fields, "fields")
+    if field_names is not None and includes is None:
+        # Only load the heavy parts the projection keeps
+        includes = [name for name in SCAN_STATUS_INCLUDES if name in field_names]
+    
+    # Version check first - finished scans are versioned by their status cache entry (no
+    # database access), others by a primary key lookup; unchanged scans get an empty 304
+    result = await scan_service.get_cached_scan_status(scan_id, include=includes)
+    version = result.get("version") if result else None
+    if version is None:
+        version = await scan_service.get_scan_version(scan_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Scan not found")
+    
+    variant = f"{','.join(sorted(includes)) if includes is not None else '*'};{','.join(sorted(field_names)) if field_names is not None else '*'}"
+    etag = scan_status_etag(scan_id, version, variant)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    if result is None:
+        result = await scan_service.get_scan_status(scan_id, include=includes)
+    if not result:
+        raise HTTPException(status_code=404, detail="Scan not found")
+    
+    # The service builds the status from stored rows - returning it directly skips validating
+    # (twice) and re-encoding megabytes of results and findings on the way out
+    status_data = {name: result[name] for name in ScanStatus.model_fields if name in result}
+    if field_names is not None:
+        status_data = {name: status_data[name] for name in ["scan_id", *field_names] if name in status_data}
+    return ORJSONResponse(content=status_data, headers=headers)
+
+def parse_csv_param(value: Optional[str], allowed, name: str) -> Optional[List[str]]:
+    """Split a comma-separated query parameter, None if it was not given; 400 for unknown names"""
+    if value is None:
+        return None
+    names = [part.strip() for part in value.split(",") if part.strip()]
+    unknown = [part for part in names if part not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown {name}: {', '.join(unknown)}")
+    return names
+
+@router.get("/scan/{scan_id}/results",
+           response_model=ScanResults,
+           summary="Get Raw Scan Results",
+           description="""
+Raw results document reported by the scanner, without findings or risk score.
+
+Large documents are kept compressed in the blob store and streamed from there as they
+are decompressed.
+           """,
+           tags=["Scanning"])
+async def get_scan_results(
+    scan_id: str = Path(..., description="Unique scan identifier"),
+    scan_service: ScanService = Depends(get_scan_service)
+):
+    """Get the raw results of a scan"""
+    result = await scan_service.get_scan_results(scan_id)
     if not result:
         raise HTTPException(status_code=404, detail="Scan not found")
-    return ScanStatus(**result)
+
+    reference = blob_reference(result["results"])
+    if reference is None:
+        return ScanResults(**result)
+
+    chunks = scan_service.stream_results(reference)
+    try:
+        # Read ahead so a missing blob is an error response, not a truncated body
+        first_chunk = await chunks.__anext__()
+    except (KeyError, StopAsyncIteration):
+        logger.error(f"Scan results missing from the blob store", scan_id=scan_id, blob=reference["key"])
+        raise HTTPException(status_code=500, detail="Scan results are missing from the blob store")
+
+    return StreamingResponse(
+        results_document_stream(result, first_chunk, chunks),
+        media_type="application/json"
+    )
+
+async def results_document_stream(result: Dict[str, Any], first_chunk: bytes, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """ScanResults JSON around a results document streamed from the blob store"""
+    envelope = orjson.dumps({"scan_id": result["scan_id"], "status": result["status"]})
+    yield envelope[:-1] + b',"results":' + first_chunk
+    async for chunk in chunks:
+        yield chunk
+    yield b"}"
+
+@router.get("/scan/{scan_id}/findings",
+           response_model=ScanFindingsPage,
+           summary="Get Scan Findings",
+           description="""
+Findings of a scan, one page at a time. Filter them with `severity` and `finding_type`
+(comma-separated). Pass `next_cursor` as `cursor` to get the next page.
+           """,
+           tags=["Scanning"])
+async def get_scan_findings(
+    scan_id: str = Path(..., description="Unique scan identifier"),
+    severity: Optional[str] = Query(default=None, description="Severities, comma-separated", example="critical,high"),
+    finding_type: Optional[str] = Query(default=None, description="Finding types, comma-separated", example="vulnerability"),
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page"),
+    limit: int = Query(default=100, ge=1, le=1000, description="Page size"),
+    scan_service: ScanService = Depends(get_scan_service),
+    finding_service: FindingService = Depends(get_finding_service)
+):
+    """Get one page of a scan's findings"""
+    if not await scan_service.get_scan_states([scan_id]):
+        raise HTTPException(status_code=404, detail="Scan not found")
+    
+    page = await finding_service.get_scan_findings(
+        scan_id,
+        severity=parse_csv_param(severity, {"critical", "high", "medium", "low", "info"}, "severity"),
+        finding_type=[part.strip() for part in finding_type.split(",") if part.strip()] if finding_type else None,
+        cursor=cursor,
+        limit=limit
+    )
+    return ScanFindingsPage(scan_id=scan_id, items=page["items"], limit=limit, next_cursor=page["next_cursor"])
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches the ETag (weak comparison, as RFC 9110 requires for it)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+SCAN_LIST_INCLUDES = {"options", "results"}
+
+@router.get("/scans",
+           response_model=ScanListResponse,
+           summary="List Scans",
+           description="""
+List scans, newest first, with optional filters.
+
+**Filters:** `target` (exact match), `scanner`, `status` (comma-separated for several, e.g.
+`queued,running`), and a `created_after` / `created_before` range.
+
+**Pagination:** pass the `next_cursor` of a response as `cursor` to get the next page; it
+is `null` on the last page. Pages cost the same however deep you go.
+
+**Large fields:** `options` and `results` are omitted unless requested with
+`include=options,results`. Results offloaded to the blob store come back as their stored
+summary with a `blob_ref` - fetch the full document from `/scan/{scan_id}/results`.
+           """,
+           tags=["Scanning"])
+async def list_scans(
+    target: Optional[str] = Query(default=None, description="Only scans of this target"),
+    scanner: Optional[ScannerType] = Query(default=None, description="Only scans of this scanner"),
+    status_filter: Optional[str] = Query(default=None, alias="status", description="Scan status(es), comma-separated", example="queued,running"),
+    created_after: Optional[datetime] = Query(default=None, description="Created at or after (ISO 8601)"),
+    created_before: Optional[datetime] = Query(default=None, description="Created before (ISO 8601)"),
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page"),
+    limit: int = Query(default=50, ge=1, le=500, description="Page size"),
+    include: Optional[str] = Query(default=None, description="Extra fields: options, results (comma-separated)"),
+    scan_service: ScanService = Depends(get_scan_service)
+):
+    """List scans with filters and keyset pagination"""
+    includes = {part.strip() for part in include.split(",") if part.strip()} if include else set()
+    unknown = includes - SCAN_LIST_INCLUDES
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown include: {', '.join(sorted(unknown))}")
+    
+    statuses = [part.strip() for part in status_filter.split(",") if part.strip()] if status_filter else None
+    
+    try:
+        page = await scan_service.list_scans(
+            target=target,
+            scanner=scanner.value if scanner else None,
+            statuses=statuses,
+            created_after=to_naive_utc(created_after),
+            created_before=to_naive_utc(created_before),
+            cursor=cursor,
+            limit=limit,
+            include=includes
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return ScanListResponse(
+        items=[ScanSummary(**item) for item in page["items"]],
+        limit=limit,
+        next_cursor=page["next_cursor"]
+    )
+
+def to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Scan timestamps are stored as naive UTC - convert timezone-aware query values"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
 
 @router.post("/scan/quick",
             response_model=ScanResponse,
@@ -178,7 +571,10 @@ async def create_quick_scan(
     rate: Optional[int] = Query(default=None, description="Scan rate for masscan", example=1000),
     templates: Optional[str] = Query(default=None, description="Nuclei templates (comma-separated)", example="tech-detect,cves"),
     severity: Optional[str] = Query(default=None, description="Nuclei severity levels (comma-separated)", example="high,critical"),
-    scan_service: ScanService = Depends(get_scan_service)
+    priority: ScanPriority = Query(default=ScanPriority.HIGH, description="Queue priority - quick scans are interactive and default to high"),
+    force: bool = Query(default=False, description="Start a new scan even if an identical one is queued, running or recently completed"),
+    scan_service: ScanService = Depends(get_scan_service),
+    redis = Depends(get_redis)
 ):
     """
     Create a new scan using query parameters instead of JSON body
@@ -208,33 +604,48 @@ async def create_quick_scan(
                 options["severity"] = severity.split(",")
         
         logger.info(f"Creating quick scan - target: {target}, scanner: {scanner}, options: {options}")
+
+        # Admission control applies to new scans only - a coalesced request enqueues nothing
+        if not force:
+            existing = await scan_service.find_coalesced_scan(target, scanner, options)
+            if existing:
+                return ScanResponse(**existing)
+        spill_seconds = (await admit_scans(redis, {scanner: 1}))[scanner]
         
         # Use service layer for business logic
         result = await scan_service.create_scan(
             target=target,
             scanner=scanner,
-            options=options
+            options=options,
+            force=force
         )
+        if result["coalesced"]:
+            return ScanResponse(**result)
         
-        # Create Redis connection and enqueue job
-        redis = await get_redis_pool()
+        # Enqueue job using the app-level Redis pool
         payload = {
             "target": target,
             "scanner": scanner,
-            "options": options
+            "options": options,
+            "priority": priority.value
         }
+        if spill_seconds:
+            payload["spill_seconds"] = spill_seconds
+            result["deferred_seconds"] = spill_seconds
         
-        job = await redis.enqueue_job(
-            'scan_asset',
-            result["scan_id"],
-            payload,
-            _queue_name='core'
-        )
+        try:
+            job_id = await submit_scan(redis, result["scan_id"], payload)
+        except Exception:
+            # Never leave it 'queued' - identical requests would be coalesced into a scan that never runs
+            await scan_service.fail_scans([result["scan_id"]], "Failed to enqueue scan job")
+            raise
         
-        logger.info(f"Quick scan job queued with ID: {job.job_id}", extra={"scan_id": result["scan_id"], "job_id": job.job_id})
+        logger.info(f"Quick scan job queued with ID: {job_id}", extra={"scan_id": result["scan_id"], "job_id": job_id})
         
         return ScanResponse(**result)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to create quick scan: {str(e)}")
         raise HTTPException(
@@ -0,0 +1,152 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Request
+from fastapi.responses import StreamingResponse
+from typing import Dict, Any, AsyncIterator, List, Optional
+import asyncio
+import json
+
+from ...services.scan_service import ScanService
+from ..dependencies import get_redis, get_scan_event_hub
+from ..event_hub import ScanEventHub
+from ...core.settings import settings
+from ...core.logging import get_logger
+from ...tasks.tasks.scan_events import TERMINAL_EVENTS, build_scan_event, get_last_scan_events
+
+logger = get_logger(__name__)
+
+router = APIRouter()
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",  # stop nginx from buffering the stream
+}
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Encode a scan event as a server-sent event"""
+    return f"event: {event['event']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+async def initial_scan_events(redis, scan_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Current state of each scan as an event - the last published event from Redis
+
+    Only scans without a recorded event (older than SCAN_EVENTS_LAST_TTL) are looked up
+    in the database, with one query in a short-lived session - the stream itself must
+    not hold a database connection. Scans that do not exist map to None.
+    """
+    events = await get_last_scan_events(redis, scan_ids)
+    missing = [scan_id for scan_id, event in events.items() if event is None]
+    if missing:
+        states = await ScanService().get_scan_states(missing)
+        for scan_id, state in states.items():
+            # Database state of a scan that published no recent event
+            events[scan_id] = build_scan_event(scan_id, "state", **state)
+    return events
+
+async def scan_event_stream(
+    request: Request,
+    hub: ScanEventHub,
+    redis,
+    scan_ids: List[str],
+    initial: Dict[str, Optional[Dict[str, Any]]]
+) -> AsyncIterator[str]:
+    """SSE stream of the given scans - ends once every scan reached completed/failed"""
+    pending = set(scan_ids)
+
+    async with hub.watch(scan_ids) as queue:
+        yield "retry: 3000\n\n"
+
+        # Events published between the initial lookup and the subscription are only in Redis
+        latest = await get_last_scan_events(redis, scan_ids)
+
+        for scan_id in scan_ids:
+            event = latest.get(scan_id) or initial.get(scan_id)
+            if event is None:
+                yield format_sse(build_scan_event(scan_id, "not_found", status=None))
+                pending.discard(scan_id)
+                continue
+            yield format_sse(event)
+            if event.get("status") in TERMINAL_EVENTS:
+                pending.discard(scan_id)
+
+        while pending:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=settings.scan_events_heartbeat_seconds)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                # Comment line - keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+                continue
+
+            yield format_sse(event)
+            if event["event"] in TERMINAL_EVENTS:
+                pending.discard(event["scan_id"])
+
+@router.get("/scan/{scan_id}/events",
+           summary="Stream Scan Events",
+           description="""
+Server-Sent Events stream of one scan's progress - use it instead of polling `GET /scan/{scan_id}`.
+
+The first event is the scan's current state. It is followed by `queued`, `started`,
+`progress`, `findings`, `completed` and `failed` events as they happen. Each event's
+`data` is JSON with `scan_id`, `event`, `status`, `timestamp` and event-specific
+fields such as `progress` and `finding_count`. The stream closes after `completed` or
+`failed`. Fetch `GET /scan/{scan_id}` then for the full results.
+           """,
+           response_class=StreamingResponse,
+           responses={200: {"content": {"text/event-stream": {}}}},
+           tags=["Scanning"])
+async def stream_scan_events(
+    request: Request,
+    scan_id: str = Path(..., description="Unique scan identifier"),
+    redis = Depends(get_redis),
+    hub: ScanEventHub = Depends(get_scan_event_hub)
+):
+    """Stream events of a single scan"""
+    initial = await initial_scan_events(redis, [scan_id])
+    if initial.get(scan_id) is None:
+        raise HTTPException(status_code=404, detail="Scan not found")
+
+    return StreamingResponse(
+        scan_event_stream(request, hub, redis, [scan_id], initial),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+@router.get("/scans/events",
+           summary="Stream Events of Many Scans",
+           description="""
+One Server-Sent Events stream for many scans. Pass them as repeated or
+comma-separated `scan_id` parameters, e.g. `?scan_id=a,b&scan_id=c`.
+
+Events have the same format as in `GET /scan/{scan_id}/events`. Scans that do not
+exist get a single `not_found` event. The stream closes when every scan has completed
+or failed.
+           """,
+           response_class=StreamingResponse,
+           responses={200: {"content": {"text/event-stream": {}}}},
+           tags=["Scanning"])
+async def stream_scans_events(
+    request: Request,
+    scan_id: List[str] = Query(..., description="Scan identifiers (repeated or comma-separated)"),
+    redis = Depends(get_redis),
+    hub: ScanEventHub = Depends(get_scan_event_hub)
+):
+    """Stream events of many scans over one connection"""
+    scan_ids = list(dict.fromkeys(
+        part.strip() for value in scan_id for part in value.split(",") if part.strip()
+    ))
+    if not scan_ids:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="No scan_id given")
+    if len(scan_ids) > settings.scan_events_max_scans:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {settings.scan_events_max_scans} scans per stream"
+        )
+
+    initial = await initial_scan_events(redis, scan_ids)
+
+    return StreamingResponse(
+        scan_event_stream(request, hub, redis, scan_ids, initial),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
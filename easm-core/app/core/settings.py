@@ -15,6 +15,8 @@ class Settings(BaseSettings):
     
     # Redis (for ARQ)
     redis_url: str = os.getenv("REDIS_URL", "redis://redis:6379/0")
+    redis_max_connections: int = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+    redis_pool_timeout: int = int(os.getenv("REDIS_POOL_TIMEOUT", "10"))  # seconds to wait for a free connection
     
     # Services
     core_url: str = os.getenv("CORE_URL", "http://core:8001")
@@ -33,9 +35,67 @@ class Settings(BaseSettings):
     # Scanner Configuration
     nmap_timeout: int = int(os.getenv("NMAP_TIMEOUT", "300"))
     scan_queue_ttl: int = int(os.getenv("SCAN_QUEUE_TTL", "3600"))
+    scan_batch_max_items: int = int(os.getenv("SCAN_BATCH_MAX_ITEMS", "10000"))
+    # Identical scan requests (target, scanner, canonical options) reuse a queued/running scan created in the
+    # last SCAN_COALESCE_ACTIVE_MAX_AGE seconds or one completed in the last SCAN_COALESCE_FRESH_SECONDS
+    scan_coalescing: bool = os.getenv("SCAN_COALESCING", "true").lower() == "true"
+    scan_coalesce_fresh_seconds: int = int(os.getenv("SCAN_COALESCE_FRESH_SECONDS", "900"))
+    scan_coalesce_active_max_age: int = int(os.getenv("SCAN_COALESCE_ACTIVE_MAX_AGE", "21600"))
+    # Admission control of new scans by scanner queue backlog - reject (429 + Retry-After), defer
+    # (enqueue deferred until the backlog is expected to be within limits) or off
+    admission_mode: str = os.getenv("ADMISSION_MODE", "reject")
+    admission_max_queue_depth: int = int(os.getenv("ADMISSION_MAX_QUEUE_DEPTH", "5000"))
+    admission_max_drain_seconds: int = int(os.getenv("ADMISSION_MAX_DRAIN_SECONDS", "7200"))
+    admission_max_spill_seconds: int = int(os.getenv("ADMISSION_MAX_SPILL_SECONDS", "86400"))
+    admission_max_retry_after: int = int(os.getenv("ADMISSION_MAX_RETRY_AFTER", "3600"))
+    # Parallel jobs per scanner queue across all its workers (workers x *_MAX_JOBS)
+    admission_queue_slots: str = os.getenv("ADMISSION_QUEUE_SLOTS", "scanner-nmap=4,scanner-masscan=2,scanner-nuclei=4")
+    admission_default_job_seconds: int = int(os.getenv("ADMISSION_DEFAULT_JOB_SECONDS", "120"))  # until durations are measured
+    admission_duration_ewma_alpha: float = float(os.getenv("ADMISSION_DURATION_EWMA_ALPHA", "0.1"))
+    # direct: API enqueues straight to scanner queues, core: every scan goes through scan_asset on the core queue
+    scan_dispatch_mode: str = os.getenv("SCAN_DISPATCH_MODE", "direct")
+    # Queue head start per priority in seconds - a low job waits at most this long behind newer high jobs
+    scan_priority_boost_high: int = int(os.getenv("SCAN_PRIORITY_BOOST_HIGH", "900"))
+    scan_priority_boost_normal: int = int(os.getenv("SCAN_PRIORITY_BOOST_NORMAL", "120"))
+    masscan_max_shards: int = int(os.getenv("MASSCAN_MAX_SHARDS", "16"))
+    masscan_shard_addresses: int = int(os.getenv("MASSCAN_SHARD_ADDRESSES", "256"))  # split networks larger than this
+    masscan_shard_ports: int = int(os.getenv("MASSCAN_SHARD_PORTS", "20000"))  # split single hosts scanning more ports
+    # Core worker writes scan completions/failures in batches of up to N results or T ms (N <= 1 disables batching)
+    result_batch_max_items: int = int(os.getenv("RESULT_BATCH_MAX_ITEMS", "50"))
+    result_batch_max_wait_ms: int = int(os.getenv("RESULT_BATCH_MAX_WAIT_MS", "200"))
+    core_worker_max_jobs: int = int(os.getenv("CORE_WORKER_MAX_JOBS", "100"))
+    # GET /scan/{scan_id} cache of completed/failed scans (TTL 0 disables it)
+    scan_status_cache_ttl: int = int(os.getenv("SCAN_STATUS_CACHE_TTL", "300"))
+    scan_status_cache_max_entries: int = int(os.getenv("SCAN_STATUS_CACHE_MAX_ENTRIES", "10000"))
+    # Larger statuses are not cached - the cache stays below max_entries * max_entry_bytes
+    scan_status_cache_max_entry_bytes: int = int(os.getenv("SCAN_STATUS_CACHE_MAX_ENTRY_BYTES", "65536"))
+    # Server-sent scan event streams
+    scan_events_heartbeat_seconds: int = int(os.getenv("SCAN_EVENTS_HEARTBEAT_SECONDS", "15"))
+    scan_events_last_ttl: int = int(os.getenv("SCAN_EVENTS_LAST_TTL", "86400"))
+    scan_events_max_scans: int = int(os.getenv("SCAN_EVENTS_MAX_SCANS", "500"))  # scan_ids per multiplexed stream
+    scan_events_queue_size: int = int(os.getenv("SCAN_EVENTS_QUEUE_SIZE", "256"))  # buffered events per stream
+    # Findings export - rows fetched per server-side cursor round trip
+    findings_export_batch_size: int = int(os.getenv("FINDINGS_EXPORT_BATCH_SIZE", "1000"))
+    # Scan results of at least BLOB_STORE_MIN_BYTES (as JSON) are kept zstd-compressed in a content-addressed
+    # blob store - the scan row only keeps a summary and the blob reference. Backends: local, s3 (boto3) or off
+    blob_store_backend: str = os.getenv("BLOB_STORE_BACKEND", "local")
+    blob_store_min_bytes: int = int(os.getenv("BLOB_STORE_MIN_BYTES", "65536"))
+    blob_store_zstd_level: int = int(os.getenv("BLOB_STORE_ZSTD_LEVEL", "3"))
+    blob_store_path: str = os.getenv("BLOB_STORE_PATH", "/data/blobs")  # shared by the API and the worker
+    blob_store_s3_bucket: str = os.getenv("BLOB_STORE_S3_BUCKET", "")
+    blob_store_s3_prefix: str = os.getenv("BLOB_STORE_S3_PREFIX", "scan-results/")
+    blob_store_s3_endpoint_url: Optional[str] = os.getenv("BLOB_STORE_S3_ENDPOINT_URL") or None  # MinIO, Ceph...
+    # API response compression (br if the Brotli package is installed, else gzip) of bodies of at least N bytes
+    response_compression_min_size: int = int(os.getenv("RESPONSE_COMPRESSION_MIN_SIZE", "1024"))
+    response_gzip_level: int = int(os.getenv("RESPONSE_GZIP_LEVEL", "6"))
+    response_brotli_quality: int = int(os.getenv("RESPONSE_BROTLI_QUALITY", "4"))
     
     # Risk Engine
     risk_score_ttl: int = int(os.getenv("RISK_SCORE_TTL", "86400"))
+    # Whole-portfolio recomputation - findings rows per cursor round trip, scores per bulk upsert
+    risk_recompute_fetch_size: int = int(os.getenv("RISK_RECOMPUTE_FETCH_SIZE", "20000"))
+    risk_recompute_write_batch: int = int(os.getenv("RISK_RECOMPUTE_WRITE_BATCH", "5000"))
+    risk_recompute_timeout: int = int(os.getenv("RISK_RECOMPUTE_TIMEOUT", "3600"))  # seconds, ARQ job timeout
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,95 @@
+"""Unique asset and risk score targets
+
+Dedupes assets and risk_scores on target (keeping the most recently updated row),
+switches assets.asset_metadata to JSONB and replaces the plain target indexes with
+unique ones, so completions can use INSERT ... ON CONFLICT (target) DO UPDATE.
+
+Revision ID: a3c1e5f7b902
+Revises: 69fdeff18670
+Create Date: 2026-10-17 09:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3c1e5f7b902'
+down_revision = '69fdeff18670'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keep the newest row per target, merging metadata of the dropped duplicates
+    op.execute("""
+        ALTER TABLE assets
+        ALTER COLUMN asset_metadata TYPE JSONB USING asset_metadata::jsonb
+    """)
+    op.execute("""
+        WITH ranked AS (
+            SELECT id, target,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY target
+                       ORDER BY updated_at DESC NULLS LAST, created_at DESC NULLS LAST, id
+                   ) AS rn
+            FROM assets
+        ),
+        merged AS (
+            SELECT a.target,
+                   jsonb_object_agg(kv.key, kv.value ORDER BY r.rn DESC) AS metadata
+            FROM assets a
+            JOIN ranked r ON r.id = a.id
+            CROSS JOIN LATERAL jsonb_each(COALESCE(a.asset_metadata, '{}'::jsonb)) AS kv
+            GROUP BY a.target
+        )
+        UPDATE assets a
+        SET asset_metadata = m.metadata
+        FROM ranked r, merged m
+        WHERE r.id = a.id AND r.rn = 1 AND m.target = a.target
+          AND EXISTS (SELECT 1 FROM ranked d WHERE d.target = a.target AND d.rn > 1)
+    """)
+    op.execute("""
+        DELETE FROM assets
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY target
+                    ORDER BY updated_at DESC NULLS LAST, created_at DESC NULLS LAST, id
+                ) AS rn
+                FROM assets
+            ) ranked
+            WHERE rn > 1
+        )
+    """)
+    op.execute("""
+        DELETE FROM risk_scores
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY target
+                    ORDER BY calculated_at DESC NULLS LAST, id
+                ) AS rn
+                FROM risk_scores
+            ) ranked
+            WHERE rn > 1
+        )
+    """)
+
+    # Tables may have been created by create_all with either index variant
+    op.execute("DROP INDEX IF EXISTS ix_assets_target")
+    op.create_index('ix_assets_target', 'assets', ['target'], unique=True)
+    op.execute("DROP INDEX IF EXISTS ix_risk_scores_target")
+    op.create_index('ix_risk_scores_target', 'risk_scores', ['target'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_risk_scores_target', table_name='risk_scores')
+    op.create_index('ix_risk_scores_target', 'risk_scores', ['target'], unique=False)
+    op.drop_index('ix_assets_target', table_name='assets')
+    op.create_index('ix_assets_target', 'assets', ['target'], unique=False)
+    op.alter_column(
+        'assets', 'asset_metadata',
+        type_=sa.JSON(),
+        postgresql_using='asset_metadata::json'
+    )
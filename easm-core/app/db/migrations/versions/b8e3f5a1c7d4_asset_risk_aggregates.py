@@ -0,0 +1,79 @@
+"""Asset risk aggregates
+
+asset_risk_aggregates keeps, per target, a JSONB slice for every scanner with the open
+ports, services and vulnerability severity counts of its latest completed scan. Scan
+completions merge their own slice with || and score the asset from all slices, so a
+scanner with no hits no longer wipes out the risk found by another one.
+
+Backfilled from the latest completed scan of each (target, scanner). Risk scores are
+recalculated by the next scan of each target or all at once with POST /risk/recompute.
+
+Revision ID: b8e3f5a1c7d4
+Revises: f1b6d3a8c2e5
+Create Date: 2026-10-17 21:04:12.871352
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8e3f5a1c7d4'
+down_revision = 'f1b6d3a8c2e5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'asset_risk_aggregates',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('target', sa.String(), nullable=False),
+        sa.Column('scanners', postgresql.JSONB(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_asset_risk_aggregates_target', 'asset_risk_aggregates', ['target'], unique=True)
+
+    # Same slices as RiskService.aggregate_slice builds at completion
+    op.execute("""
+        WITH latest AS (
+            SELECT DISTINCT ON (target, scanner) id, target, scanner, completed_at
+            FROM scans
+            WHERE status = 'completed'
+            ORDER BY target, scanner, completed_at DESC NULLS LAST
+        ),
+        slices AS (
+            SELECT l.target, l.scanner, jsonb_build_object(
+                'scan_id', l.id,
+                'updated_at', to_char(l.completed_at, 'YYYY-MM-DD"T"HH24:MI:SS.US'),
+                'open_ports', COALESCE((
+                    SELECT jsonb_agg(DISTINCT f.port ORDER BY f.port) FROM findings f
+                    WHERE f.scan_id = l.id AND f.finding_type = 'open_port' AND f.port <> 0
+                ), '[]'::jsonb),
+                'services', COALESCE((
+                    SELECT jsonb_agg(DISTINCT f.service ORDER BY f.service) FROM findings f
+                    WHERE f.scan_id = l.id AND f.finding_type = 'service' AND f.service <> ''
+                ), '[]'::jsonb),
+                'severities', COALESCE((
+                    SELECT jsonb_object_agg(severity, findings_count) FROM (
+                        SELECT lower(COALESCE(NULLIF(f.severity, ''), 'low')) AS severity, count(*) AS findings_count
+                        FROM findings f
+                        WHERE f.scan_id = l.id AND f.finding_type = 'vulnerability'
+                        GROUP BY 1
+                    ) counts
+                ), '{}'::jsonb)
+            ) AS slice
+            FROM latest l
+        )
+        INSERT INTO asset_risk_aggregates (id, target, scanners, updated_at)
+        SELECT gen_random_uuid()::text, target, jsonb_object_agg(scanner, slice), now() AT TIME ZONE 'utc'
+        FROM slices
+        GROUP BY target
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_asset_risk_aggregates_target', table_name='asset_risk_aggregates')
+    op.drop_table('asset_risk_aggregates')
@@ -0,0 +1,27 @@
+"""Add scan progress
+
+Nullable progress (0-100) on scans, reported while a scan is running - used by
+sharded masscan scans to expose aggregated shard progress.
+
+Revision ID: c5e8a1d4b6f3
+Revises: a3c1e5f7b902
+Create Date: 2026-10-17 11:40:05.712034
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e8a1d4b6f3'
+down_revision = 'a3c1e5f7b902'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('scans', sa.Column('progress', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('scans', 'progress')
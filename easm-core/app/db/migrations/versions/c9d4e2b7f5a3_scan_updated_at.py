@@ -0,0 +1,30 @@
+"""Scan updated_at
+
+Timestamp of the last change of a scan row - status, progress, results or a batch of
+streamed findings. It versions the GET /scan/{scan_id} ETag of scans that are not
+finished yet, so polling does not count findings. Existing scans are backfilled with
+their latest lifecycle timestamp.
+
+Revision ID: c9d4e2b7f5a3
+Revises: b8e3f5a1c7d4
+Create Date: 2026-10-17 16:05:41.220917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9d4e2b7f5a3'
+down_revision = 'b8e3f5a1c7d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('scans', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE scans SET updated_at = COALESCE(completed_at, started_at, created_at)")
+
+
+def downgrade() -> None:
+    op.drop_column('scans', 'updated_at')
@@ -0,0 +1,55 @@
+"""Scan listing keyset indexes
+
+Composite (created_at, id) indexes for the keyset-paginated GET /api/v1/scans, alone
+and prefixed by each filter column (target, status, scanner). The target one replaces
+the plain target index. created_at becomes NOT NULL (backfilled from the other
+timestamps) - rows without it could never be reached by the keyset condition.
+
+Indexes are built CONCURRENTLY so the scans table stays writable on large installs.
+
+Revision ID: d7f2b9c4e1a8
+Revises: c5e8a1d4b6f3
+Create Date: 2026-10-17 15:02:37.104518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7f2b9c4e1a8'
+down_revision = 'c5e8a1d4b6f3'
+branch_labels = None
+depends_on = None
+
+
+KEYSET_INDEXES = {
+    'ix_scans_created_at_id': '(created_at, id)',
+    'ix_scans_target_created_at_id': '(target, created_at, id)',
+    'ix_scans_status_created_at_id': '(status, created_at, id)',
+    'ix_scans_scanner_created_at_id': '(scanner, created_at, id)',
+}
+
+
+def upgrade() -> None:
+    op.execute("""
+        UPDATE scans
+        SET created_at = COALESCE(started_at, completed_at, now())
+        WHERE created_at IS NULL
+    """)
+    op.alter_column('scans', 'created_at', existing_type=sa.DateTime(), nullable=False)
+
+    with op.get_context().autocommit_block():
+        for name, columns in KEYSET_INDEXES.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON scans {columns}")
+        # Covered by ix_scans_target_created_at_id
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_scans_target")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_scans_target ON scans (target)")
+        for name in KEYSET_INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+    op.alter_column('scans', 'created_at', existing_type=sa.DateTime(), nullable=True)
@@ -0,0 +1,30 @@
+"""Findings created_at index
+
+Index on findings.created_at for the time window filter of GET /api/v1/findings/export
+(nightly SIEM exports read one day of findings). Built CONCURRENTLY so inserts of
+completing scans are not blocked.
+
+Revision ID: e4a9c2f6b8d1
+Revises: d7f2b9c4e1a8
+Create Date: 2026-10-17 16:20:11.590327
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4a9c2f6b8d1'
+down_revision = 'd7f2b9c4e1a8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_findings_created_at ON findings (created_at)")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_findings_created_at")
@@ -0,0 +1,39 @@
+"""Scan request hash
+
+Nullable request_hash on scans (sha256 of target, scanner and canonical options) and an
+index on (request_hash, created_at), used to coalesce identical scan requests into the
+newest matching scan. Existing scans keep a NULL hash and are never reused.
+
+The index is built CONCURRENTLY so the scans table stays writable on large installs.
+
+Revision ID: f1b6d3a8c2e5
+Revises: e4a9c2f6b8d1
+Create Date: 2026-10-17 18:21:44.530917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1b6d3a8c2e5'
+down_revision = 'e4a9c2f6b8d1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('scans', sa.Column('request_hash', sa.String(length=64), nullable=True))
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_scans_request_hash_created_at "
+            "ON scans (request_hash, created_at)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_scans_request_hash_created_at")
+
+    op.drop_column('scans', 'request_hash')
@@ -1,17 +1,19 @@
 from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
 import os
 
 # Import our modules
 from .core.settings import settings
 from .core.logging import configure_logging, get_logger
 from .api.dependencies import get_scan_service, get_settings
+from .api.compression import CompressionMiddleware
 from .api.errors import (
     EASMException, ScanNotFoundException, ScannerNotSupportedException,
     scan_not_found_handler, scanner_not_supported_handler
 )
 from .schemas.scan import ScanRequest, ScanResponse, ScanStatus
 from .services.scan_service import ScanService
-from .api.routers import health, scan, nuclei_templates, scan_options
+from .api.routers import health, scan, scan_events, findings, queues, risk, nuclei_templates, scan_options
 
 # Configure logging
 configure_logging(settings.log_level)
@@ -22,7 +24,15 @@ app = FastAPI(
     title=settings.app_name,
     description="Core business logic for EASM with Clean Architecture",
     version=settings.version,
-    debug=settings.debug
+    debug=settings.debug,
+    default_response_class=ORJSONResponse
+)
+
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.response_compression_min_size,
+    gzip_level=settings.response_gzip_level,
+    brotli_quality=settings.response_brotli_quality
 )
 
 # Database initialization
@@ -30,7 +40,15 @@ app = FastAPI(
 async def startup_event():
     """Initialize database and ARQ Redis connection on startup"""
     from .tasks.config.queue_config import get_redis_pool
-    app.state.redis = await get_redis_pool()
+    # One bounded pool shared by all requests for the lifetime of the app
+    app.state.redis = await get_redis_pool(
+        max_connections=settings.redis_max_connections,
+        pool_timeout=settings.redis_pool_timeout
+    )
+    # One pub/sub subscription feeding every scan event stream of this process
+    from .api.event_hub import ScanEventHub
+    app.state.scan_events = ScanEventHub(app.state.redis, queue_size=settings.scan_events_queue_size)
+    await app.state.scan_events.start()
     try:
         from .database import init_db
         init_db()
@@ -39,6 +57,17 @@ async def startup_event():
         logger.error(f"Failed to initialize database: {e}")
         raise
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close the ARQ Redis connection pool on shutdown"""
+    scan_events = getattr(app.state, "scan_events", None)
+    if scan_events is not None:
+        await scan_events.close()
+    redis = getattr(app.state, "redis", None)
+    if redis is not None:
+        await redis.aclose(close_connection_pool=True)
+        logger.info("Redis connection pool closed")
+
 # Add exception handlers
 app.add_exception_handler(ScanNotFoundException, scan_not_found_handler)
 app.add_exception_handler(ScannerNotSupportedException, scanner_not_supported_handler)
@@ -47,6 +76,10 @@ app.add_exception_handler(ScannerNotSupportedException, scanner_not_supported_ha
 app.include_router(health.router, tags=["health"])
 app.include_router(scan_options.router, prefix="/api/v1", tags=["scan"])
 app.include_router(scan.router, prefix="/api/v1", tags=["scan"])
+app.include_router(scan_events.router, prefix="/api/v1", tags=["scan"])
+app.include_router(findings.router, prefix="/api/v1", tags=["findings"])
+app.include_router(queues.router, prefix="/api/v1", tags=["queues"])
+app.include_router(risk.router, prefix="/api/v1", tags=["risk"])
 app.include_router(nuclei_templates.router, prefix="/api/v1", tags=["nuclei"])
 
 @app.get("/health")
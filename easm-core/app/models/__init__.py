@@ -1,6 +1,6 @@
 from .base import Base
 from .asset import Asset
 from .scan import Scan
-from .finding import Finding, RiskScore
+from .finding import Finding, RiskScore, AssetRiskAggregate
 
-__all__ = ["Base", "Asset", "Scan", "Finding", "RiskScore"]
+__all__ = ["Base", "Asset", "Scan", "Finding", "RiskScore", "AssetRiskAggregate"]
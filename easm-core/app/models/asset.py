@@ -1,4 +1,5 @@
 from sqlalchemy import Column, String, DateTime, JSON
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from datetime import datetime
 
@@ -9,9 +10,9 @@ class Asset(Base):
     __tablename__ = "assets"
     
     id = Column(String, primary_key=True)
-    target = Column(String, nullable=False, index=True)
+    target = Column(String, nullable=False, unique=True, index=True)
     asset_type = Column(String, nullable=False)  # ip, domain, url, etc.
     status = Column(String, default="active")  # active, inactive, unknown
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
-    asset_metadata = Column(JSON)
+    asset_metadata = Column(JSONB)  # JSONB so upserts can merge keys with ||
@@ -1,4 +1,5 @@
 from sqlalchemy import Column, String, DateTime, JSON, Text, Integer, Boolean
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 
 from app.models.base import Base
@@ -16,7 +17,7 @@ class Finding(Base):
     description = Column(Text)
     port = Column(Integer)
     service = Column(String)
-    created_at = Column(DateTime, default=func.now())
+    created_at = Column(DateTime, default=func.now(), index=True)  # time window of findings exports
     verified = Column(Boolean, default=False)
     finding_metadata = Column(JSON)
 
@@ -25,8 +26,19 @@ class RiskScore(Base):
     __tablename__ = "risk_scores"
     
     id = Column(String, primary_key=True)
-    target = Column(String, nullable=False, index=True)
+    target = Column(String, nullable=False, unique=True, index=True)
     score = Column(Integer, nullable=False)  # 0-100
     factors = Column(JSON)  # JSON object with risk factors
     calculated_at = Column(DateTime, default=func.now())
     expires_at = Column(DateTime)
+
+class AssetRiskAggregate(Base):
+    """Risk-relevant state of an asset across scanners - what its risk score is calculated from"""
+    __tablename__ = "asset_risk_aggregates"
+    
+    id = Column(String, primary_key=True)
+    target = Column(String, nullable=False, unique=True, index=True)
+    # {scanner: {scan_id, open_ports, services, severities, updated_at}} - the latest completed
+    # scan of each scanner, replaced key by key with || so scanners never overwrite each other
+    scanners = Column(JSONB, nullable=False)
+    updated_at = Column(DateTime, default=func.now())
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, String, DateTime, JSON, Text
+from sqlalchemy import Column, String, DateTime, JSON, Text, Integer, Index
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 
 from app.models.base import Base
@@ -6,14 +7,28 @@ from app.models.base import Base
 class Scan(Base):
     """Scan model for tracking scan requests and results"""
     __tablename__ = "scans"
+    __table_args__ = (
+        # Keyset pagination of the scan listing on (created_at, id), optionally filtered
+        Index("ix_scans_created_at_id", "created_at", "id"),
+        Index("ix_scans_target_created_at_id", "target", "created_at", "id"),
+        Index("ix_scans_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_scans_scanner_created_at_id", "scanner", "created_at", "id"),
+        # Newest scan of an identical request (scan coalescing)
+        Index("ix_scans_request_hash_created_at", "request_hash", "created_at"),
+    )
     
     id = Column(String, primary_key=True)
-    target = Column(String, nullable=False, index=True)
+    target = Column(String, nullable=False)
     scanner = Column(String, nullable=False)
     status = Column(String, default="queued")  # queued, running, completed, failed
-    created_at = Column(DateTime, default=func.now())
+    created_at = Column(DateTime, nullable=False, default=func.now())
     started_at = Column(DateTime)
     completed_at = Column(DateTime)
-    options = Column(JSON)
-    results = Column(JSON)
+    # Large JSON - only read when a query asks for it (load_only / undefer)
+    options = deferred(Column(JSON))
+    results = deferred(Column(JSON))
     error_message = Column(Text)
+    progress = Column(Integer)  # 0-100 while running, set by scans that report progress (e.g. sharded masscan)
+    # Bumped by every change of the row (and by streamed findings) - versions the scan status ETag
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    request_hash = Column(String(64))  # sha256 of target, scanner and canonical options - see scan_request_hash
@@ -0,0 +1,21 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+class QueueBacklog(BaseModel):
+    """Backlog of one scanner queue"""
+    scanner: str
+    queue: str
+    depth: int = Field(..., description="Jobs in the queue, including deferred ones")
+    ready: int = Field(..., description="Jobs workers may start now")
+    deferred: int = Field(..., description="Jobs deferred into the future (priority boosts excluded) - spilled by admission control")
+    job_seconds: float = Field(..., description="Moving average of the job run time")
+    slots: int = Field(..., description="Jobs run in parallel by all workers of the queue")
+    drain_seconds: int = Field(..., description="Estimated time until every queued job has started")
+    saturated: bool = Field(..., description="True if new scans are currently rejected or deferred")
+
+class QueueStatusResponse(BaseModel):
+    """Schema for GET /api/v1/queues"""
+    admission_mode: str = Field(..., description="reject, defer or off")
+    max_queue_depth: int
+    max_drain_seconds: int
+    queues: List[QueueBacklog]
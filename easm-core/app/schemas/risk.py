@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+class RiskRecomputeSummary(BaseModel):
+    """Outcome of a whole-portfolio risk recomputation"""
+    assets: int = Field(..., description="Assets (targets with a risk aggregate) rescored")
+    findings: int = Field(..., description="Open ports, services and vulnerabilities (across scanners) the scores were computed from")
+    load_seconds: float
+    score_seconds: float
+    write_seconds: float
+
+class RiskRecomputeJob(BaseModel):
+    """Schema for the risk recomputation job endpoints"""
+    job_id: str
+    status: str = Field(..., description="queued, deferred, in_progress, complete, failed or not_found")
+    result: Optional[RiskRecomputeSummary] = None
+    error: Optional[str] = None
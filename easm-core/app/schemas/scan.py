@@ -12,9 +12,23 @@ class ScannerType(str, Enum):
     NUCLEI = "nuclei"
     HTTPX = "httpx"
 
+class ScanPriority(str, Enum):
+    HIGH = "high"
+    NORMAL = "normal"
+    LOW = "low"
+
 class BaseScanRequest(AssetBase):
     """Base schema for all scan requests"""
-    pass
+    priority: Optional[ScanPriority] = Field(
+        default=None,
+        description="Queue priority: 'high' for interactive scans, 'low' for bulk sweeps. "
+                    "Defaults to 'normal' (POST /scan) or 'low' (POST /scan/batch)"
+    )
+    force: bool = Field(
+        default=False,
+        description="Always start a new scan. By default a request identical to a queued, running or "
+                    "recently completed scan (same target, scanner and options) returns that scan instead"
+    )
 
 class NmapScanRequest(BaseScanRequest):
     """
@@ -111,6 +125,42 @@ class ScanResponse(BaseModel):
     scan_id: str
     status: str
     message: str
+    coalesced: bool = Field(False, description="True if an existing identical scan was returned instead of a new one")
+    deferred_seconds: Optional[int] = Field(None, description="Set when the scanner backlog is full - the scan waits this long before it is queued")
+
+class BatchScanRequest(BaseModel):
+    """
+    Batch scan request - many targets submitted in a single call
+
+    Every item has the same shape as the body of POST /scan and is validated
+    separately, so one invalid target does not reject the whole batch.
+    """
+    scans: List[Dict[str, Any]] = Field(
+        ...,
+        min_length=1,
+        description="List of scan requests (same format as POST /scan body)",
+        example=[
+            {"target": "scanme.nmap.org", "scanner": "nmap", "options": {"ports": "80,443"}},
+            {"target": "192.168.1.0/24", "scanner": "masscan", "options": {"ports": "1-1000"}}
+        ]
+    )
+
+class BatchScanItemResult(BaseModel):
+    """Result for a single item of a batch scan request"""
+    index: int = Field(..., description="Position of the item in the request")
+    scan_id: Optional[str] = None
+    status: str = Field(..., description="queued or failed - or the status of the existing scan for coalesced items")
+    error: Optional[str] = None
+    coalesced: bool = Field(False, description="True if the item reuses an existing identical scan")
+    deferred_seconds: Optional[int] = Field(None, description="Set when the scanner backlog is full - the scan waits this long before it is queued")
+
+class BatchScanResponse(BaseModel):
+    """Schema for batch scan response - results are in request order"""
+    total: int
+    queued: int = Field(..., description="Items with a scan - newly queued or coalesced")
+    failed: int
+    coalesced: int = Field(0, description="Items that reuse an existing identical scan")
+    results: List[BatchScanItemResult]
 
 class ScanStatus(BaseModel):
     """Schema for scan status"""
@@ -127,6 +177,39 @@ class ScanStatus(BaseModel):
     risk_score: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
 
+class ScanResults(BaseModel):
+    """Schema for the raw results of a scan (GET /scan/{scan_id}/results)"""
+    scan_id: str
+    status: str
+    results: Optional[Dict[str, Any]] = None
+
+class ScanFindingsPage(BaseModel):
+    """Schema for a page of a scan's findings (GET /scan/{scan_id}/findings)"""
+    scan_id: str
+    items: List[Dict[str, Any]]
+    limit: int
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page, null on the last page")
+
+class ScanSummary(BaseModel):
+    """Schema for a scan in the scan listing - options/results only when requested with include="""
+    scan_id: str
+    target: str
+    scanner: str
+    status: str
+    progress: int = Field(ge=0, le=100)
+    created_at: str
+    started_at: Optional[str] = None
+    completed_at: Optional[str] = None
+    error: Optional[str] = None
+    options: Optional[Dict[str, Any]] = None
+    results: Optional[Dict[str, Any]] = None
+
+class ScanListResponse(BaseModel):
+    """Schema for a page of the scan listing"""
+    items: List[ScanSummary]
+    limit: int
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page, null on the last page")
+
 class Finding(BaseModel):
     """Schema for scan finding"""
     id: str
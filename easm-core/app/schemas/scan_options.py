@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 from enum import Enum
 
 class SeverityEnum(str, Enum):
@@ -51,6 +51,11 @@ class NmapScanOptions(BaseModel):
         default=300, 
         description="Scan timeout in seconds"
     )
+    profile: Optional[Literal["default", "two_phase"]] = Field(
+        default="default",
+        description="Scan profile: 'default' runs -sV/-sC/-O on every probed port, 'two_phase' runs a fast SYN discovery "
+                    "pass first and the deep scan only on hosts and ports found open"
+    )
 
 class MasscanOptions(BaseModel):
     """Options specific to masscan scanner"""
@@ -66,6 +71,15 @@ class MasscanOptions(BaseModel):
         default=120, 
         description="Scan timeout in seconds"
     )
+    sharding: Optional[bool] = Field(
+        default=True,
+        description="Split large CIDR ranges (or large port ranges of a single host) across masscan workers"
+    )
+    max_shards: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Upper bound on the number of shards (defaults to the MASSCAN_MAX_SHARDS setting)"
+    )
 
 class NucleiOptions(BaseModel):
     """Options specific to nuclei scanner"""
@@ -109,3 +123,17 @@ class NucleiOptions(BaseModel):
         default=30,
         description="Maximum number of errors allowed for a host before skipping"
     )
+    streaming: Optional[bool] = Field(
+        default=False,
+        description="Parse output while nuclei runs and publish findings in batches instead of all at the end"
+    )
+    stream_batch_size: Optional[int] = Field(
+        default=50,
+        ge=1,
+        description="Streaming mode: number of findings per published batch"
+    )
+    stream_flush_interval: Optional[float] = Field(
+        default=5.0,
+        gt=0,
+        description="Streaming mode: maximum seconds a pending batch is held before it is published"
+    )
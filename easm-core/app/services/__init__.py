@@ -5,6 +5,12 @@ Service layer containing business logic
 from .asset_service import AssetService
 from .finding_service import FindingService
 from .scan_service import ScanService
+from .scan_cache import ScanStatusCache
 from .risk_service import RiskService
+from .risk_engine import PortfolioRiskEngine
+from .blob_store import BlobStore, LocalBlobStore, S3BlobStore, get_blob_store
 
-__all__ = ["AssetService", "FindingService", "ScanService", "RiskService"]
\ No newline at end of file
+__all__ = [
+    "AssetService", "FindingService", "ScanService", "ScanStatusCache", "RiskService", "PortfolioRiskEngine",
+    "BlobStore", "LocalBlobStore", "S3BlobStore", "get_blob_store"
+]
\ No newline at end of file
@@ -0,0 +1,162 @@
+"""
+Blob Store
+
+Content-addressed store for large scan result documents. Blobs are zstd-compressed and
+keyed by the sha256 of their uncompressed content, so identical results are stored once
+and a key always names the same bytes. Backends: a local directory (shared by the API
+and the worker) and S3-compatible object storage (optional boto3 package).
+"""
+
+import asyncio
+import hashlib
+import os
+import uuid
+from typing import AsyncIterator, Optional
+
+import zstandard
+
+from app.core.settings import settings
+from app.core.logging import get_logger
+
+try:
+    import boto3
+except ImportError:  # optional - only needed for BLOB_STORE_BACKEND=s3
+    boto3 = None
+
+logger = get_logger(__name__)
+
+CHUNK_BYTES = 64 * 1024  # read/decompress granularity of streamed blobs
+
+
+class BlobStore:
+    """Base class of the blob store backends - subclasses store and read compressed bytes"""
+
+    def __init__(self, zstd_level: int = 3):
+        self.zstd_level = zstd_level
+
+    async def put(self, data: bytes) -> dict:
+        """Store ``data`` compressed, returns its reference (key, size, stored_size, encoding)"""
+        key = "sha256:" + hashlib.sha256(data).hexdigest()
+        compressed = await asyncio.to_thread(zstandard.ZstdCompressor(level=self.zstd_level).compress, data)
+        await self._write(key, compressed)
+        return {"key": key, "size": len(data), "stored_size": len(compressed), "encoding": "zstd"}
+
+    async def stream(self, key: str) -> AsyncIterator[bytes]:
+        """Uncompressed content of a blob, chunk by chunk - raises KeyError for unknown keys"""
+        decompressor = zstandard.ZstdDecompressor().decompressobj()
+        async for chunk in self._read_chunks(key):
+            data = decompressor.decompress(chunk)
+            if data:
+                yield data
+
+    async def get(self, key: str) -> bytes:
+        """Whole uncompressed content of a blob"""
+        return b"".join([chunk async for chunk in self.stream(key)])
+
+    async def _write(self, key: str, compressed: bytes):
+        raise NotImplementedError
+
+    def _read_chunks(self, key: str) -> AsyncIterator[bytes]:
+        raise NotImplementedError
+
+
+class LocalBlobStore(BlobStore):
+    """Blobs as files under ``root``, fanned out by key prefix: ab/cd/abcd....zst"""
+
+    def __init__(self, root: str, zstd_level: int = 3):
+        super().__init__(zstd_level)
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        digest = key.split(":", 1)[-1]
+        return os.path.join(self.root, digest[:2], digest[2:4], digest + ".zst")
+
+    async def _write(self, key: str, compressed: bytes):
+        await asyncio.to_thread(self._write_file, self._path(key), compressed)
+
+    @staticmethod
+    def _write_file(path: str, compressed: bytes):
+        if os.path.exists(path):
+            return  # same key, same content
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Written under a temporary name and renamed - readers never see a partial blob
+        temporary_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temporary_path, "wb") as f:
+            f.write(compressed)
+        os.replace(temporary_path, path)
+
+    async def _read_chunks(self, key: str) -> AsyncIterator[bytes]:
+        try:
+            f = await asyncio.to_thread(open, self._path(key), "rb")
+        except FileNotFoundError:
+            raise KeyError(key)
+        try:
+            while True:
+                chunk = await asyncio.to_thread(f.read, CHUNK_BYTES)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            f.close()
+
+
+class S3BlobStore(BlobStore):
+    """Blobs as objects ``<prefix><sha256>.zst`` in an S3-compatible bucket (credentials from the boto3 chain)"""
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: Optional[str] = None, zstd_level: int = 3):
+        if boto3 is None:
+            raise RuntimeError("BLOB_STORE_BACKEND=s3 requires the boto3 package")
+        super().__init__(zstd_level)
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = boto3.client("s3", endpoint_url=endpoint_url)
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}{key.split(':', 1)[-1]}.zst"
+
+    async def _write(self, key: str, compressed: bytes):
+        object_key = self._object_key(key)
+        try:
+            await asyncio.to_thread(self.client.head_object, Bucket=self.bucket, Key=object_key)
+            return  # same key, same content
+        except self.client.exceptions.ClientError:
+            pass
+        await asyncio.to_thread(
+            self.client.put_object, Bucket=self.bucket, Key=object_key, Body=compressed,
+            ContentType="application/zstd"
+        )
+
+    async def _read_chunks(self, key: str) -> AsyncIterator[bytes]:
+        try:
+            response = await asyncio.to_thread(self.client.get_object, Bucket=self.bucket, Key=self._object_key(key))
+        except self.client.exceptions.NoSuchKey:
+            raise KeyError(key)
+        body = response["Body"]
+        try:
+            while True:
+                chunk = await asyncio.to_thread(body.read, CHUNK_BYTES)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            body.close()
+
+
+_blob_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> Optional[BlobStore]:
+    """Process-wide blob store configured by BLOB_STORE_BACKEND, None when it is off"""
+    global _blob_store
+    if _blob_store is None and settings.blob_store_backend != "off":
+        if settings.blob_store_backend == "s3":
+            _blob_store = S3BlobStore(
+                settings.blob_store_s3_bucket,
+                prefix=settings.blob_store_s3_prefix,
+                endpoint_url=settings.blob_store_s3_endpoint_url,
+                zstd_level=settings.blob_store_zstd_level
+            )
+        else:
+            _blob_store = LocalBlobStore(settings.blob_store_path, zstd_level=settings.blob_store_zstd_level)
+        logger.info(f"Blob store initialized", backend=settings.blob_store_backend)
+    return _blob_store
@@ -5,9 +5,40 @@ This module contains the FindingService class responsible for managing finding-r
 It handles creation, categorization, and processing of security findings in the EASM system.
 """
 
-from typing import List, Dict, Any, Optional
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import List, Dict, Any, AsyncIterator, Optional
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.finding import Finding
+from app.core.settings import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Columns of a findings export, in CSV column order
+EXPORT_COLUMNS = [
+    "id", "scan_id", "target", "finding_type", "severity", "title", "description",
+    "port", "service", "created_at", "verified", "finding_metadata"
+]
+EXPORT_CHUNK_BYTES = 64 * 1024  # rows are sent in chunks of roughly this size
+
+
+def finding_to_dict(finding: Finding) -> Dict[str, Any]:
+    """Finding as returned by the scan endpoints"""
+    return {
+        "id": finding.id,
+        "finding_type": finding.finding_type,
+        "severity": finding.severity,
+        "title": finding.title,
+        "description": finding.description,
+        "port": finding.port,
+        "service": finding.service,
+        "finding_metadata": finding.finding_metadata
+    }
 
 
 class FindingService:
@@ -22,14 +53,136 @@ class FindingService:
     - Managing finding lifecycle (open, verified, closed)
     """
     
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession = None):
         """Initialize the FindingService with a database session."""
         self.db = db
     
+    async def get_scan_findings(
+        self,
+        scan_id: str,
+        severity: Optional[List[str]] = None,
+        finding_type: Optional[List[str]] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Dict[str, Any]:
+        """
+        Page through the findings of a scan, ordered by finding id
+
+        ``cursor`` is the id of the last finding of the previous page (keyset, no OFFSET).
+
+        Returns:
+            Dict with items and next_cursor (None on the last page)
+        """
+        query = select(Finding).where(Finding.scan_id == scan_id)
+        if severity:
+            query = query.where(Finding.severity.in_(severity))
+        if finding_type:
+            query = query.where(Finding.finding_type.in_(finding_type))
+        if cursor:
+            query = query.where(Finding.id > cursor)
+
+        try:
+            findings = (await self.db.execute(query.order_by(Finding.id).limit(limit + 1))).scalars().all()
+        except Exception as e:
+            logger.error(f"Failed to get scan findings: {e}")
+            raise
+
+        return {
+            "items": [finding_to_dict(f) for f in findings[:limit]],
+            "next_cursor": findings[limit - 1].id if len(findings) > limit else None
+        }
+    
+    async def stream_findings(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        target: Optional[str] = None,
+        severity: Optional[List[str]] = None,
+        scan_id: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield findings matching the filters one by one, read through a server-side cursor
+
+        Rows are fetched ``findings_export_batch_size`` at a time, so memory stays flat
+        whatever the number of findings. Without a session of its own the service opens
+        one for the duration of the iteration (a streaming response outlives the request's
+        session).
+        """
+        query = select(*[getattr(Finding, column) for column in EXPORT_COLUMNS])
+        if since:
+            query = query.where(Finding.created_at >= since)
+        if until:
+            query = query.where(Finding.created_at < until)
+        if target:
+            query = query.where(Finding.target == target)
+        if severity:
+            query = query.where(Finding.severity.in_(severity))
+        if scan_id:
+            query = query.where(Finding.scan_id == scan_id)
+        query = query.execution_options(yield_per=settings.findings_export_batch_size)
+
+        if not self.db:
+            from ..database import AsyncSessionLocal
+            self.db = AsyncSessionLocal()
+            should_close = True
+        else:
+            should_close = False
+
+        try:
+            result = await self.db.stream(query)
+            # One await per batch rather than per row
+            async for rows in result.partitions():
+                for row in rows:
+                    yield row._asdict()
+        except Exception as e:
+            logger.error(f"Failed to stream findings: {e}")
+            raise
+        finally:
+            if should_close:
+                await self.db.close()
+
+    async def export_findings(self, export_format: str = "ndjson", gzip: bool = False, **filters) -> AsyncIterator[bytes]:
+        """
+        Encode ``stream_findings`` as NDJSON or CSV chunks, optionally gzip-compressed on the fly
+
+        Only one chunk (about EXPORT_CHUNK_BYTES) is held in memory at a time.
+        """
+        compressor = zlib.compressobj(wbits=31) if gzip else None  # wbits=31 - gzip container
+        buffer = io.StringIO()
+        writer = csv.writer(buffer) if export_format == "csv" else None
+        if writer:
+            writer.writerow(EXPORT_COLUMNS)
+
+        def take() -> bytes:
+            data = buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            return compressor.compress(data) if compressor else data
+
+        async for finding in self.stream_findings(**filters):
+            finding["created_at"] = finding["created_at"].isoformat() if finding["created_at"] else None
+            if writer:
+                metadata = finding["finding_metadata"]
+                finding["finding_metadata"] = json.dumps(metadata) if metadata is not None else ""
+                writer.writerow([finding[column] for column in EXPORT_COLUMNS])
+            else:
+                buffer.write(json.dumps(finding, default=str))
+                buffer.write("\n")
+
+            if buffer.tell() >= EXPORT_CHUNK_BYTES:
+                chunk = take()
+                if chunk:
+                    yield chunk
+
+        chunk = take()
+        if compressor:
+            chunk += compressor.flush()
+        if chunk:
+            yield chunk
+    
     # TODO: Implement methods for finding management
     # Examples:
     # - async def create_finding(self, data: Dict[str, Any]) -> Finding:
     # - async def get_finding_by_id(self, finding_id: str) -> Optional[Finding]:
     # - async def get_findings_by_asset(self, asset_id: str) -> List[Finding]:
-    # - async def get_findings_by_severity(self, severity: str) -> List[Finding]:
     # - async def update_finding_status(self, finding_id: str, status: str) -> Optional[Finding]:
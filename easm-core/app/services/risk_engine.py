@@ -0,0 +1,240 @@
+"""
+Portfolio Risk Engine
+
+Recomputes the risk score of every asset in one pass - after a change of the RiskService
+weights, port or service lists. The asset risk aggregates (what scan completions score
+assets from) are loaded as columns - one row per open port, service and vulnerability
+severity with its count - and the four risk factors are group-by reductions over them
+with NumPy. Per-value points come from the RiskService rules, evaluated once per distinct
+value, so the scores are exactly those of RiskService.calculate_aggregate_risk. Scores are
+written back with bulk upserts.
+"""
+
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from uuid import uuid4
+
+import numpy as np
+from sqlalchemy import or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import AssetRiskAggregate, RiskScore
+from ..core.settings import settings
+from ..core.logging import get_logger
+from .risk_service import RiskService
+
+logger = get_logger(__name__)
+
+FACTORS = ("open_ports", "services", "vulnerabilities", "exposure")
+COLUMNS = ("finding_type", "port", "service", "severity")
+
+
+class FindingColumns:
+    """
+    Findings of many assets as columns of integer codes
+
+    ``asset`` holds the index of the finding's asset in ``targets`` and ``count`` how many
+    findings the row stands for; every other column holds the index of the value in
+    ``values[column]``, the distinct values seen so far. An asset without findings has one
+    row whose finding_type is None and count 0.
+    """
+
+    def __init__(self):
+        self.asset: List[int] = []
+        self.count: List[int] = []
+        self.codes: Dict[str, List[int]] = {column: [] for column in COLUMNS}
+        self._asset_codes: Dict[str, int] = {}
+        self._value_codes: Dict[str, Dict[Any, int]] = {column: {} for column in COLUMNS}
+
+    def __len__(self) -> int:
+        return len(self.asset)
+
+    @property
+    def targets(self) -> List[str]:
+        """Targets of the assets, in asset index order"""
+        return list(self._asset_codes)
+
+    def append(self, rows: Sequence[Sequence[Any]]):
+        """Add rows of (target, finding_type, port, service, severity, count)"""
+        if not rows:
+            return
+        targets, *columns, counts = zip(*rows)
+        self.asset.extend(self._encode(self._asset_codes, targets))
+        self.count.extend(counts)
+        for column, values in zip(COLUMNS, columns):
+            self.codes[column].extend(self._encode(self._value_codes[column], values))
+
+    def values(self, column: str) -> List[Any]:
+        """Distinct values of a column, in code order"""
+        return list(self._value_codes[column])
+
+    @staticmethod
+    def _encode(codes: Dict[Any, int], values: Sequence[Any]) -> List[int]:
+        return [codes.setdefault(value, len(codes)) for value in values]
+
+
+def aggregate_rows(target: str, scanners: Dict[str, Dict[str, Any]]) -> List[tuple]:
+    """FindingColumns rows of an asset aggregate - the union of its scanners' slices"""
+    open_ports, services, severities = RiskService.merge_aggregate(scanners)
+    rows = [(target, "open_port", port, None, None, 1) for port in open_ports]
+    rows += [(target, "service", None, service, None, 1) for service in services]
+    rows += [(target, "vulnerability", None, None, severity, count) for severity, count in severities.items()]
+    return rows or [(target, None, None, None, None, 0)]
+
+
+class PortfolioRiskEngine:
+    """Batch recomputation of the risk scores of all assets"""
+
+    def __init__(self, db: Optional[AsyncSession] = None):
+        self.db = db
+
+    async def recompute(self) -> Dict[str, Any]:
+        """Load, score and upsert the risk of every asset with a risk aggregate - returns a summary"""
+        if not self.db:
+            from ..database import AsyncSessionLocal
+            self.db = AsyncSessionLocal()
+            should_close = True
+        else:
+            should_close = False
+
+        try:
+            # Taken before loading - scores written by scan completions after it are newer than ours
+            snapshot_time = datetime.utcnow()
+            start = time.perf_counter()
+            columns = await self.load_columns()
+            loaded = time.perf_counter()
+            scores = self.score(columns)
+            scored = time.perf_counter()
+            await self.write_scores(columns.targets, scores, snapshot_time)
+            written = time.perf_counter()
+
+            summary = {
+                "assets": len(columns.targets),
+                "findings": int(scores["finding_count"].sum()),
+                "load_seconds": round(loaded - start, 3),
+                "score_seconds": round(scored - loaded, 3),
+                "write_seconds": round(written - scored, 3)
+            }
+            logger.info(f"Recomputed portfolio risk scores", **summary)
+            return summary
+
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Failed to recompute portfolio risk scores: {e}")
+            raise
+        finally:
+            if should_close:
+                await self.db.close()
+
+    async def load_columns(self) -> FindingColumns:
+        """Asset risk aggregates as finding columns, read through a server-side cursor"""
+        query = (
+            select(AssetRiskAggregate.target, AssetRiskAggregate.scanners)
+            .execution_options(yield_per=settings.risk_recompute_fetch_size)
+        )
+
+        columns = FindingColumns()
+        result = await self.db.stream(query)
+        async for aggregates in result.partitions():
+            columns.append([row for target, scanners in aggregates for row in aggregate_rows(target, scanners)])
+        return columns
+
+    @classmethod
+    def score(cls, columns: FindingColumns) -> Dict[str, np.ndarray]:
+        """
+        Risk factors, score and finding count of every asset, indexed like ``columns.targets``
+
+        Same arithmetic as RiskService.calculate_aggregate_risk: points summed per asset
+        and capped at 100 per factor, weighted in the same order and truncated to an int.
+        """
+        asset_count = len(columns.targets)
+        asset = np.asarray(columns.asset, dtype=np.int64)
+        count = np.asarray(columns.count, dtype=np.float64)
+        codes = {column: np.asarray(columns.codes[column], dtype=np.int64) for column in COLUMNS}
+
+        def lookup(column: str, rule: Callable[[Any], float]) -> np.ndarray:
+            # Rule evaluated once per distinct value, then gathered for every finding
+            table = np.array([rule(value) for value in columns.values(column)], dtype=np.float64)
+            return table[codes[column]]
+
+        def per_asset(points: np.ndarray) -> np.ndarray:
+            return np.bincount(asset, weights=points * count, minlength=asset_count)
+
+        def finding_type(name: Optional[str]) -> np.ndarray:
+            return lookup("finding_type", lambda value: value == name).astype(bool)
+
+        is_open_port = finding_type("open_port")
+        is_service = finding_type("service")
+        is_vulnerability = finding_type("vulnerability")
+
+        port_points = lookup("port", lambda port: RiskService.port_points(port) if port else 0)
+        service_points = lookup("service", lambda service: RiskService.service_points(service.lower()) if service else 0)
+        severity_points = lookup(
+            "severity", lambda severity: RiskService.SEVERITY_POINTS.get((severity if severity is not None else "low").lower(), 0)
+        )
+
+        factors = {
+            "open_ports": np.minimum(100.0, per_asset(np.where(is_open_port, port_points, 0.0))),
+            "services": np.minimum(100.0, per_asset(np.where(is_service, service_points, 0.0))),
+            "vulnerabilities": np.minimum(100.0, per_asset(np.where(is_vulnerability, severity_points, 0.0)))
+        }
+        open_port_counts, exposure_codes = np.unique(per_asset(is_open_port.astype(np.float64)), return_inverse=True)
+        exposure_table = np.array([RiskService.exposure_for_open_ports(int(count)) for count in open_port_counts])
+        factors["exposure"] = exposure_table[exposure_codes.reshape(-1)]
+
+        weights = RiskService.RISK_WEIGHTS
+        total = (
+            factors["open_ports"] * weights["open_ports"] +
+            factors["services"] * weights["services"] +
+            factors["vulnerabilities"] * weights["vulnerabilities"] +
+            factors["exposure"] * weights["exposure"]
+        )
+        return {
+            **factors,
+            "score": np.clip(total.astype(np.int64), 0, 100),
+            "finding_count": per_asset(np.ones(len(asset))).astype(np.int64)
+        }
+
+    async def write_scores(self, targets: List[str], scores: Dict[str, np.ndarray], snapshot_time: datetime):
+        """
+        Upsert the scores on target, RISK_RECOMPUTE_WRITE_BATCH rows per statement and commit
+
+        Scores are dated ``snapshot_time``, when their aggregates were read. A score
+        calculated after it (a scan completed during the run) is newer and left alone.
+        """
+        expires_at = snapshot_time + timedelta(days=30)
+        stmt = pg_insert(RiskScore)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[RiskScore.target],
+            set_={
+                "score": stmt.excluded.score,
+                "factors": stmt.excluded.factors,
+                "calculated_at": stmt.excluded.calculated_at,
+                "expires_at": stmt.excluded.expires_at
+            },
+            where=or_(RiskScore.calculated_at.is_(None), RiskScore.calculated_at <= snapshot_time)
+        )
+
+        factor_values = {name: scores[name].tolist() for name in FACTORS}
+        score_values = scores["score"].tolist()
+        finding_counts = scores["finding_count"].tolist()
+        batch_size = max(1, settings.risk_recompute_write_batch)
+
+        for batch_start in range(0, len(targets), batch_size):
+            rows = [
+                {
+                    "id": str(uuid4()),
+                    "target": targets[i],
+                    "score": score_values[i],
+                    # An asset without findings has no factors, like calculate_aggregate_risk({})
+                    "factors": {name: factor_values[name][i] for name in FACTORS} if finding_counts[i] else {},
+                    "calculated_at": snapshot_time,
+                    "expires_at": expires_at
+                }
+                for i in range(batch_start, min(batch_start + batch_size, len(targets)))
+            ]
+            await self.db.execute(stmt, rows)
+            # Committed per batch - completions upserting the same targets never wait on the whole run
+            await self.db.commit()
@@ -1,4 +1,4 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 import logging
 from datetime import datetime, timedelta
 from ..core.logging import get_logger
@@ -23,6 +23,16 @@ class RiskService:
     HIGH_RISK_PORTS = {21, 23, 135, 139, 445, 1433, 1521, 3389, 5432, 5984, 6379, 9200, 27017}
     MEDIUM_RISK_PORTS = {22, 25, 53, 80, 110, 143, 443, 993, 995, 3306, 5432}
     
+    # Services matched by substring of the lowercased service name
+    HIGH_RISK_SERVICES = {
+        "ftp", "telnet", "rlogin", "rsh", "finger", "tftp",
+        "mysql", "postgresql", "mongodb", "redis", "elasticsearch",
+        "rdp", "vnc", "ssh", "smb"
+    }
+    
+    # Vulnerability points by severity - unknown severities add nothing
+    SEVERITY_POINTS = {"critical": 40, "high": 25, "medium": 15, "low": 5}
+    
     @classmethod
     def calculate_asset_risk(cls, findings: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -48,6 +58,84 @@ class RiskService:
         vuln_risk = cls._calculate_vulnerability_risk(findings)
         exposure_risk = cls._calculate_exposure_risk(findings)
         
+        return cls._weighted_risk(port_risk, service_risk, vuln_risk, exposure_risk)
+    
+    @classmethod
+    def aggregate_slice(cls, findings: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Risk-relevant summary of one scan's findings, kept per scanner in the asset aggregate
+        
+        Returns:
+            Dictionary with the distinct open ports, distinct service names (of service
+            findings) and vulnerability counts by lowercased severity
+        """
+        open_ports = set()
+        services = set()
+        severities: Dict[str, int] = {}
+        
+        for finding in findings:
+            finding_type = finding.get("finding_type")
+            if finding_type == "open_port" and finding.get("port"):
+                open_ports.add(finding["port"])
+            elif finding_type == "service" and finding.get("service"):
+                services.add(finding["service"])
+            elif finding_type == "vulnerability":
+                severity = (finding.get("severity") or "low").lower()
+                severities[severity] = severities.get(severity, 0) + 1
+        
+        return {
+            "open_ports": sorted(open_ports),
+            "services": sorted(services),
+            "severities": severities
+        }
+    
+    @classmethod
+    def merge_aggregate(cls, scanners: Dict[str, Dict[str, Any]]) -> Tuple[set, set, Dict[str, int]]:
+        """Union of the per-scanner slices: open ports, services and summed severity counts"""
+        open_ports = set()
+        services = set()
+        severities: Dict[str, int] = {}
+        
+        for scanner_slice in scanners.values():
+            open_ports.update(scanner_slice.get("open_ports", []))
+            services.update(scanner_slice.get("services", []))
+            for severity, count in scanner_slice.get("severities", {}).items():
+                severities[severity] = severities.get(severity, 0) + count
+        
+        return open_ports, services, severities
+    
+    @classmethod
+    def calculate_aggregate_risk(cls, scanners: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Calculate the risk score of an asset from its aggregate - the latest findings of every scanner
+        
+        Same rules as calculate_asset_risk, applied to the union of the scanners' slices:
+        a port reported by two scanners counts once, and a scan with no hits only clears
+        its own scanner's contribution.
+        
+        Args:
+            scanners: Per-scanner slices built by aggregate_slice
+            
+        Returns:
+            Dictionary with risk score and factors
+        """
+        open_ports, services, severities = cls.merge_aggregate(scanners)
+        
+        if not open_ports and not services and not severities:
+            return cls.calculate_asset_risk([])
+        
+        port_risk = min(100.0, float(sum(cls.port_points(port) for port in open_ports)))
+        service_risk = min(100.0, float(sum(cls.service_points(service.lower()) for service in services)))
+        vuln_risk = min(100.0, float(sum(
+            cls.SEVERITY_POINTS.get(severity, 0) * count for severity, count in severities.items()
+        )))
+        exposure_risk = cls.exposure_for_open_ports(len(open_ports))
+        
+        return cls._weighted_risk(port_risk, service_risk, vuln_risk, exposure_risk)
+    
+    @classmethod
+    def _weighted_risk(cls, port_risk: float, service_risk: float, vuln_risk: float, exposure_risk: float) -> Dict[str, Any]:
+        """Risk score and level from the four factors"""
         # Calculate weighted total
         total_score = (
             port_risk * cls.RISK_WEIGHTS["open_ports"] +
@@ -86,16 +174,21 @@ class RiskService:
         risk_score = 0.0
         
         for port in open_ports:
-            if port in cls.HIGH_RISK_PORTS:
-                risk_score += 30
-            elif port in cls.MEDIUM_RISK_PORTS:
-                risk_score += 15
-            else:
-                risk_score += 5
+            risk_score += cls.port_points(port)
         
         # Cap at 100
         return min(100.0, risk_score)
     
+    @classmethod
+    def port_points(cls, port: int) -> int:
+        """Risk points of one open port"""
+        if port in cls.HIGH_RISK_PORTS:
+            return 30
+        elif port in cls.MEDIUM_RISK_PORTS:
+            return 15
+        else:
+            return 5
+    
     @classmethod
     def _calculate_service_risk(cls, findings: List[Dict[str, Any]]) -> float:
         """Calculate risk based on detected services"""
@@ -108,23 +201,21 @@ class RiskService:
         if not services:
             return 0.0
         
-        # High-risk services
-        high_risk_services = {
-            "ftp", "telnet", "rlogin", "rsh", "finger", "tftp",
-            "mysql", "postgresql", "mongodb", "redis", "elasticsearch",
-            "rdp", "vnc", "ssh", "smb"
-        }
-        
         risk_score = 0.0
         
         for service in services:
-            if any(hrs in service for hrs in high_risk_services):
-                risk_score += 20
-            else:
-                risk_score += 5
+            risk_score += cls.service_points(service)
         
         return min(100.0, risk_score)
     
+    @classmethod
+    def service_points(cls, service: str) -> int:
+        """Risk points of one (lowercased) service name"""
+        if any(hrs in service for hrs in cls.HIGH_RISK_SERVICES):
+            return 20
+        else:
+            return 5
+    
     @classmethod
     def _calculate_vulnerability_risk(cls, findings: List[Dict[str, Any]]) -> float:
         """Calculate risk based on vulnerabilities"""
@@ -140,15 +231,7 @@ class RiskService:
         
         for vuln in vulnerabilities:
             severity = vuln.get("severity", "low").lower()
-            
-            if severity == "critical":
-                risk_score += 40
-            elif severity == "high":
-                risk_score += 25
-            elif severity == "medium":
-                risk_score += 15
-            elif severity == "low":
-                risk_score += 5
+            risk_score += cls.SEVERITY_POINTS.get(severity, 0)
         
         return min(100.0, risk_score)
     
@@ -163,6 +246,11 @@ class RiskService:
             if f.get("finding_type") == "open_port"
         ])
         
+        return cls.exposure_for_open_ports(open_ports)
+    
+    @classmethod
+    def exposure_for_open_ports(cls, open_ports: int) -> float:
+        """Exposure risk of an asset with this many open port findings"""
         if open_ports == 0:
             return 0.0
         elif open_ports <= 3:
@@ -0,0 +1,122 @@
+import json
+import time
+from typing import Dict, Any, List, Optional
+from ..core.settings import settings
+from ..core.logging import get_logger
+from ..tasks.monitoring.task_metrics import SCAN_STATUS_CACHE_REQUESTS
+
+logger = get_logger(__name__)
+
+CACHE_KEY_PREFIX = "scan-status:"
+CACHE_INDEX_KEY = "scan-status:index"
+
+# Store an entry and keep the cache bounded: entries older than the TTL leave the index,
+# and above max_entries the oldest entries are evicted together with their values.
+STORE_SCRIPT = """
+redis.call('SET', ARGV[1] .. ARGV[2], ARGV[3], 'EX', ARGV[4])
+redis.call('ZADD', KEYS[1], ARGV[5], ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[5] - ARGV[4])
+local excess = redis.call('ZCARD', KEYS[1]) - tonumber(ARGV[6])
+if excess > 0 then
+    local evicted = redis.call('ZRANGE', KEYS[1], 0, excess - 1)
+    for _, scan_id in ipairs(evicted) do
+        redis.call('DEL', ARGV[1] .. scan_id)
+    end
+    redis.call('ZREMRANGEBYRANK', KEYS[1], 0, excess - 1)
+end
+return excess
+"""
+
+
+class ScanStatusCache:
+    """
+    Redis read-through cache of GET /scan/{scan_id} responses
+
+    Only scans in a terminal state (completed/failed) are cached - they no longer change
+    except for the target's risk score, which another scan of the same target may update,
+    so entries expire after ``scan_status_cache_ttl``. Statuses larger than
+    ``scan_status_cache_max_entry_bytes`` are not cached, which bounds the cache's memory
+    to max_entries * max_entry_bytes. Cache errors never fail a request, they are logged
+    and treated as a miss.
+    """
+
+    TERMINAL_STATUSES = ("completed", "failed")
+
+    def __init__(
+        self,
+        redis,
+        ttl: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        max_entry_bytes: Optional[int] = None
+    ):
+        self.redis = redis
+        self.ttl = settings.scan_status_cache_ttl if ttl is None else ttl
+        self.max_entries = settings.scan_status_cache_max_entries if max_entries is None else max_entries
+        self.max_entry_bytes = settings.scan_status_cache_max_entry_bytes if max_entry_bytes is None else max_entry_bytes
+
+    @property
+    def enabled(self) -> bool:
+        return self.redis is not None and self.ttl > 0 and self.max_entries > 0
+
+    async def get(self, scan_id: str) -> Optional[Dict[str, Any]]:
+        """Cached scan status, None on a miss"""
+        if not self.enabled:
+            return None
+        try:
+            cached = await self.redis.get(CACHE_KEY_PREFIX + scan_id)
+        except Exception as e:
+            logger.warning(f"Scan status cache read failed: {e}", scan_id=scan_id)
+            cached = None
+
+        SCAN_STATUS_CACHE_REQUESTS.labels(result="hit" if cached is not None else "miss").inc()
+        return json.loads(cached) if cached is not None else None
+
+    async def set(self, scan_id: str, scan_data: Dict[str, Any]):
+        """Cache a scan status if the scan is in a terminal state and its JSON fits max_entry_bytes"""
+        if not self.enabled or scan_data.get("status") not in self.TERMINAL_STATUSES:
+            return
+        value = json.dumps(scan_data, default=str)
+        if len(value) > self.max_entry_bytes:
+            logger.debug(f"Scan status too large to cache ({len(value)} bytes)", scan_id=scan_id)
+            return
+        try:
+            await self.redis.eval(
+                STORE_SCRIPT,
+                1,
+                CACHE_INDEX_KEY,
+                CACHE_KEY_PREFIX,
+                scan_id,
+                value,
+                self.ttl,
+                int(time.time()),
+                self.max_entries
+            )
+        except Exception as e:
+            logger.warning(f"Scan status cache write failed: {e}", scan_id=scan_id)
+
+    async def invalidate(self, scan_ids: List[str]):
+        """Drop cached statuses of scans whose state just changed"""
+        if self.redis is None or not scan_ids:
+            return
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.delete(*[CACHE_KEY_PREFIX + scan_id for scan_id in scan_ids])
+                pipe.zrem(CACHE_INDEX_KEY, *scan_ids)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Scan status cache invalidation failed: {e}", scan_count=len(scan_ids))
+
+    async def clear(self):
+        """Drop every cached status - after a change that affects all scans (e.g. a risk rescoring)"""
+        if self.redis is None:
+            return
+        try:
+            scan_ids = await self.redis.zrange(CACHE_INDEX_KEY, 0, -1)
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for start in range(0, len(scan_ids), 1000):
+                    pipe.delete(*[CACHE_KEY_PREFIX + (scan_id.decode() if isinstance(scan_id, bytes) else scan_id)
+                                  for scan_id in scan_ids[start:start + 1000]])
+                pipe.delete(CACHE_INDEX_KEY)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Scan status cache clear failed: {e}")
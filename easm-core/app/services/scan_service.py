@@ -1,34 +1,118 @@
-from typing import Dict, Any, List, Optional
+import base64
+import hashlib
+import json
+import orjson
+from typing import Dict, Any, AsyncIterator, List, Optional, Sequence, Tuple
 from uuid import uuid4
-from datetime import datetime
-from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from sqlalchemy import and_, func, insert, literal, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from ..core.settings import settings
 from ..core.logging import get_logger
-from ..models import Scan, Asset, Finding, RiskScore
+from ..models import Scan, Asset, Finding, RiskScore, AssetRiskAggregate
 from .risk_service import RiskService
+from .scan_cache import ScanStatusCache
+from .blob_store import BlobStore, get_blob_store
+from .finding_service import finding_to_dict
 
 logger = get_logger(__name__)
 
+# Optional, potentially large parts of the scan status response
+SCAN_STATUS_INCLUDES = ("results", "findings", "risk_score")
+
+def scan_status_etag(scan_id: str, version: str, variant: str = "") -> str:
+    """ETag of a GET /scan/{scan_id} response - ``variant`` tells apart the include/fields projections"""
+    return '"' + hashlib.sha1(f"{scan_id}:{version}:{variant}".encode()).hexdigest() + '"'
+
+def canonical_scan_options(value: Any) -> Any:
+    """Options in canonical form - key order, None values and the order of plain lists do not matter"""
+    if isinstance(value, dict):
+        return {key: canonical_scan_options(item) for key, item in sorted(value.items()) if item is not None}
+    if isinstance(value, (list, tuple)):
+        items = [canonical_scan_options(item) for item in value]
+        if all(isinstance(item, (str, int, float, bool)) for item in items):
+            # templates, severities, scripts... are sets
+            return sorted(items, key=lambda item: json.dumps(item))
+        return items
+    return getattr(value, "value", value)  # enums
+
+def scan_request_hash(target: str, scanner: str, options: Optional[Dict[str, Any]]) -> str:
+    """Identity of a scan request - equal for requests that would run the same scan"""
+    document = {
+        "target": target.strip(),
+        "scanner": getattr(scanner, "value", scanner),
+        "options": canonical_scan_options(options or {})
+    }
+    return hashlib.sha256(json.dumps(document, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+def blob_reference(results: Any) -> Optional[Dict[str, Any]]:
+    """Blob store reference of a stored results document, None if the document is stored inline"""
+    if isinstance(results, dict) and isinstance(results.get("blob_ref"), dict):
+        return results["blob_ref"]
+    return None
+
+def _advisory_lock_key(request_hash: str) -> int:
+    """Signed 64-bit pg_advisory_xact_lock key of a request hash"""
+    return int.from_bytes(bytes.fromhex(request_hash[:16]), "big", signed=True)
+
 class ScanService:
     """
     Service for managing scan operations with database persistence
     """
     
-    def __init__(self, db: Session = None):
+    def __init__(
+        self,
+        db: AsyncSession = None,
+        cache: Optional[ScanStatusCache] = None,
+        blob_store: Optional[BlobStore] = None
+    ):
         self.db = db
+        self.cache = cache
+        self.blob_store = blob_store or get_blob_store()
     
-    async def create_scan(self, target: str, scanner: str, options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Create a new scan request and save to database"""
+    async def create_scan(
+        self,
+        target: str,
+        scanner: str,
+        options: Optional[Dict[str, Any]] = None,
+        force: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Create a new scan request and save to database
+
+        Unless ``force`` is set, a request identical to a queued, running or freshly
+        completed scan (see ``_find_coalescable_scans``) creates nothing - the existing
+        scan is returned with ``coalesced`` set and must not be enqueued again.
+        """
         scan_id = str(uuid4())
+        request_hash = scan_request_hash(target, scanner, options)
         
         # Create database session if not provided
         if not self.db:
-            from ..database import SessionLocal
-            self.db = SessionLocal()
+            from ..database import AsyncSessionLocal
+            self.db = AsyncSessionLocal()
             should_close = True
         else:
             should_close = False
         
         try:
+            if settings.scan_coalescing and not force:
+                # Held until commit/rollback - concurrent identical requests cannot both miss
+                await self.db.execute(select(func.pg_advisory_xact_lock(_advisory_lock_key(request_hash))))
+                existing = (await self._find_coalescable_scans([request_hash])).get(request_hash)
+                if existing:
+                    await self.db.rollback()
+                    logger.info(
+                        f"Scan request coalesced into existing scan",
+                        scan_id=existing[0],
+                        status=existing[1],
+                        target=target,
+                        scanner=scanner
+                    )
+                    return self._coalesced_response(target, *existing)
+
             # Create new scan record
             scan_record = Scan(
                 id=scan_id,
@@ -37,12 +121,13 @@ class ScanService:
                 status="queued",
                 created_at=datetime.utcnow(),
                 options=options or {},
+                request_hash=request_hash,
             )
             
             # Save to database
             self.db.add(scan_record)
-            self.db.commit()
-            self.db.refresh(scan_record)
+            await self.db.commit()
+            await self.db.refresh(scan_record)
             
             logger.info(
                 f"Scan created in database",
@@ -54,28 +139,262 @@ class ScanService:
             return {
                 "scan_id": scan_id,
                 "status": "queued",
-                "message": f"Scan queued for target {target}"
+                "message": f"Scan queued for target {target}",
+                "coalesced": False
             }
             
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             logger.error(f"Failed to create scan: {e}")
             raise
         finally:
             if should_close:
-                self.db.close()
+                await self.db.close()
     
-    async def get_scan_status(self, scan_id: str) -> Optional[Dict[str, Any]]:
-        """Get scan status and results from database"""
+    async def find_coalesced_scan(
+        self,
+        target: str,
+        scanner: str,
+        options: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Response of the existing scan an identical request would be coalesced into, or None
+
+        A lock-free pre-check so callers can skip work meant for new scans only (admission
+        control) - ``create_scan`` repeats the lookup under the advisory lock.
+        """
+        if not settings.scan_coalescing:
+            return None
+
+        request_hash = scan_request_hash(target, scanner, options)
+
+        if not self.db:
+            from ..database import AsyncSessionLocal
+            self.db = AsyncSessionLocal()
+            should_close = True
+        else:
+            should_close = False
+
+        try:
+            existing = (await self._find_coalescable_scans([request_hash])).get(request_hash)
+            await self.db.rollback()
+            return self._coalesced_response(target, *existing) if existing else None
+        finally:
+            if should_close:
+                await self.db.close()
+
+    async def count_new_scans(self, requests: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Scans per scanner that ``create_scans_batch`` would create for these requests
+
+        Requests it would coalesce into an existing scan or an earlier item are not
+        counted (same lock-free lookup, so a concurrent request can still change it).
+        """
+        if not self.db:
+            from ..database import AsyncSessionLocal
+            self.db = AsyncSessionLocal()
+            should_close = True
+        else:
+            should_close = False
+
+        try:
+            hashes = [
+                scan_request_hash(request["target"], request["scanner"], request.get("options"))
+                for request in requests
+            ]
+            existing = set()
+            if settings.scan_coalescing:
+                existing = set(await self._find_coalescable_scans(
+                    list({request_hash for request, request_hash in zip(requests, hashes) if not request.get("force")})
+                ))
+                await self.db.rollback()
+
+            scan_counts: Dict[str, int] = {}
+            for request, request_hash in zip(requests, hashes):
+                if request_hash in existing and not request.get("force"):
+                    continue
+                scan_counts[request["scanner"]] = scan_counts.get(request["scanner"], 0) + 1
+                if settings.scan_coalescing:
+                    existing.add(request_hash)
+            return scan_counts
+        finally:
+            if should_close:
+                await self.db.close()
+
+    @staticmethod
+    def _coalesced_response(target: str, scan_id: str, scan_status: str) -> Dict[str, Any]:
+        return {
+            "scan_id": scan_id,
+            "status": scan_status,
+            "message": f"Identical scan already {scan_status} for target {target}",
+            "coalesced": True
+        }
+
+    async def create_scans_batch(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Create many scan records with a single bulk INSERT
+
+        Requests identical to a queued, running or freshly completed scan - or to an
+        earlier item of the batch - are coalesced into that scan unless they set ``force``
+        (best effort: unlike ``create_scan`` no lock is taken per request).
+
+        Args:
+            requests: List of dicts with target, scanner, options and optionally force
+
+        Returns:
+            List of scans (scan_id, target, scanner, options, status, coalesced) in request
+            order - coalesced ones already exist and must not be enqueued again
+        """
+        if not requests:
+            return []
+
+        if not self.db:
+            from ..database import AsyncSessionLocal
+            self.db = AsyncSessionLocal()
+            should_close = True
+        else:
+            should_close = False
+
+        try:
+            created_at = datetime.utcnow()
+            hashes = [
+                scan_request_hash(request["target"], request["scanner"], request.get("options"))
+                for request in requests
+            ]
+            existing = {}
+            if settings.scan_coalescing:
+                existing = await self._find_coalescable_scans(
+                    list({request_hash for request, request_hash in zip(requests, hashes) if not request.get("force")})
+                )
+
+            rows = []
+            scans = []
+            for request, request_hash in zip(requests, hashes):
+                if request_hash in existing and not request.get("force"):
+                    scan_id, scan_status = existing[request_hash]
+                    scans.append({
+                        "scan_id": scan_id,
+                        "target": request["target"],
+                        "scanner": request["scanner"],
+                        "options": request.get("options") or {},
+                        "status": scan_status,
+                        "coalesced": True
+                    })
+                    continue
+
+                row = {
+                    "id": str(uuid4()),
+                    "target": request["target"],
+                    "scanner": request["scanner"],
+                    "status": "queued",
+                    "created_at": created_at,
+                    "options": request.get("options") or {},
+                    "request_hash": request_hash,
+                }
+                rows.append(row)
+                scans.append({
+                    "scan_id": row["id"],
+                    "target": row["target"],
+                    "scanner": row["scanner"],
+                    "options": row["options"],
+                    "status": "queued",
+                    "coalesced": False
+                })
+                if settings.scan_coalescing:
+                    # Later identical items of this batch reuse this scan
+                    existing[request_hash] = (row["id"], "queued")
+
+            if rows:
+                # executemany - one statement for the whole batch
+                await self.db.execute(insert(Scan), rows)
+                await self.db.commit()
+
+            logger.info(f"Batch of scans created in database", scan_count=len(rows), coalesced=len(scans) - len(rows))
+
+            return scans
+
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Failed to create scan batch: {e}")
+            raise
+        finally:
+            if should_close:
+                await self.db.close()
+
+    async def _find_coalescable_scans(self, request_hashes: List[str]) -> Dict[str, Tuple[str, str]]:
+        """
+        Newest scan per request hash that an identical request can reuse: (scan_id, status)
+
+        Reusable are queued/running scans created within SCAN_COALESCE_ACTIVE_MAX_AGE (older
+        ones are presumed stuck) and scans completed within SCAN_COALESCE_FRESH_SECONDS.
+        Failed scans are never reused.
+        """
+        if not request_hashes:
+            return {}
+
+        now = datetime.utcnow()
+        rows = (await self.db.execute(
+            select(Scan.request_hash, Scan.id, Scan.status)
+            .where(
+                Scan.request_hash.in_(request_hashes),
+                or_(
+                    and_(
+                        Scan.status.in_(("queued", "running")),
+                        Scan.created_at >= now - timedelta(seconds=settings.scan_coalesce_active_max_age)
+                    ),
+                    and_(
+                        Scan.status == "completed",
+                        Scan.completed_at >= now - timedelta(seconds=settings.scan_coalesce_fresh_seconds)
+                    )
+                )
+            )
+            .order_by(Scan.request_hash, Scan.created_at.desc())
+            .distinct(Scan.request_hash)
+        )).all()
+        return {row.request_hash: (row.id, row.status) for row in rows}
+
+    async def get_cached_scan_status(self, scan_id: str, include: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        """Scan status from the status cache (completed/failed scans only), None on a miss - no database access"""
+        if not self.cache:
+            return None
+        cached = await self.cache.get(scan_id)
+        if cached is None or include is None or set(include) == set(SCAN_STATUS_INCLUDES):
+            return cached
+        return self._project_scan_status(cached, include)
+
+    async def get_scan_status(self, scan_id: str, include: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get scan status and results - from the status cache for completed/failed scans, else from the database
+
+        ``include`` picks the parts of SCAN_STATUS_INCLUDES to return (None = all of them).
+        Parts that are not included are neither queried nor read from disk - results is a
+        deferred column and findings / risk score are separate queries. Full statuses
+        carry ``version`` (see ``get_scan_version``).
+        """
+        include = SCAN_STATUS_INCLUDES if include is None else tuple(include)
+        full = set(include) == set(SCAN_STATUS_INCLUDES)
+        
+        cached = await self.get_cached_scan_status(scan_id, include)
+        if cached is not None:
+            return cached
+        
         if not self.db:
-            from ..database import SessionLocal
-            self.db = SessionLocal()
+            from ..database import AsyncSessionLocal
+            self.db = AsyncSessionLocal()
             should_close = True
         else:
             should_close = False
             
         try:
-            scan = self.db.query(Scan).filter(Scan.id == scan_id).first()
+            columns = [
+                Scan.id, Scan.target, Scan.scanner, Scan.status, Scan.progress,
+                Scan.created_at, Scan.started_at, Scan.completed_at, Scan.error_message, Scan.updated_at
+            ]
+            if full:
+                columns.append(Scan.options)
+            if "results" in include:
+                columns.append(Scan.results)
+            scan = await self.db.get(Scan, scan_id, options=[load_only(*columns)])
             
             if not scan:
                 logger.warning(f"Scan not found in database: {scan_id}")
@@ -90,34 +409,31 @@ class ScanService:
                 "created_at": scan.created_at.isoformat() if scan.created_at else None,
                 "started_at": scan.started_at.isoformat() if scan.started_at else None,
                 "completed_at": scan.completed_at.isoformat() if scan.completed_at else None,
-                "options": scan.options,
-                "results": scan.results,
                 "error": scan.error_message,  # Map to error as expected by ScanStatus schema
-                "progress": 100 if scan.status == "completed" else (50 if scan.status == "running" else 0),
-                "findings": None,  # Initialize with None, will be populated if completed
-                "risk_score": None  # Initialize with None, will be populated if completed
+                "progress": self._get_progress(scan),
             }
+            if full:
+                scan_data["options"] = scan.options
+            if "results" in include:
+                scan_data["results"] = await self._load_results(scan.results)
+            if "findings" in include:
+                scan_data["findings"] = None  # populated if completed
+            if "risk_score" in include:
+                scan_data["risk_score"] = None  # populated if completed
             
-            # Get findings if scan is completed
-            if scan.status == "completed":
-                findings = self.db.query(Finding).filter(Finding.scan_id == scan_id).all()
-                scan_data["findings"] = [
-                    {
-                        "id": f.id,
-                        "finding_type": f.finding_type,
-                        "severity": f.severity,
-                        "title": f.title,
-                        "description": f.description,
-                        "port": f.port,
-                        "service": f.service,
-                        "finding_metadata": f.finding_metadata
-                    }
-                    for f in findings
-                ]
-                
+            # Get findings if scan is completed (or running - streamed scanners publish them incrementally)
+            if "findings" in include and scan.status in ("completed", "running"):
+                findings = (await self.db.execute(
+                    select(Finding).where(Finding.scan_id == scan_id)
+                )).scalars().all()
+                scan_data["findings"] = [finding_to_dict(f) for f in findings]
+            
+            if "risk_score" in include and scan.status == "completed":
                 # Get risk score for target
                 target = scan.target
-                risk_score = self.db.query(RiskScore).filter(RiskScore.target == target).first()
+                risk_score = (await self.db.execute(
+                    select(RiskScore).where(RiskScore.target == target).limit(1)
+                )).scalars().first()
                 if risk_score:
                     scan_data["risk_score"] = {
                         "score": risk_score.score,
@@ -126,6 +442,15 @@ class ScanService:
                         "calculated_at": risk_score.calculated_at.isoformat() if risk_score.calculated_at else None
                     }
             
+            if full:
+                risk_score = scan_data["risk_score"]
+                scan_data["version"] = self._scan_version(
+                    scan.updated_at, scan.status, risk_score["calculated_at"] if risk_score else None
+                )
+                # Results read from the blob store are never cached - only inline documents
+                if self.cache and not blob_reference(scan.results):
+                    await self.cache.set(scan_id, scan_data)
+            
             return scan_data
             
         except Exception as e:
@@ -133,19 +458,229 @@ class ScanService:
             raise
         finally:
             if should_close:
-                self.db.close()
+                await self.db.close()
+
+    async def get_scan_results(self, scan_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Raw results document of a scan (without findings or risk score), None if the scan does not exist
+
+        The document is returned as stored on the row - for results offloaded to the blob
+        store that is the summary with ``blob_ref``; stream the full document with
+        ``stream_results``.
+        """
+        if not self.db:
+            from ..database import AsyncSessionLocal
+            self.db = AsyncSessionLocal()
+            should_close = True
+        else:
+            should_close = False
+
+        try:
+            row = (await self.db.execute(
+                select(Scan.id, Scan.status, Scan.results).where(Scan.id == scan_id)
+            )).first()
+            if row is None:
+                return None
+            return {"scan_id": row.id, "status": row.status, "results": row.results}
+
+        except Exception as e:
+            logger.error(f"Failed to get scan results: {e}")
+            raise
+        finally:
+            if should_close:
+                await self.db.close()
+
+    async def list_scans(
+        self,
+        target: Optional[str] = None,
+        scanner: Optional[str] = None,
+        statuses: Optional[Sequence[str]] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        include: Sequence[str] = ()
+    ) -> Dict[str, Any]:
+        """
+        List scans newest first with keyset pagination on (created_at, id)
+
+        Each page is one index range scan of ``limit + 1`` rows - no OFFSET, so the cost
+        does not grow with the page number. The options/results JSON columns are only
+        read when named in ``include``. Raises ValueError for a malformed cursor.
+
+        Returns:
+            Dict with items and next_cursor (None on the last page)
+        """
+        if not self.db:
+            from ..database import AsyncSessionLocal
+            self.db = AsyncSessionLocal()
+            should_close = True
+        else:
+            should_close = False
+
+        try:
+            columns = [
+                Scan.id, Scan.target, Scan.scanner, Scan.status, Scan.progress,
+                Scan.created_at, Scan.started_at, Scan.completed_at, Scan.error_message
+            ]
+            if "options" in include:
+                columns.append(Scan.options)
+            if "results" in include:
+                columns.append(Scan.results)
+
+            query = select(*columns)
+            if target:
+                query = query.where(Scan.target == target)
+            if scanner:
+                query = query.where(Scan.scanner == scanner)
+            if statuses:
+                query = query.where(Scan.status.in_(statuses))
+            if created_after:
+                query = query.where(Scan.created_at >= created_after)
+            if created_before:
+                query = query.where(Scan.created_at < created_before)
+            if cursor:
+                cursor_created_at, cursor_id = self._decode_scan_cursor(cursor)
+                query = query.where(tuple_(Scan.created_at, Scan.id) < tuple_(cursor_created_at, cursor_id))
+
+            rows = (await self.db.execute(
+                query.order_by(Scan.created_at.desc(), Scan.id.desc()).limit(limit + 1)
+            )).all()
+
+            items = []
+            for row in rows[:limit]:
+                item = {
+                    "scan_id": row.id,
+                    "target": row.target,
+                    "scanner": row.scanner,
+                    "status": row.status,
+                    "progress": self._get_progress(row),
+                    "created_at": row.created_at.isoformat() if row.created_at else None,
+                    "started_at": row.started_at.isoformat() if row.started_at else None,
+                    "completed_at": row.completed_at.isoformat() if row.completed_at else None,
+                    "error": row.error_message
+                }
+                if "options" in include:
+                    item["options"] = row.options
+                if "results" in include:
+                    item["results"] = row.results
+                items.append(item)
+
+            next_cursor = None
+            if len(rows) > limit:
+                last = rows[limit - 1]
+                next_cursor = self._encode_scan_cursor(last.created_at, last.id)
+
+            return {"items": items, "next_cursor": next_cursor}
+
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to list scans: {e}")
+            raise
+        finally:
+            if should_close:
+                await self.db.close()
+
+    def _project_scan_status(self, scan_data: Dict[str, Any], include: Sequence[str]) -> Dict[str, Any]:
+        """Drop the optional parts of a full scan status that were not asked for"""
+        return {
+            key: value for key, value in scan_data.items()
+            if key != "options" and (key not in SCAN_STATUS_INCLUDES or key in include)
+        }
+
+    def _encode_scan_cursor(self, created_at: datetime, scan_id: str) -> str:
+        """Opaque cursor pointing after the given scan"""
+        raw = json.dumps([created_at.isoformat(), scan_id], separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def _decode_scan_cursor(self, cursor: str) -> Tuple[datetime, str]:
+        """Inverse of _encode_scan_cursor - ValueError for anything it did not produce"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            created_at, scan_id = json.loads(raw)
+            return datetime.fromisoformat(created_at), str(scan_id)
+        except Exception:
+            raise ValueError("Invalid cursor")
+
+    async def get_scan_version(self, scan_id: str) -> Optional[str]:
+        """
+        Version of the scan's status, None if the scan does not exist
+
+        A single primary key lookup of the scan's updated_at - bumped by every change of
+        the scan, streamed findings included - and, for completed scans, the calculation
+        time of the target's risk score, which is part of their status.
+        """
+        if not self.db:
+            from ..database import AsyncSessionLocal
+            self.db = AsyncSessionLocal()
+            should_close = True
+        else:
+            should_close = False
+
+        try:
+            risk_calculated_at = (
+                select(RiskScore.calculated_at).where(RiskScore.target == Scan.target).limit(1).scalar_subquery()
+            )
+            row = (await self.db.execute(
+                select(Scan.status, Scan.updated_at, risk_calculated_at).where(Scan.id == scan_id)
+            )).first()
+
+            if row is None:
+                return None
+
+            status, updated_at, risk_at = row
+            return self._scan_version(updated_at, status, risk_at.isoformat() if risk_at else None)
+
+        except Exception as e:
+            logger.error(f"Failed to get scan version: {e}")
+            raise
+        finally:
+            if should_close:
+                await self.db.close()
+
+    @staticmethod
+    def _scan_version(updated_at: Optional[datetime], status: str, risk_calculated_at: Optional[str]) -> str:
+        # The risk score is only part of the status of completed scans
+        return f"{updated_at.isoformat() if updated_at else None}:{status}:{risk_calculated_at if status == 'completed' else None}"
+
+    async def get_scan_states(self, scan_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Status and progress of many scans with one query - scans that do not exist are left out"""
+        if not self.db:
+            from ..database import AsyncSessionLocal
+            self.db = AsyncSessionLocal()
+            should_close = True
+        else:
+            should_close = False
+
+        try:
+            rows = await self.db.execute(
+                select(Scan.id, Scan.status, Scan.progress).where(Scan.id.in_(scan_ids))
+            )
+            return {
+                scan.id: {"status": scan.status, "progress": self._get_progress(scan)}
+                for scan in rows
+            }
+
+        except Exception as e:
+            logger.error(f"Failed to get scan states: {e}")
+            raise
+        finally:
+            if should_close:
+                await self.db.close()
 
     async def complete_scan(self, scan_id: str, results: Dict[str, Any]) -> bool:
-        """Mark scan as completed with results"""
+        """Mark scan as completed with results - scan, findings, asset and risk in one transaction"""
         if not self.db:
-            from ..database import SessionLocal
-            self.db = SessionLocal()
+            from ..database import AsyncSessionLocal
+            self.db = AsyncSessionLocal()
             should_close = True
         else:
             should_close = False
             
         try:
-            scan = self.db.query(Scan).filter(Scan.id == scan_id).first()
+            # Row lock - serializes the completion with partial results of the same scan
+            scan = await self.db.get(Scan, scan_id, with_for_update=True)
             
             if not scan:
                 logger.warning(f"Scan not found for completion: {scan_id}")
@@ -154,35 +689,203 @@ class ScanService:
             # Update scan record
             scan.status = "completed"
             scan.completed_at = datetime.utcnow()
-            scan.results = results
-            
-            self.db.commit()
+            scan.results = await self._stored_results(results)
 
-            # Process findings and calculate risk
+            # Findings, asset and risk score go into the same transaction as the scan update
             await self._process_scan_results(scan_id, results)
             
+            await self.db.commit()
+            await self._invalidate_cached_status([scan_id])
+            
             logger.info(f"Scan completed in database", scan_id=scan_id)
             return True
             
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             logger.error(f"Failed to complete scan: {e}")
             raise
         finally:
             if should_close:
-                self.db.close()
+                await self.db.close()
+
+    async def process_results_batch(self, items: List[Dict[str, Any]]) -> Dict[str, bool]:
+        """
+        Persist many scanner results (completions and failures) in one transaction
+
+        Each item is {"scan_id", "status": "completed" | "failed", "results" | "error"}.
+        All scans are loaded with one SELECT and the findings of every completed scan go
+        into one bulk INSERT; asset and risk upserts run per scan in savepoints. Items
+        repeating a scan_id are ignored. Returns scan_id -> found. Any error rolls back
+        the whole batch and is raised - callers retry the items one by one.
+        """
+        if not self.db:
+            from ..database import AsyncSessionLocal
+            self.db = AsyncSessionLocal()
+            should_close = True
+        else:
+            should_close = False
+
+        # Duplicate deliveries of a result must not insert its findings or score the asset
+        # twice - the first item of each scan wins
+        unique_items: Dict[str, Dict[str, Any]] = {}
+        for item in items:
+            unique_items.setdefault(item["scan_id"], item)
+        items = list(unique_items.values())
+
+        start_time = datetime.utcnow()
+        try:
+            scan_ids = list(unique_items)
+            # Row locks (in id order - batches cannot deadlock) serialize completions with
+            # partial results of the same scans
+            scans = {
+                scan.id: scan
+                for scan in (await self.db.execute(
+                    select(Scan).where(Scan.id.in_(scan_ids)).order_by(Scan.id).with_for_update()
+                )).scalars()
+            }
+
+            now = datetime.utcnow()
+            outcomes: Dict[str, bool] = {}
+            completed = []  # (scan_id, results, finding_rows)
+
+            for item in items:
+                scan = scans.get(item["scan_id"])
+                outcomes[item["scan_id"]] = scan is not None
+                if scan is None:
+                    logger.warning(f"Scan not found for batched result: {item['scan_id']}")
+                    continue
+
+                scan.completed_at = now
+                if item["status"] == "completed":
+                    results = item.get("results") or {}
+                    scan.status = "completed"
+                    scan.results = await self._stored_results(results)
+                    completed.append((scan.id, results, self._build_finding_rows(scan.id, results)))
+                else:
+                    scan.status = "failed"
+                    scan.error_message = item.get("error", "Unknown error")
+
+            finding_rows = [row for _, _, rows in completed for row in rows]
+            if finding_rows:
+                await self.db.execute(insert(Finding), finding_rows)
+
+            for scan_id, results, rows in completed:
+                await self._update_asset_and_risk(scan_id, results, rows)
+
+            await self.db.commit()
+            await self._invalidate_cached_status([scan_id for scan_id, found in outcomes.items() if found])
+
+            logger.info(
+                f"Persisted scan result batch",
+                batch_size=len(items),
+                finding_count=len(finding_rows),
+                processing_time=f"{(datetime.utcnow() - start_time).total_seconds():.2f}s"
+            )
+            return outcomes
+
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Failed to persist scan result batch: {e}")
+            raise
+        finally:
+            if should_close:
+                await self.db.close()
+
+    async def add_partial_results(self, scan_id: str, results: Dict[str, Any]) -> bool:
+        """
+        Store a batch of findings published by a scanner while the scan is still running
+
+        Findings are bulk-inserted and the scan is moved to running. Asset and risk score
+        are only updated once the scan completes - a batch that arrives after the completion
+        rescores the asset itself.
+        """
+        if not self.db:
+            from ..database import AsyncSessionLocal
+            self.db = AsyncSessionLocal()
+            should_close = True
+        else:
+            should_close = False
+
+        try:
+            # Row lock - a batch either lands before the completion scores the scan or sees it completed
+            scan = await self.db.get(Scan, scan_id, with_for_update=True)
+
+            if not scan:
+                logger.warning(f"Scan not found for partial results: {scan_id}")
+                return False
+
+            # A late batch must not move a finished scan back to running
+            if scan.status in ("queued", "running"):
+                scan.status = "running"
+                if not scan.started_at:
+                    scan.started_at = datetime.utcnow()
+
+            finding_rows = self._build_finding_rows(scan_id, results)
+            if finding_rows:
+                await self.db.execute(insert(Finding), finding_rows)
+                # New findings change the scan's status response even when the row does not
+                scan.updated_at = func.now()
+                if scan.status == "completed":
+                    # Late batch - the completion already scored the asset without it
+                    await self._rescore_streamed_scan(scan, results.get("target") or scan.target)
+
+            await self.db.commit()
+            if finding_rows and scan.status == "completed":
+                await self._invalidate_cached_status([scan_id])
+
+            logger.info(f"Stored partial scan results", scan_id=scan_id, finding_count=len(finding_rows))
+            return True
+
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Failed to store partial scan results: {e}")
+            raise
+        finally:
+            if should_close:
+                await self.db.close()
+
+    async def update_scan_progress(self, scan_id: str, progress: int) -> bool:
+        """Mark scan as running and store its progress (0-100)"""
+        if not self.db:
+            from ..database import AsyncSessionLocal
+            self.db = AsyncSessionLocal()
+            should_close = True
+        else:
+            should_close = False
+
+        try:
+            # Single UPDATE - progress never moves backwards and finished scans are left alone
+            result = await self.db.execute(
+                update(Scan)
+                .where(Scan.id == scan_id, Scan.status.in_(["queued", "running"]))
+                .values(
+                    status="running",
+                    started_at=func.coalesce(Scan.started_at, datetime.utcnow()),
+                    progress=func.greatest(func.coalesce(Scan.progress, 0), progress)
+                )
+            )
+            await self.db.commit()
+            return result.rowcount > 0
+
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Failed to update scan progress: {e}")
+            raise
+        finally:
+            if should_close:
+                await self.db.close()
 
     async def fail_scan(self, scan_id: str, error: str) -> bool:
         """Mark scan as failed"""
         if not self.db:
-            from ..database import SessionLocal
-            self.db = SessionLocal()
+            from ..database import AsyncSessionLocal
+            self.db = AsyncSessionLocal()
             should_close = True
         else:
             should_close = False
             
         try:
-            scan = self.db.query(Scan).filter(Scan.id == scan_id).first()
+            scan = await self.db.get(Scan, scan_id)
             
             if not scan:
                 logger.warning(f"Scan not found for failure: {scan_id}")
@@ -192,76 +895,83 @@ class ScanService:
             scan.completed_at = datetime.utcnow()
             scan.error_message = error
             
-            self.db.commit()
+            await self.db.commit()
+            await self._invalidate_cached_status([scan_id])
 
             logger.error(f"Scan failed in database", scan_id=scan_id, error=error)
             return True
             
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             logger.error(f"Failed to mark scan as failed: {e}")
             raise
         finally:
             if should_close:
-                self.db.close()
+                await self.db.close()
+
+    async def fail_scans(self, scan_ids: List[str], error: str) -> int:
+        """Mark many scans as failed with a single UPDATE"""
+        if not scan_ids:
+            return 0
+
+        if not self.db:
+            from ..database import AsyncSessionLocal
+            self.db = AsyncSessionLocal()
+            should_close = True
+        else:
+            should_close = False
+
+        try:
+            result = await self.db.execute(
+                update(Scan)
+                .where(Scan.id.in_(scan_ids))
+                .values(status="failed", completed_at=datetime.utcnow(), error_message=error)
+            )
+            await self.db.commit()
+            await self._invalidate_cached_status(scan_ids)
+
+            logger.error(f"Scans failed in database", scan_count=result.rowcount, error=error)
+            return result.rowcount
+
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Failed to mark scans as failed: {e}")
+            raise
+        finally:
+            if should_close:
+                await self.db.close()
+
+    async def _invalidate_cached_status(self, scan_ids: List[str]):
+        """Drop cached GET /scan/{scan_id} responses after a scan reached a (new) terminal state"""
+        if self.cache:
+            await self.cache.invalidate(scan_ids)
 
     async def _process_scan_results(self, scan_id: str, results: Dict[str, Any]):
-        """Process scan results and extract findings"""
+        """
+        Process scan results and extract findings
+
+        Runs inside the caller's transaction - nothing is committed here. Findings are
+        written with one bulk INSERT; asset and risk score updates run in savepoints so
+        a failure there does not undo the scan and its findings.
+        """
         start_time = datetime.utcnow()
         try:
-            # Create findings from scan results
-            open_ports = results.get("open_ports", [])
-            services = results.get("services", {})
-            target = results.get("target", "unknown")
-            scan_findings = []
-            
-            for port in open_ports:
-                service_info = services.get(str(port), "unknown")
-                
-                # Extract service name from service info (handle both string and dict formats)
-                if isinstance(service_info, dict):
-                    service_name = service_info.get("name", "unknown")
-                else:
-                    service_name = service_info if service_info else "unknown"
-                
-                finding = Finding(
-                    id=str(uuid4()),
-                    scan_id=scan_id,
-                    target=target,
-                    finding_type="open_port",
-                    severity="medium",
-                    title=f"Open port {port}",
-                    description=f"Port {port} is open and running {service_name}",
-                    port=port,
-                    service=service_name,
-                    created_at=datetime.utcnow(),
-                    finding_metadata={"scanner": results.get("scanner")}
-                )
-                
-                self.db.add(finding)
-                scan_findings.append({
-                    "finding_type": "open_port",
-                    "severity": "medium",
-                    "port": port,
-                    "service": service_name
-                })
+            finding_rows = self._build_finding_rows(scan_id, results)
+            
+            if finding_rows:
+                # executemany - batched multi-row INSERT instead of one ORM object per port
+                await self.db.execute(insert(Finding), finding_rows)
             
-            self.db.commit()
             logger.info(
-                f"Created {len(open_ports)} findings for scan {scan_id}",
+                f"Created {len(finding_rows)} findings for scan {scan_id}",
                 scan_id=scan_id,
-                finding_count=len(open_ports),
+                finding_count=len(finding_rows),
                 processing_time=f"{(datetime.utcnow() - start_time).total_seconds():.2f}s"
             )
             
-            # Create or update asset
-            await self._create_or_update_asset(target, results)
-            
-            # Calculate risk score and save to database
-            await self._calculate_and_save_risk_score(target, scan_findings)
+            await self._update_asset_and_risk(scan_id, results, finding_rows)
             
         except Exception as e:
-            self.db.rollback()
             logger.error(
                 f"Failed to process scan results",
                 error=str(e),
@@ -269,9 +979,183 @@ class ScanService:
                 processing_time=f"{(datetime.utcnow() - start_time).total_seconds():.2f}s"
             )
             raise
+    
+    async def _update_asset_and_risk(self, scan_id: str, results: Dict[str, Any], finding_rows: List[Dict[str, Any]]):
+        """Upsert the scanned asset and its risk score after the scan's findings were inserted (no commit)"""
+        target = results.get("target", "unknown")
+        
+        if results.get("streaming"):
+            # Earlier batches were stored by add_partial_results - score the whole scan
+            stored = await self.db.execute(
+                select(Finding.finding_type, Finding.severity, Finding.port, Finding.service)
+                .where(Finding.scan_id == scan_id)
+            )
+            scan_findings = [dict(row._mapping) for row in stored]
+            expected = (results.get("stats") or {}).get("total_findings")
+            if expected is not None and len(scan_findings) < expected:
+                # Batches still queued are stored (and rescore the asset) when they arrive
+                logger.warning(
+                    f"Streamed scan completed before all of its partial results were stored",
+                    scan_id=scan_id,
+                    stored=len(scan_findings),
+                    expected=expected,
+                    batches_sent=results.get("batches_sent")
+                )
+        else:
+            scan_findings = [
+                {
+                    "finding_type": row["finding_type"],
+                    "severity": row["severity"],
+                    "port": row["port"],
+                    "service": row["service"]
+                }
+                for row in finding_rows
+            ]
+        
+        # Create or update asset
+        await self._create_or_update_asset(target, results)
+        
+        # Fold the scan into the asset's cross-scanner aggregate and score the asset from it
+        scanners = await self._update_risk_aggregate(target, results.get("scanner") or "unknown", scan_id, scan_findings)
+        if scanners is not None:
+            await self._calculate_and_save_risk_score(target, scanners)
+    
+    async def _rescore_streamed_scan(self, scan: Scan, target: str):
+        """Fold all stored findings of a completed streamed scan into the asset's risk aggregate again (no commit)"""
+        scanners = (await self.db.execute(
+            select(AssetRiskAggregate.scanners).where(AssetRiskAggregate.target == target)
+        )).scalar()
+        scanner_slice = (scanners or {}).get(scan.scanner)
+        if scanner_slice and scanner_slice.get("scan_id") != scan.id:
+            # A newer scan of this scanner already replaced the slice
+            return
+
+        stored = await self.db.execute(
+            select(Finding.finding_type, Finding.severity, Finding.port, Finding.service)
+            .where(Finding.scan_id == scan.id)
+        )
+        scanners = await self._update_risk_aggregate(
+            target, scan.scanner, scan.id, [dict(row._mapping) for row in stored]
+        )
+        if scanners is not None:
+            await self._calculate_and_save_risk_score(target, scanners)
+        logger.info(f"Rescored asset after late partial results", scan_id=scan.id, target=target)
+
+    def stream_results(self, reference: Dict[str, Any]) -> AsyncIterator[bytes]:
+        """JSON of a results document offloaded to the blob store, decompressed chunk by chunk"""
+        if self.blob_store is None:
+            raise KeyError(reference["key"])
+        return self.blob_store.stream(reference["key"])
+
+    async def _stored_results(self, results: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Results document kept on the scan row
+
+        Documents of at least BLOB_STORE_MIN_BYTES are written to the blob store instead;
+        the row keeps their scalar fields, the sizes of their lists and objects ("counts")
+        and the blob reference ("blob_ref"). When the store cannot be written the document
+        stays on the row.
+        """
+        if results.get("streaming"):
+            # Streamed findings already live in the findings table - keep only the summary
+            results = {k: v for k, v in results.items() if k != "vulnerabilities"}
+        if self.blob_store is None:
+            return results
+
+        try:
+            data = orjson.dumps(results, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            return results  # not representable by orjson (e.g. huge integers) - the JSON column copes
+        if len(data) < settings.blob_store_min_bytes:
+            return results
+
+        try:
+            reference = await self.blob_store.put(data)
+        except Exception as e:
+            logger.warning(f"Failed to write scan results to the blob store, keeping them inline: {e}")
+            return results
+
+        summary = {k: v for k, v in results.items() if not isinstance(v, (dict, list))}
+        summary["counts"] = {k: len(v) for k, v in results.items() if isinstance(v, (dict, list))}
+        summary["blob_ref"] = reference
+        return summary
+
+    async def _load_results(self, stored: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Full results document of a scan row - read back from the blob store when it was offloaded"""
+        reference = blob_reference(stored)
+        if reference is None or self.blob_store is None:
+            return stored
+        try:
+            return orjson.loads(await self.blob_store.get(reference["key"]))
+        except Exception as e:
+            # The summary on the row is still better than no response at all
+            logger.error(f"Failed to read scan results from the blob store: {e}", blob=reference["key"])
+            return stored
+    
+    def _build_finding_rows(self, scan_id: str, results: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Build finding rows (plain dicts for bulk insert) from scanner results"""
+        open_ports = results.get("open_ports", [])
+        services = results.get("services", {})
+        target = results.get("target", "unknown")
+        created_at = datetime.utcnow()
+        metadata = {"scanner": results.get("scanner")}
+        rows = []
+        
+        for port in open_ports:
+            service_info = services.get(str(port), "unknown")
+            
+            # Extract service name from service info (handle both string and dict formats)
+            if isinstance(service_info, dict):
+                service_name = service_info.get("name", "unknown")
+            else:
+                service_name = service_info if service_info else "unknown"
+            
+            rows.append({
+                "id": str(uuid4()),
+                "scan_id": scan_id,
+                "target": target,
+                "finding_type": "open_port",
+                "severity": "medium",
+                "title": f"Open port {port}",
+                "description": f"Port {port} is open and running {service_name}",
+                "port": port,
+                "service": service_name,
+                "created_at": created_at,
+                "verified": False,
+                "finding_metadata": metadata
+            })
+        
+        for vuln in results.get("vulnerabilities", []):
+            # nuclei findings - the raw template match ("details") stays out of the row
+            rows.append({
+                "id": str(uuid4()),
+                "scan_id": scan_id,
+                "target": target,
+                "finding_type": "vulnerability",
+                "severity": str(vuln.get("severity") or "unknown").lower(),
+                "title": vuln.get("name") or vuln.get("id") or "Unknown Vulnerability",
+                "description": vuln.get("description"),
+                "port": None,
+                "service": None,
+                "created_at": created_at,
+                "verified": False,
+                "finding_metadata": {
+                    "scanner": results.get("scanner"),
+                    "template_id": vuln.get("id"),
+                    "url": vuln.get("url")
+                }
+            })
+        
+        return rows
             
     async def _create_or_update_asset(self, target: str, results: Dict[str, Any]):
-        """Create or update asset based on scan results"""
+        """
+        Create or update asset based on scan results (in a savepoint, no commit)
+
+        Single INSERT ... ON CONFLICT (target) DO UPDATE - concurrent completions for the
+        same target cannot create duplicates. On update the last-scan keys are merged
+        into the existing JSONB metadata.
+        """
         try:
             # Determine asset type based on target format
             import re
@@ -282,92 +1166,127 @@ class ScanService:
             elif re.match(r'^[a-zA-Z0-9][-a-zA-Z0-9.]+\.[a-zA-Z]{2,}$', target):
                 asset_type = "domain"
             
-            # Check if asset exists
-            asset = self.db.query(Asset).filter(Asset.target == target).first()
-            
-            if asset:
-                # Update existing asset
-                asset.updated_at = datetime.utcnow()
-                asset.asset_metadata = {
-                    **(asset.asset_metadata or {}),
-                    "last_scan_id": results.get("scan_id"),
-                    "last_scan_time": datetime.utcnow().isoformat()
+            now = datetime.utcnow()
+            stmt = pg_insert(Asset).values(
+                id=str(uuid4()),
+                target=target,
+                asset_type=asset_type,
+                status="active",
+                created_at=now,
+                updated_at=now,
+                asset_metadata={
+                    "first_scan_id": results.get("scan_id"),
+                    "first_scan_time": now.isoformat(),
+                    "discovery_method": results.get("scanner", "unknown")
                 }
-                logger.info(f"Updated asset in database", target=target, asset_type=asset_type)
-            else:
-                # Create new asset
-                asset = Asset(
-                    id=str(uuid4()),
-                    target=target,
-                    asset_type=asset_type,
-                    status="active",
-                    created_at=datetime.utcnow(),
-                    asset_metadata={
-                        "first_scan_id": results.get("scan_id"),
-                        "first_scan_time": datetime.utcnow().isoformat(),
-                        "discovery_method": results.get("scanner", "unknown")
-                    }
-                )
-                self.db.add(asset)
-                logger.info(
-                    f"Created new asset in database",
-                    target=target,
-                    asset_type=asset_type,
-                    asset_id=asset.id
-                )
-                
-            self.db.commit()
+            )
+            last_scan = {
+                "last_scan_id": results.get("scan_id"),
+                "last_scan_time": now.isoformat()
+            }
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Asset.target],
+                set_={
+                    "updated_at": now,
+                    "asset_metadata": func.coalesce(Asset.asset_metadata, literal({}, JSONB)).op(
+                        "||", return_type=JSONB
+                    )(literal(last_scan, JSONB))
+                }
+            )
+            
+            async with self.db.begin_nested():
+                await self.db.execute(stmt)
+            
+            logger.info(f"Upserted asset in database", target=target, asset_type=asset_type)
             return True
         except Exception as e:
-            self.db.rollback()
             logger.error(f"Failed to create/update asset: {e}")
             return False
             
-    async def _calculate_and_save_risk_score(self, target: str, findings: List[Dict[str, Any]]):
-        """Calculate risk score and save to database"""
+    async def _update_risk_aggregate(
+        self,
+        target: str,
+        scanner: str,
+        scan_id: str,
+        findings: List[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Replace the scanner's slice of the target's risk aggregate (in a savepoint, no commit)
+        
+        Single INSERT ... ON CONFLICT (target) DO UPDATE merging the slice into the JSONB
+        with || - costs O(findings of this scan) however many scans the asset has had, and
+        leaves the other scanners' slices alone. Returns the slices of all scanners, None
+        if the update failed.
+        """
+        try:
+            now = datetime.utcnow()
+            scanner_slice = {
+                **RiskService.aggregate_slice(findings),
+                "scan_id": scan_id,
+                "updated_at": now.isoformat()
+            }
+            stmt = pg_insert(AssetRiskAggregate).values(
+                id=str(uuid4()),
+                target=target,
+                scanners={scanner: scanner_slice},
+                updated_at=now
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[AssetRiskAggregate.target],
+                set_={
+                    "updated_at": now,
+                    "scanners": AssetRiskAggregate.scanners.op("||", return_type=JSONB)(stmt.excluded.scanners)
+                }
+            ).returning(AssetRiskAggregate.scanners)
+            
+            async with self.db.begin_nested():
+                return (await self.db.execute(stmt)).scalar_one()
+        except Exception as e:
+            logger.error(f"Failed to update risk aggregate: {e}", target=target, scanner=scanner)
+            return None
+    
+    async def _calculate_and_save_risk_score(self, target: str, scanners: Dict[str, Dict[str, Any]]):
+        """Calculate risk score from the target's aggregate and upsert it on target (in a savepoint, no commit)"""
         try:
             # Calculate risk score
             start_time = datetime.utcnow()
-            risk_data = RiskService.calculate_asset_risk(findings)
+            risk_data = RiskService.calculate_aggregate_risk(scanners)
             
-            # Create risk score record
             from datetime import timedelta
             
-            risk_score = self.db.query(RiskScore).filter(RiskScore.target == target).first()
+            now = datetime.utcnow()
+            values = {
+                "score": risk_data["score"],
+                "factors": risk_data["factors"],
+                "calculated_at": now,
+                "expires_at": now + timedelta(days=30)
+            }
+            stmt = pg_insert(RiskScore).values(id=str(uuid4()), target=target, **values)
+            stmt = stmt.on_conflict_do_update(index_elements=[RiskScore.target], set_=values)
             
-            if risk_score:
-                # Update existing risk score
-                risk_score.score = risk_data["score"]
-                risk_score.factors = risk_data["factors"]
-                risk_score.calculated_at = datetime.utcnow()
-                risk_score.expires_at = datetime.utcnow() + timedelta(days=30)
-            else:
-                # Create new risk score
-                risk_score = RiskScore(
-                    id=str(uuid4()),
-                    target=target,
-                    score=risk_data["score"],
-                    factors=risk_data["factors"],
-                    calculated_at=datetime.utcnow(),
-                    expires_at=datetime.utcnow() + timedelta(days=30)
-                )
-                self.db.add(risk_score)
-                
-            self.db.commit()
+            async with self.db.begin_nested():
+                await self.db.execute(stmt)
             
             logger.info(
                 f"Calculated and saved risk score",
                 target=target,
                 score=risk_data["score"],
-                level=risk_data["level"],
+                risk_level=risk_data["level"],
                 processing_time=f"{(datetime.utcnow() - start_time).total_seconds():.2f}s"
             )
             return True
         except Exception as e:
-            self.db.rollback()
             logger.error(f"Failed to calculate risk score: {e}")
             return False
         
+    def _get_progress(self, scan: Scan) -> int:
+        """Progress in percent - reported progress while running, otherwise derived from status"""
+        if scan.status == "completed":
+            return 100
+        if scan.status == "running":
+            return scan.progress if scan.progress is not None else 50
+        return 0
+
     def _get_risk_level(self, score: int) -> str:
         """Convert numeric risk score to text level"""
         if score >= 80:
@@ -1,10 +1,13 @@
 # Import from reorganized structure
 
 # Import from tasks directory
-from .tasks import scan_asset, process_scan_result
+from .tasks import scan_asset, process_scan_result, dispatch_scan, submit_scan, submit_scans_pipelined
+from .tasks import publish_scan_event, publish_scan_events
+from .tasks import check_admission, get_queue_backlogs, record_job_duration
+from .tasks import recompute_risk_scores
 
 # Import from config directory
-from .config import get_redis_pool
+from .config import get_redis_pool, enqueue_jobs_pipelined, priority_defer_until, SCANNER_ROUTES
 from .config import redis_settings, with_redis_retry, RedisRetryClient, WorkerSettings
 
 # Import from monitoring directory
@@ -17,7 +20,10 @@ from .monitoring import (
     ARQ_QUEUE_SIZE,
     ARQ_COMMUNICATION_ERRORS,
     ARQ_RETRY_COUNT,
+    ARQ_REDIS_POOL_IN_USE,
+    ARQ_REDIS_POOL_IDLE,
     monitor_queue_metrics,
+    update_redis_pool_metrics,
     create_metrics_middleware
 )
 
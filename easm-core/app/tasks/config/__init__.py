@@ -1,12 +1,20 @@
 # Export configuration modules
-from .queue_config import get_redis_pool, WorkerSettings
+from .queue_config import get_redis_pool, enqueue_jobs_pipelined, priority_defer_until, WorkerSettings
 from .redis_config import redis_settings
+from .serialization import job_serializer, job_deserializer
+from .scanner_routing import SCANNER_ROUTES, get_scanner_route
 from .retry_helpers import with_redis_retry, RedisRetryClient
 
 __all__ = [
     'get_redis_pool',
+    'enqueue_jobs_pipelined',
+    'priority_defer_until',
     'WorkerSettings',
     'redis_settings',
+    'job_serializer',
+    'job_deserializer',
+    'SCANNER_ROUTES',
+    'get_scanner_route',
     'with_redis_retry',
     'RedisRetryClient'
 ]
@@ -1,21 +1,130 @@
 import os
 import asyncio
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
 from arq import create_pool
-from typing import Dict, Any
+from arq.connections import ArqRedis
+from arq.constants import job_key_prefix
+from arq.jobs import serialize_job
+from arq.utils import timestamp_ms, to_unix_ms
+from typing import Dict, Any, List, Optional, Tuple
+from redis.asyncio import BlockingConnectionPool
 from ...core.logging import get_logger
+from ...core.settings import settings
 from ..monitoring.task_metrics import create_metrics_middleware, monitor_queue_metrics
 from .redis_config import redis_settings
+from .serialization import JOB_SERIALIZER, JOB_DESERIALIZER
 
 logger = get_logger(__name__)
 
-async def get_redis_pool():
-    """Get a Redis connection pool for ARQ"""
-    return await create_pool(redis_settings)
+async def get_redis_pool(max_connections: Optional[int] = None, pool_timeout: Optional[int] = None):
+    """
+    Get a Redis connection pool for ARQ
+
+    Without ``max_connections`` this is ARQ's default (unbounded) pool. With it,
+    the pool is bounded: when every connection is busy callers wait up to
+    ``pool_timeout`` seconds for one to be released instead of opening new sockets.
+    """
+    if max_connections is None:
+        return await create_pool(redis_settings, job_serializer=JOB_SERIALIZER, job_deserializer=JOB_DESERIALIZER)
+
+    connection_pool = BlockingConnectionPool(
+        host=redis_settings.host,
+        port=redis_settings.port,
+        db=redis_settings.database,
+        username=redis_settings.username,
+        password=redis_settings.password,
+        socket_connect_timeout=redis_settings.conn_timeout,
+        encoding='utf8',
+        max_connections=max_connections,
+        timeout=pool_timeout
+    )
+    redis = ArqRedis(
+        pool_or_conn=connection_pool,
+        job_serializer=JOB_SERIALIZER,
+        job_deserializer=JOB_DESERIALIZER
+    )
+    await redis.ping()
+
+    logger.info(f"Redis connection pool created (max_connections={max_connections})")
+    return redis
+
+def priority_defer_until(priority: Optional[str]) -> Optional[datetime]:
+    """
+    Queue score for a scan priority, as an ARQ ``_defer_until`` in the past
+
+    An ARQ queue is a sorted set scored by enqueue time and workers take the lowest
+    ready score first. Backdating a job by its priority boost lets it overtake every
+    job of lower priority enqueued less than the boost difference ago - while a job
+    that has waited longer than that keeps its place, so low priority work ages
+    instead of starving.
+    """
+    boost = {
+        "high": settings.scan_priority_boost_high,
+        "normal": settings.scan_priority_boost_normal,
+    }.get(priority or "normal", 0)
+    if not boost:
+        return None
+    return datetime.now(timezone.utc) - timedelta(seconds=boost)
+
+async def enqueue_jobs_pipelined(
+    redis,
+    function: str,
+    jobs: List[Tuple[tuple, Dict[str, Any]]],
+    queue_name: str,
+    defer_until: Optional[datetime] = None
+) -> List[Optional[str]]:
+    """
+    Enqueue many ARQ jobs of the same function in a single Redis pipeline
+
+    Writes the same keys as ``ArqRedis.enqueue_job`` (job payload + queue entry)
+    but without the per-job WATCH/MULTI round trip, since every job gets a fresh id.
+
+    Args:
+        redis: ArqRedis connection pool
+        function: Name of the ARQ function to call
+        jobs: List of (args, kwargs) tuples, one per job
+        queue_name: Target ARQ queue
+        defer_until: Queue score for all jobs, as ARQ ``_defer_until`` (see ``priority_defer_until``)
+
+    Returns:
+        Job ids in the same order as ``jobs``; ``None`` for jobs that failed to enqueue
+    """
+    if not jobs:
+        return []
+
+    enqueue_time_ms = timestamp_ms()
+    score = to_unix_ms(defer_until) if defer_until is not None else enqueue_time_ms
+    expires_ms = score - enqueue_time_ms + redis.expires_extra_ms
+    job_ids = []
+
+    async with redis.pipeline(transaction=False) as pipe:
+        for args, kwargs in jobs:
+            job_id = uuid4().hex
+            job = serialize_job(function, args, kwargs, None, enqueue_time_ms, serializer=redis.job_serializer)
+            pipe.psetex(job_key_prefix + job_id, expires_ms, job)
+            pipe.zadd(queue_name, {job_id: score})
+            job_ids.append(job_id)
+        replies = await pipe.execute(raise_on_error=False)
+
+    # Two replies per job (psetex, zadd) - a job only counts if both succeeded
+    enqueued = []
+    for i, job_id in enumerate(job_ids):
+        set_reply, zadd_reply = replies[2 * i], replies[2 * i + 1]
+        if isinstance(set_reply, Exception) or isinstance(zadd_reply, Exception):
+            logger.error(f"Failed to enqueue {function} job {job_id}: {set_reply if isinstance(set_reply, Exception) else zadd_reply}")
+            enqueued.append(None)
+        else:
+            enqueued.append(job_id)
+
+    return enqueued
 
 class WorkerSettings:
     """ARQ worker settings for easm-core service"""
     redis_settings = redis_settings
     queue_name = "core"
+    job_serializer = JOB_SERIALIZER
+    job_deserializer = JOB_DESERIALIZER
     
     # Add metrics middleware
     try:
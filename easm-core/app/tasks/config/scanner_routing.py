@@ -0,0 +1,14 @@
+from typing import Dict, Optional
+
+# Scanner -> ARQ function and queue of the scanner service that runs it.
+# Shared by the core worker (scan_asset) and the API (direct dispatch mode).
+SCANNER_ROUTES: Dict[str, Dict[str, str]] = {
+    "nmap": {"function": "run_nmap_scan", "queue": "scanner-nmap"},
+    "masscan": {"function": "run_masscan_scan", "queue": "scanner-masscan"},
+    "nuclei": {"function": "run_nuclei_scan", "queue": "scanner-nuclei"},
+}
+
+
+def get_scanner_route(scanner: str) -> Optional[Dict[str, str]]:
+    """Return the route of a scanner, None if no scanner service handles it"""
+    return SCANNER_ROUTES.get(str(getattr(scanner, "value", scanner)))
@@ -0,0 +1,69 @@
+"""
+Compact ARQ job serializer - msgpack, zstd-compressed above a size threshold
+
+Shared by the core API/worker and the scanner workers (each scanner carries a copy in
+its app/main.py), so every party must deploy it together. Payloads are prefixed with a
+magic header; anything without it is treated as pickle, so jobs and results written by
+ARQ's default serializer are still readable during a rollout.
+"""
+
+import os
+import pickle
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Optional
+
+import msgpack
+import zstandard
+
+MAGIC = b"EJS1"  # pickle output always starts with b"\x80"
+FLAG_RAW = b"\x00"
+FLAG_ZSTD = b"\x01"
+
+# Small jobs (scan_asset, failures) are not worth a zstd frame
+COMPRESS_MIN_BYTES = int(os.getenv("JOB_SERIALIZER_COMPRESS_MIN_BYTES", "1024"))
+COMPRESS_LEVEL = int(os.getenv("JOB_SERIALIZER_ZSTD_LEVEL", "1"))
+
+_compressor = zstandard.ZstdCompressor(level=COMPRESS_LEVEL)
+_decompressor = zstandard.ZstdDecompressor()
+
+
+def _default(obj: Any) -> Any:
+    """msgpack fallback for types it cannot pack natively"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    # Exceptions stored as failed job results and anything exotic end up as text
+    return str(obj)
+
+
+def job_serializer(obj: Any) -> bytes:
+    """Serialize an ARQ job or result dict"""
+    packed = msgpack.packb(obj, default=_default, use_bin_type=True)
+    if len(packed) >= COMPRESS_MIN_BYTES:
+        return MAGIC + FLAG_ZSTD + _compressor.compress(packed)
+    return MAGIC + FLAG_RAW + packed
+
+
+def job_deserializer(data: bytes) -> Any:
+    """Deserialize data written by ``job_serializer`` (or by ARQ's default pickle serializer)"""
+    if not data.startswith(MAGIC):
+        return pickle.loads(data)
+
+    flag, payload = data[len(MAGIC):len(MAGIC) + 1], data[len(MAGIC) + 1:]
+    if flag == FLAG_ZSTD:
+        payload = _decompressor.decompress(payload)
+    return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+
+
+# JOB_SERIALIZER=pickle keeps ARQ's default serializer (e.g. to roll back) - the deserializer reads both formats
+JOB_SERIALIZER: Optional[Callable[[Any], bytes]] = (
+    None if os.getenv("JOB_SERIALIZER", "msgpack").lower() == "pickle" else job_serializer
+)
+JOB_DESERIALIZER: Callable[[bytes], Any] = job_deserializer
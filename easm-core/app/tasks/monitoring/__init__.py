@@ -8,7 +8,13 @@ from .task_metrics import (
     ARQ_QUEUE_SIZE,
     ARQ_COMMUNICATION_ERRORS,
     ARQ_RETRY_COUNT,
+    ARQ_REDIS_POOL_IN_USE,
+    ARQ_REDIS_POOL_IDLE,
+    SCAN_STATUS_CACHE_REQUESTS,
+    SCAN_ADMISSION_DECISIONS,
+    SCAN_QUEUE_DRAIN_SECONDS,
     monitor_queue_metrics,
+    update_redis_pool_metrics,
     create_metrics_middleware
 )
 
@@ -21,6 +27,12 @@ __all__ = [
     'ARQ_QUEUE_SIZE',
     'ARQ_COMMUNICATION_ERRORS',
     'ARQ_RETRY_COUNT',
+    'ARQ_REDIS_POOL_IN_USE',
+    'ARQ_REDIS_POOL_IDLE',
+    'SCAN_STATUS_CACHE_REQUESTS',
+    'SCAN_ADMISSION_DECISIONS',
+    'SCAN_QUEUE_DRAIN_SECONDS',
     'monitor_queue_metrics',
+    'update_redis_pool_metrics',
     'create_metrics_middleware'
 ]
@@ -57,6 +57,19 @@ ARQ_WORKER_COUNT = Gauge(
     ['queue']
 )
 
+# Redis connection pool monitoring
+ARQ_REDIS_POOL_IN_USE = Gauge(
+    'arq_redis_pool_connections_in_use',
+    'Number of Redis pool connections currently checked out',
+    ['pool']
+)
+
+ARQ_REDIS_POOL_IDLE = Gauge(
+    'arq_redis_pool_connections_idle',
+    'Number of idle Redis pool connections ready for reuse',
+    ['pool']
+)
+
 # Communication monitoring
 ARQ_COMMUNICATION_ERRORS = Counter(
     'arq_communication_errors_total',
@@ -70,6 +83,26 @@ ARQ_RETRY_COUNT = Counter(
     ['queue', 'operation']
 )
 
+# Scan status cache (GET /scan/{scan_id})
+SCAN_STATUS_CACHE_REQUESTS = Counter(
+    'scan_status_cache_requests_total',
+    'Scan status cache lookups by result (hit/miss)',
+    ['result']
+)
+
+# Admission control of new scans (POST /scan, /scan/quick, /scan/batch)
+SCAN_ADMISSION_DECISIONS = Counter(
+    'scan_admission_decisions_total',
+    'Scans admitted, spilled (deferred) or rejected by admission control',
+    ['queue', 'decision']
+)
+
+SCAN_QUEUE_DRAIN_SECONDS = Gauge(
+    'scan_queue_drain_seconds',
+    'Estimated time to drain a scanner queue at the current average job duration',
+    ['queue']
+)
+
 class TaskMetrics:
     """Metrics collector for ARQ tasks"""
     
@@ -137,6 +170,15 @@ def create_metrics_middleware(queue_name: str):
     
     return metrics_middleware
 
+def update_redis_pool_metrics(redis, pool_name: str) -> None:
+    """Record in-use and idle connection counts of a Redis connection pool"""
+    connection_pool = getattr(redis, 'connection_pool', None)
+    if connection_pool is None:
+        return
+    
+    ARQ_REDIS_POOL_IN_USE.labels(pool=pool_name).set(len(connection_pool._in_use_connections))
+    ARQ_REDIS_POOL_IDLE.labels(pool=pool_name).set(len(connection_pool._available_connections))
+
 async def monitor_queue_metrics(redis, queue_names=None):
     """Background task to monitor ARQ queue metrics"""
     if queue_names is None:
@@ -1,4 +1,13 @@
 # Export scan tasks
 from .scan_tasks import scan_asset, process_scan_result
+from .dispatch import dispatch_scan, submit_scan, submit_scans_pipelined
+from .scan_events import publish_scan_event, publish_scan_events
+from .admission import check_admission, get_queue_backlogs, record_job_duration
+from .risk_tasks import recompute_risk_scores
 
-__all__ = ['scan_asset', 'process_scan_result']
+__all__ = [
+    'scan_asset', 'process_scan_result', 'dispatch_scan', 'submit_scan', 'submit_scans_pipelined',
+    'publish_scan_event', 'publish_scan_events',
+    'check_admission', 'get_queue_backlogs', 'record_job_duration',
+    'recompute_risk_scores'
+]
@@ -0,0 +1,137 @@
+import math
+import time
+from typing import Dict, Any, List, Optional
+from ..config.scanner_routing import SCANNER_ROUTES, get_scanner_route
+from ..monitoring.task_metrics import SCAN_ADMISSION_DECISIONS, SCAN_QUEUE_DRAIN_SECONDS
+from ...core.settings import settings
+from ...core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Moving average of job run time per scanner queue, fed by the core worker from scan results
+JOB_DURATION_PREFIX = "queue-job-seconds:"
+
+# EWMA update in one round trip: new = alpha * sample + (1 - alpha) * old
+EWMA_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]))
+local sample = tonumber(ARGV[1])
+if current then
+    sample = tonumber(ARGV[2]) * sample + (1 - tonumber(ARGV[2])) * current
+end
+redis.call('SET', KEYS[1], tostring(sample))
+return tostring(sample)
+"""
+
+
+def queue_slots() -> Dict[str, int]:
+    """Parallel jobs per scanner queue (all workers together) from ADMISSION_QUEUE_SLOTS"""
+    slots = {}
+    for part in settings.admission_queue_slots.split(","):
+        queue, _, value = part.partition("=")
+        if queue.strip() and value.strip():
+            slots[queue.strip()] = max(1, int(value))
+    return slots
+
+
+async def record_job_duration(redis, scanner: Optional[str], seconds: Any):
+    """Feed the run time of a finished scanner job into its queue's moving average (best effort)"""
+    route = get_scanner_route(scanner) if scanner else None
+    if redis is None or route is None or not isinstance(seconds, (int, float)) or seconds <= 0:
+        return
+    try:
+        await redis.eval(
+            EWMA_SCRIPT, 1, JOB_DURATION_PREFIX + route["queue"],
+            seconds, settings.admission_duration_ewma_alpha
+        )
+    except Exception as e:
+        logger.warning(f"[ADMISSION] Failed to record job duration for {route['queue']}: {e}")
+
+
+async def get_queue_backlogs(redis, queues: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Backlog of scanner queues: jobs waiting, average job time and estimated drain time
+
+    ``depth`` counts every job in the queue's sorted set, ``ready`` those a worker may take
+    now - the rest are spilled (deferred into the future) by admission control. The drain
+    time assumes ADMISSION_QUEUE_SLOTS jobs run in parallel. One pipeline for all queues.
+    """
+    queues = queues or [route["queue"] for route in SCANNER_ROUTES.values()]
+    slots = queue_slots()
+    now_ms = int(time.time() * 1000)
+
+    async with redis.pipeline(transaction=False) as pipe:
+        for queue in queues:
+            pipe.zcard(queue)
+            pipe.zcount(queue, "-inf", now_ms)
+            pipe.get(JOB_DURATION_PREFIX + queue)
+        replies = await pipe.execute()
+
+    backlogs = {}
+    for i, queue in enumerate(queues):
+        depth, ready, job_seconds = replies[3 * i:3 * i + 3]
+        job_seconds = float(job_seconds) if job_seconds is not None else float(settings.admission_default_job_seconds)
+        queue_slot_count = slots.get(queue, 1)
+        drain_seconds = depth * job_seconds / queue_slot_count
+        SCAN_QUEUE_DRAIN_SECONDS.labels(queue=queue).set(drain_seconds)
+        backlogs[queue] = {
+            "queue": queue,
+            "depth": depth,
+            "ready": ready,
+            "deferred": depth - ready,
+            "job_seconds": round(job_seconds, 1),
+            "slots": queue_slot_count,
+            "drain_seconds": round(drain_seconds),
+            "saturated": depth >= settings.admission_max_queue_depth or drain_seconds >= settings.admission_max_drain_seconds
+        }
+    return backlogs
+
+
+async def check_admission(redis, scanner: str, count: int = 1) -> Dict[str, Any]:
+    """
+    Admission decision for ``count`` new scans of a scanner
+
+    Admitted while the scanner queue stays within ADMISSION_MAX_QUEUE_DEPTH jobs and
+    ADMISSION_MAX_DRAIN_SECONDS of estimated work. Beyond that, in ``reject`` mode the
+    scans are refused with ``retry_after`` - the time until the backlog is back within
+    the limits - and in ``defer`` mode they are admitted with ``spill_seconds``: enqueued
+    deferred by that long, up to ADMISSION_MAX_SPILL_SECONDS, and refused after that.
+
+    Returns a dict with ``admitted``, ``retry_after``, ``spill_seconds`` and the queue backlog.
+    Never blocks submissions when Redis cannot be read or the scanner has no queue.
+    """
+    route = get_scanner_route(scanner)
+    decision = {"admitted": True, "retry_after": 0, "spill_seconds": 0, "backlog": None}
+    if settings.admission_mode == "off" or route is None:
+        return decision
+
+    queue = route["queue"]
+    try:
+        backlog = (await get_queue_backlogs(redis, [queue]))[queue]
+    except Exception as e:
+        logger.warning(f"[ADMISSION] Failed to read backlog of {queue}, admitting: {e}")
+        return decision
+    decision["backlog"] = backlog
+
+    seconds_per_job = backlog["job_seconds"] / backlog["slots"]
+    depth_after = backlog["depth"] + count
+    # Time until the queue would be back within both limits
+    excess_seconds = max(
+        (depth_after - settings.admission_max_queue_depth) * seconds_per_job,
+        depth_after * seconds_per_job - settings.admission_max_drain_seconds
+    )
+    if excess_seconds <= 0:
+        SCAN_ADMISSION_DECISIONS.labels(queue=queue, decision="admitted").inc(count)
+        return decision
+
+    wait_seconds = max(1, math.ceil(excess_seconds))
+    if settings.admission_mode == "defer" and wait_seconds <= settings.admission_max_spill_seconds:
+        decision["spill_seconds"] = wait_seconds
+        SCAN_ADMISSION_DECISIONS.labels(queue=queue, decision="spilled").inc(count)
+        logger.info(f"[ADMISSION] {queue} saturated, deferring {count} scans by {wait_seconds}s", depth=backlog["depth"])
+        return decision
+
+    decision["admitted"] = False
+    decision["retry_after"] = min(wait_seconds, settings.admission_max_retry_after)
+    SCAN_ADMISSION_DECISIONS.labels(queue=queue, decision="rejected").inc(count)
+    logger.warning(f"[ADMISSION] {queue} saturated, rejecting {count} scans", depth=backlog["depth"], drain_seconds=backlog["drain_seconds"])
+    return decision
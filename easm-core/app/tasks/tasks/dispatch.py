@@ -0,0 +1,178 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Tuple
+from ..config.retry_helpers import with_redis_retry
+from ..config.queue_config import enqueue_jobs_pipelined, priority_defer_until
+from ..config.scanner_routing import get_scanner_route
+from .masscan_shards import PartialDispatchError, plan_masscan_shards, dispatch_masscan_shards
+from .scan_events import build_scan_event, publish_scan_event, publish_scan_events
+from ...core.settings import settings
+from ...core.logging import get_logger
+
+logger = get_logger(__name__)
+
+@with_redis_retry(max_retries=3, retry_delay=1.0, operation_name="enqueue_job")
+async def enqueue_job_with_retry(redis_client, function_name, *args, _queue_name=None, queue_display=None, **kwargs):
+    """Enqueue a job with retry logic"""
+    return await redis_client.enqueue_job(
+        function_name,
+        *args,
+        _queue_name=_queue_name,
+        **kwargs
+    )
+
+def masscan_shards_for(target: str, options: Dict[str, Any]) -> List[Dict[str, str]]:
+    """Shard plan for a masscan scan - a single shard when sharding is disabled or not worth it"""
+    if options.get("sharding") is False:
+        return [{"target": target, "ports": options.get("ports") or "1-10000"}]
+    return plan_masscan_shards(
+        target,
+        options,
+        max_shards=options.get("max_shards") or settings.masscan_max_shards,
+        shard_addresses=settings.masscan_shard_addresses,
+        shard_ports=settings.masscan_shard_ports
+    )
+
+def single_job_route(scanner: str, target: str, options: Dict[str, Any]) -> Optional[Dict[str, str]]:
+    """
+    Route of a scan that is one job on one scanner queue
+
+    None when the scan needs more than a single enqueue - an unknown scanner or a
+    masscan scan that gets sharded.
+    """
+    route = get_scanner_route(scanner)
+    if route and route["function"] == "run_masscan_scan" and len(masscan_shards_for(target, options or {})) > 1:
+        return None
+    return route
+
+def submit_defer_until(payload: Dict[str, Any]) -> Optional[datetime]:
+    """Queue score of a new scan - spill_seconds set by admission control, else the priority boost"""
+    if payload.get("spill_seconds"):
+        return datetime.now(timezone.utc) + timedelta(seconds=payload["spill_seconds"])
+    return priority_defer_until(payload.get("priority"))
+
+async def dispatch_scan(
+    redis,
+    scan_id: str,
+    target: str,
+    scanner: str,
+    options: Dict[str, Any],
+    priority: Optional[str] = None,
+    defer_until: Optional[datetime] = None
+) -> List[str]:
+    """
+    Enqueue a scan on its scanner queue (or as masscan shards)
+
+    Used by the core worker's scan_asset and directly by the API in direct dispatch
+    mode. Returns the ids of the enqueued jobs; raises ValueError for unknown scanners.
+    ``defer_until`` overrides the queue score implied by ``priority``.
+    """
+    route = get_scanner_route(scanner)
+    if route is None:
+        raise ValueError(f"Unknown scanner: {scanner}")
+
+    options = options or {}
+    # Scanner queues use the same priority ordering as the core queue
+    defer_until = defer_until or priority_defer_until(priority)
+
+    if route["function"] == "run_masscan_scan":
+        shards = masscan_shards_for(target, options)
+        if len(shards) > 1:
+            # Large CIDR / port range - split across masscan workers, results are merged on completion
+            return await dispatch_masscan_shards(redis, scan_id, target, options, shards, defer_until=defer_until)
+
+    job = await enqueue_job_with_retry(
+        redis,
+        route["function"],
+        scan_id, target, options,
+        _queue_name=route["queue"],
+        _defer_until=defer_until,
+        queue_display=route["queue"]
+    )
+    return [job.job_id] if job else []
+
+async def submit_scan(redis, scan_id: str, payload: Dict[str, Any]) -> Optional[str]:
+    """
+    Enqueue a newly created scan from the API
+
+    In ``direct`` dispatch mode the scan goes straight to its scanner queue, skipping
+    the scan_asset hop through the core worker. In ``core`` mode, and as a fallback
+    when direct dispatch enqueued nothing, scan_asset is enqueued on the core queue.
+    A direct dispatch that failed after enqueuing part of a sharded scan raises
+    PartialDispatchError - the caller fails the scan. Returns the id of the first
+    enqueued job. Scans spilled by admission control (``spill_seconds`` in the payload)
+    are enqueued deferred by that long.
+    """
+    priority = payload.get("priority")
+    defer_until = submit_defer_until(payload)
+    # Published before the enqueue so it can never overwrite the scanner's "started" event
+    await publish_scan_event(redis, scan_id, "queued")
+
+    if settings.scan_dispatch_mode == "direct" and get_scanner_route(payload["scanner"]) is not None:
+        try:
+            job_ids = await dispatch_scan(
+                redis, scan_id, payload["target"], payload["scanner"], payload.get("options"), priority,
+                defer_until=defer_until
+            )
+            if job_ids:
+                return job_ids[0]
+        except PartialDispatchError as e:
+            # Falling back would queue the shards that did get enqueued a second time
+            logger.error(f"Direct dispatch failed after a partial enqueue: {e}", scan_id=scan_id, job_ids=e.job_ids)
+            raise
+        except Exception as e:
+            logger.warning(f"Direct dispatch failed, falling back to scan_asset: {e}", scan_id=scan_id)
+
+    job = await redis.enqueue_job(
+        'scan_asset',
+        scan_id,
+        payload,
+        _queue_name='core',
+        _defer_until=defer_until
+    )
+    return job.job_id if job else None
+
+async def submit_scans_pipelined(redis, scans: List[Tuple[str, Dict[str, Any]]]) -> List[Optional[str]]:
+    """
+    Enqueue many newly created scans, one Redis pipeline per (queue, priority, spill delay)
+
+    Same routing as ``submit_scan``: in direct mode single-job scans go straight to
+    their scanner queue, everything else (sharded masscan, unknown scanners, core
+    mode) is enqueued as scan_asset. Returns job ids in the order of ``scans`` - None for
+    scans that were not enqueued, including every scan of a group whose pipeline failed.
+    """
+    await publish_scan_events(redis, [build_scan_event(scan_id, "queued") for scan_id, _ in scans])
+
+    groups: Dict[Tuple[str, str, Optional[str], Optional[int]], List[Tuple[int, tuple]]] = {}
+    for position, (scan_id, payload) in enumerate(scans):
+        priority = payload.get("priority")
+        spill_seconds = payload.get("spill_seconds")
+        route = None
+        if settings.scan_dispatch_mode == "direct":
+            route = single_job_route(payload["scanner"], payload["target"], payload.get("options"))
+
+        if route:
+            key = (route["function"], route["queue"], priority, spill_seconds)
+            args = (scan_id, payload["target"], payload.get("options") or {})
+        else:
+            key = ('scan_asset', 'core', priority, spill_seconds)
+            args = (scan_id, payload)
+        groups.setdefault(key, []).append((position, args))
+
+    job_ids: List[Optional[str]] = [None] * len(scans)
+    for (function, queue_name, priority, spill_seconds), jobs in groups.items():
+        try:
+            group_job_ids = await enqueue_jobs_pipelined(
+                redis,
+                function,
+                [(args, {}) for _, args in jobs],
+                queue_name=queue_name,
+                defer_until=submit_defer_until({"priority": priority, "spill_seconds": spill_seconds})
+            )
+        except Exception as e:
+            # Other groups keep their jobs - the caller fails the scans of this one
+            logger.error(f"Failed to enqueue {len(jobs)} {function} jobs on {queue_name}: {e}")
+            continue
+        for (position, _), job_id in zip(jobs, group_job_ids):
+            job_ids[position] = job_id
+
+    return job_ids
@@ -0,0 +1,335 @@
+import ipaddress
+import json
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+from arq.worker import Retry
+from ..config.queue_config import enqueue_jobs_pipelined
+from .scan_events import publish_scan_event
+from ...core.logging import get_logger
+
+logger = get_logger(__name__)
+
+SHARD_KEY_PREFIX = "masscan-shards:"
+SHARD_STATE_TTL = 24 * 3600  # shard bookkeeping of abandoned scans expires after a day
+MERGE_CLAIM_SUFFIX = ":merging"
+MERGE_CLAIM_TTL = 300  # a merge whose worker died can be retried after five minutes
+MERGE_RETRY_DEFER = 10  # seconds before a failed merge is retried (ARQ job retry)
+
+# Store one shard result and bump the done counter atomically. Duplicate deliveries
+# (ARQ retries) are ignored while shards are missing; once every shard is in they
+# observe done == total too, so a merge that failed can be retried - the merge itself
+# is serialized by the merge claim (claim_shard_merge).
+RECORD_SHARD_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return {-2, 0}
+end
+local total = tonumber(redis.call('HGET', KEYS[1], 'total'))
+if redis.call('HSETNX', KEYS[1], ARGV[1], ARGV[2]) == 0 then
+    local done = tonumber(redis.call('HGET', KEYS[1], 'done'))
+    if done < total then
+        return {-1, 0}
+    end
+    return {done, total}
+end
+local done = redis.call('HINCRBY', KEYS[1], 'done', 1)
+if ARGV[3] == '1' then
+    redis.call('HINCRBY', KEYS[1], 'failed', 1)
+end
+return {done, total}
+"""
+
+
+class PartialDispatchError(RuntimeError):
+    """
+    Some shards of a scan may already be queued - the scan must be failed, not dispatched again
+
+    ``job_ids`` lists the jobs known to be enqueued (empty when the pipeline failed
+    without telling which of its jobs were written).
+    """
+
+    def __init__(self, message: str, job_ids: List[str]):
+        super().__init__(message)
+        self.job_ids = job_ids
+
+
+def plan_masscan_shards(
+    target: str,
+    options: Dict[str, Any],
+    max_shards: int,
+    shard_addresses: int,
+    shard_ports: int
+) -> List[Dict[str, str]]:
+    """
+    Split a masscan target into shards
+
+    Networks larger than ``shard_addresses`` are split into equal subnets. Single hosts
+    (and small networks) scanning more than ``shard_ports`` ports are split by port range
+    instead. Never returns more than ``max_shards`` shards; a single shard means the scan
+    should run unsharded.
+    """
+    ports = options.get("ports") or "1-10000"
+    single = [{"target": target, "ports": ports}]
+
+    if max_shards < 2:
+        return single
+
+    try:
+        network = ipaddress.ip_network(target, strict=False)
+    except ValueError:
+        network = None  # hostname - resolved by the scanner, can only be split by ports
+
+    if network is not None and network.num_addresses > shard_addresses:
+        wanted = min(max_shards, -(-network.num_addresses // shard_addresses))
+        # Largest power of two not above the wanted shard count
+        new_prefix = min(network.prefixlen + wanted.bit_length() - 1, network.max_prefixlen)
+        return [{"target": str(subnet), "ports": ports} for subnet in network.subnets(new_prefix=new_prefix)]
+
+    port_ranges = _parse_ports(ports)
+    if not port_ranges:
+        return single
+
+    total_ports = sum(end - start + 1 for start, end in port_ranges)
+    if total_ports <= shard_ports:
+        return single
+
+    count = min(max_shards, -(-total_ports // shard_ports))
+    return [{"target": target, "ports": chunk} for chunk in _split_port_ranges(port_ranges, total_ports, count)]
+
+
+def _parse_ports(spec: str) -> Optional[List[Tuple[int, int]]]:
+    """Parse a masscan port spec ('1-1000,8080') into merged ranges, None if it is not plain TCP ports"""
+    ranges = []
+    try:
+        for part in str(spec).split(","):
+            part = part.strip()
+            if not part:
+                continue
+            start, _, end = part.partition("-")
+            start, end = int(start), int(end or start)
+            if not 0 <= start <= end <= 65535:
+                return None
+            ranges.append((start, end))
+    except ValueError:
+        return None  # protocol prefixes (U:53) and similar - leave the spec untouched
+
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _split_port_ranges(ranges: List[Tuple[int, int]], total_ports: int, count: int) -> List[str]:
+    """Cut merged port ranges into ``count`` specs of (nearly) equal port counts"""
+    chunks: List[List[str]] = [[] for _ in range(count)]
+    per_chunk, extra = divmod(total_ports, count)
+    index, room = 0, per_chunk + (1 if extra else 0)
+
+    for start, end in ranges:
+        while start <= end:
+            take = min(room, end - start + 1)
+            last = start + take - 1
+            chunks[index].append(f"{start}-{last}" if last > start else str(start))
+            start, room = last + 1, room - take
+            if room == 0 and index < count - 1:
+                index += 1
+                room = per_chunk + (1 if index < extra else 0)
+
+    return [",".join(chunk) for chunk in chunks if chunk]
+
+
+async def dispatch_masscan_shards(
+    redis,
+    scan_id: str,
+    target: str,
+    options: Dict[str, Any],
+    shards: List[Dict[str, str]],
+    defer_until: Optional[datetime] = None
+) -> List[str]:
+    """
+    Register shard bookkeeping for a scan and enqueue one masscan job per shard - returns the job ids
+
+    Raises RuntimeError when no shard was enqueued and PartialDispatchError when some
+    may have been; either way the shard state is removed, so results of shards that do
+    run are ignored.
+    """
+    key = SHARD_KEY_PREFIX + scan_id
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.delete(key)
+        pipe.hset(key, mapping={"total": len(shards), "done": 0, "failed": 0, "target": target})
+        pipe.expire(key, SHARD_STATE_TTL)
+        await pipe.execute()
+
+    jobs = [
+        ((scan_id, shard["target"], {**options, "ports": shard["ports"], "shard": index}), {})
+        for index, shard in enumerate(shards)
+    ]
+    try:
+        job_ids = await enqueue_jobs_pipelined(redis, 'run_masscan_scan', jobs, queue_name='scanner-masscan', defer_until=defer_until)
+    except Exception as e:
+        await redis.delete(key)
+        raise PartialDispatchError(f"Failed to enqueue masscan shards: {e}", []) from e
+
+    failed = sum(1 for job_id in job_ids if job_id is None)
+    if failed:
+        await redis.delete(key)
+        if failed < len(shards):
+            raise PartialDispatchError(
+                f"Failed to enqueue {failed} of {len(shards)} masscan shards",
+                [job_id for job_id in job_ids if job_id is not None]
+            )
+        raise RuntimeError(f"Failed to enqueue {failed} of {len(shards)} masscan shards")
+
+    logger.info(f"[SHARDS] Dispatched masscan scan {scan_id} as {len(shards)} shards", scan_id=scan_id, shard_count=len(shards))
+    return job_ids
+
+
+async def record_shard_result(redis, scan_id: str, shard: int, status: str, payload: Dict[str, Any]) -> Optional[Tuple[int, int]]:
+    """
+    Store the result of one shard
+
+    Returns (done, total) after recording, or None if the scan has no shard state
+    (expired or unknown) or this shard was already recorded while others are missing.
+    """
+    done, total = await redis.eval(
+        RECORD_SHARD_SCRIPT,
+        1,
+        SHARD_KEY_PREFIX + scan_id,
+        f"shard:{shard}",
+        json.dumps({"status": status, **payload}, default=str),
+        "1" if status == "failed" else "0"
+    )
+    if done < 0:
+        return None
+    return done, total
+
+
+async def claim_shard_merge(redis, scan_id: str) -> bool:
+    """Claim the merge of a scan whose shards are all in - False if another worker is merging it"""
+    return bool(await redis.set(SHARD_KEY_PREFIX + scan_id + MERGE_CLAIM_SUFFIX, 1, nx=True, ex=MERGE_CLAIM_TTL))
+
+
+async def release_shard_merge(redis, scan_id: str, merged: bool):
+    """
+    End a claimed merge - a merged scan's shard state is removed, otherwise only the claim
+    is dropped and the shard results stay for the retry
+    """
+    key = SHARD_KEY_PREFIX + scan_id
+    if merged:
+        await redis.delete(key, key + MERGE_CLAIM_SUFFIX)
+    else:
+        await redis.delete(key + MERGE_CLAIM_SUFFIX)
+
+
+async def collect_shard_results(redis, scan_id: str) -> Tuple[str, List[Dict[str, Any]]]:
+    """Read the shard state of a finished scan - returns (original target, shard results)"""
+    state = await redis.hgetall(SHARD_KEY_PREFIX + scan_id)
+    state = {
+        (k.decode() if isinstance(k, bytes) else k): (v.decode() if isinstance(v, bytes) else v)
+        for k, v in state.items()
+    }
+    shard_results = [
+        json.loads(value)
+        for field, value in sorted(state.items(), key=lambda item: item[0])
+        if field.startswith("shard:")
+    ]
+    return state.get("target", ""), shard_results
+
+
+def merge_shard_results(scan_id: str, target: str, shard_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge per-shard masscan results into the result document of the whole scan"""
+    open_ports = set()
+    services: Dict[str, Any] = {}
+    hosts: Dict[str, List[int]] = {}
+    errors = []
+    duration = 0.0
+
+    for shard in shard_results:
+        if shard.get("status") == "failed":
+            errors.append(shard.get("error", "Unknown error"))
+            continue
+
+        results = shard.get("results") or {}
+        open_ports.update(results.get("open_ports", []))
+        services.update(results.get("services", {}))
+        for host, ports in (results.get("hosts") or {}).items():
+            hosts[host] = sorted(set(hosts.get(host, [])) | set(ports))
+        duration = max(duration, results.get("scan_duration") or 0.0)
+
+    return {
+        "scanner": "masscan",
+        "target": target,
+        "scan_id": scan_id,
+        "scan_duration": duration,  # shards run in parallel - wall time is the slowest shard
+        "timestamp": time.time(),
+        "open_ports": sorted(open_ports),
+        "services": services,
+        "hosts": hosts,
+        "shards": {
+            "total": len(shard_results),
+            "failed": len(errors),
+            "errors": errors
+        }
+    }
+
+
+async def process_shard_result(ctx: dict, scan_service, scan_id: str, status: str, shard: int, **kwargs) -> Dict[str, Any]:
+    """
+    Handle a process_scan_result message coming from one masscan shard
+
+    Intermediate shards only update scan progress. The shard that completes the set
+    merges all shard results and completes the scan - or fails it if every shard failed.
+    The shard results are removed only once that is stored; if it cannot be, the job
+    is retried (arq Retry) and its duplicate delivery merges again.
+    """
+    redis = ctx['redis']
+    payload = {"results": kwargs.get("results")} if status == "completed" else {"error": kwargs.get("error", "Unknown error")}
+
+    recorded = await record_shard_result(redis, scan_id, shard, status, payload)
+    if recorded is None:
+        logger.warning(f"[SHARDS] Ignoring result of shard {shard} for scan {scan_id} (duplicate or unknown scan)")
+        return {"status": "ignored", "scan_id": scan_id, "message": "Duplicate or unknown shard result"}
+
+    done, total = recorded
+    if done < total:
+        progress = int(done * 100 / total)
+        await scan_service.update_scan_progress(scan_id, progress)
+        await publish_scan_event(redis, scan_id, "progress", progress=progress, shards_done=done, shards_total=total)
+        logger.info(f"[SHARDS] Shard {shard} of scan {scan_id} recorded ({done}/{total})")
+        return {"status": "success", "scan_id": scan_id, "message": f"Shard {done}/{total} processed"}
+
+    if not await claim_shard_merge(redis, scan_id):
+        logger.warning(f"[SHARDS] Ignoring result of shard {shard} for scan {scan_id} (merge already in progress)")
+        return {"status": "ignored", "scan_id": scan_id, "message": "Shard merge already in progress"}
+
+    try:
+        target, shard_results = await collect_shard_results(redis, scan_id)
+        merged = merge_shard_results(scan_id, target, shard_results)
+
+        if merged["shards"]["failed"] == total:
+            error = f"All {total} masscan shards failed: " + "; ".join(merged["shards"]["errors"])
+            await scan_service.fail_scan(scan_id, error)
+        else:
+            await scan_service.complete_scan(scan_id, merged)
+    except Exception as e:
+        await release_shard_merge(redis, scan_id, merged=False)
+        logger.error(f"[SHARDS] Failed to store merged shards of scan {scan_id}, retrying: {e}")
+        raise Retry(defer=MERGE_RETRY_DEFER) from e
+
+    await release_shard_merge(redis, scan_id, merged=True)
+
+    if merged["shards"]["failed"] == total:
+        await publish_scan_event(redis, scan_id, "failed", error=error)
+        return {"status": "failed", "scan_id": scan_id, "message": f"Scan failure processed: {error}"}
+
+    await publish_scan_event(redis, scan_id, "completed", progress=100)
+    logger.info(
+        f"[SHARDS] Merged {total} masscan shards for scan {scan_id}",
+        scan_id=scan_id,
+        failed_shards=merged["shards"]["failed"],
+        open_ports=len(merged["open_ports"])
+    )
+    return {"status": "success", "scan_id": scan_id, "message": "Scan results processed successfully"}
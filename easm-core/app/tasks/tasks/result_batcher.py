@@ -0,0 +1,100 @@
+import asyncio
+from typing import Dict, Any, List, Optional, Tuple
+from ...core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class ResultBatcher:
+    """
+    Micro-batches scan completions and failures in the core worker
+
+    process_scan_result jobs submit their result and wait; a batch is written as soon
+    as ``max_items`` results are pending or ``max_wait_ms`` after the first one arrived,
+    in a single transaction (ScanService.process_results_batch). If the batch write
+    fails, every item is retried on its own so one bad scan cannot fail the others.
+    """
+
+    def __init__(self, max_items: int = 50, max_wait_ms: int = 200, cache=None):
+        self.max_items = max_items
+        self.cache = cache  # ScanStatusCache invalidated after writes
+        self.max_wait = max_wait_ms / 1000
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+    async def submit(self, item: Dict[str, Any]) -> bool:
+        """Queue one result ({"scan_id", "status", "results" | "error"}) - returns False if the scan does not exist"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_items:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """Hand the pending results to a persist task"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._persist(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _persist(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        """Write a batch in one transaction, falling back to one transaction per result"""
+        from ...services.scan_service import ScanService
+
+        # A result delivered twice is written once - the first terminal state wins and
+        # every submitter of the scan gets its outcome
+        items: Dict[str, Dict[str, Any]] = {}
+        futures: Dict[str, List[asyncio.Future]] = {}
+        for item, future in batch:
+            items.setdefault(item["scan_id"], item)
+            futures.setdefault(item["scan_id"], []).append(future)
+        if len(items) < len(batch):
+            logger.warning(f"[BATCH] Dropped {len(batch) - len(items)} duplicate scan results")
+
+        try:
+            outcomes = await ScanService(cache=self.cache).process_results_batch(list(items.values()))
+            for scan_id, scan_futures in futures.items():
+                self._resolve(scan_futures, result=outcomes.get(scan_id, False))
+            return
+        except Exception as e:
+            logger.warning(f"[BATCH] Batch of {len(items)} scan results failed, processing one by one: {e}")
+
+        for scan_id, item in items.items():
+            try:
+                scan_service = ScanService(cache=self.cache)
+                if item["status"] == "completed":
+                    success = await scan_service.complete_scan(scan_id, item.get("results") or {})
+                else:
+                    success = await scan_service.fail_scan(scan_id, item.get("error", "Unknown error"))
+                self._resolve(futures[scan_id], result=success)
+            except Exception as e:
+                logger.error(f"[BATCH] Failed to process result of scan {scan_id}: {e}")
+                self._resolve(futures[scan_id], error=e)
+
+    @staticmethod
+    def _resolve(futures: List[asyncio.Future], result: bool = False, error: Optional[Exception] = None):
+        for future in futures:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    async def close(self):
+        """Write whatever is still pending and wait for running writes"""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
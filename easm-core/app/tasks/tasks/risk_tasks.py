@@ -0,0 +1,16 @@
+from typing import Dict, Any
+from ...core.logging import get_logger
+
+logger = get_logger(__name__)
+
+async def recompute_risk_scores(ctx: dict) -> Dict[str, Any]:
+    """Rescore every asset with the current RiskService rules (after a change of weights or port lists)"""
+    # Import here to avoid circular imports
+    from ...services.risk_engine import PortfolioRiskEngine
+    from ...services.scan_cache import ScanStatusCache
+
+    logger.info(f"[RISK] Recomputing portfolio risk scores")
+    summary = await PortfolioRiskEngine().recompute()
+    # Cached scan statuses embed the old risk scores
+    await ScanStatusCache(ctx.get('redis')).clear()
+    return summary
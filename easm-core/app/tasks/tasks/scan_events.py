@@ -0,0 +1,71 @@
+import json
+import time
+from typing import Dict, Any, List, Optional
+from ...core.settings import settings
+from ...core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Pub/sub channel per scan, watched by the API's SSE streams (scanner workers publish to the same channels)
+SCAN_EVENTS_CHANNEL_PREFIX = "scan-events:"
+# Last event of each scan - the initial state of a stream opened after the event was published
+SCAN_EVENTS_LAST_PREFIX = "scan-events-last:"
+
+TERMINAL_EVENTS = ("completed", "failed")
+
+# Scan status implied by each event
+EVENT_STATUS = {
+    "queued": "queued",
+    "started": "running",
+    "progress": "running",
+    "findings": "running",
+    "completed": "completed",
+    "failed": "failed",
+}
+
+
+def build_scan_event(scan_id: str, event: str, **data) -> Dict[str, Any]:
+    """Scan event document: scan_id, event, status, timestamp and event specific fields"""
+    return {
+        "scan_id": scan_id,
+        "event": event,
+        "status": EVENT_STATUS.get(event, "running"),
+        "timestamp": time.time(),
+        **data
+    }
+
+
+async def publish_scan_events(redis, events: List[Dict[str, Any]]):
+    """
+    Publish scan events and remember each scan's last event - one pipeline for all events
+
+    Best effort: events only drive SSE streams, a Redis error is logged and never fails
+    the caller.
+    """
+    if redis is None or not events:
+        return
+    try:
+        async with redis.pipeline(transaction=False) as pipe:
+            for event in events:
+                message = json.dumps(event, default=str)
+                pipe.set(SCAN_EVENTS_LAST_PREFIX + event["scan_id"], message, ex=settings.scan_events_last_ttl)
+                pipe.publish(SCAN_EVENTS_CHANNEL_PREFIX + event["scan_id"], message)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"[EVENTS] Failed to publish {len(events)} scan events: {e}")
+
+
+async def publish_scan_event(redis, scan_id: str, event: str, **data):
+    """Publish one scan event (see ``publish_scan_events``)"""
+    await publish_scan_events(redis, [build_scan_event(scan_id, event, **data)])
+
+
+async def get_last_scan_events(redis, scan_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+    """Last published event of each scan, None for scans without one"""
+    if not scan_ids:
+        return {}
+    values = await redis.mget([SCAN_EVENTS_LAST_PREFIX + scan_id for scan_id in scan_ids])
+    return {
+        scan_id: json.loads(value) if value is not None else None
+        for scan_id, value in zip(scan_ids, values)
+    }
@@ -5,8 +5,16 @@ import json
 import os
 from typing import Dict, Any
 import asyncio
+from arq.worker import Retry, func
 from ..config.redis_config import redis_settings
-from ..config.retry_helpers import with_redis_retry
+from ..config.serialization import JOB_SERIALIZER, JOB_DESERIALIZER
+from .dispatch import dispatch_scan, enqueue_job_with_retry
+from .masscan_shards import process_shard_result
+from .result_batcher import ResultBatcher
+from .scan_events import publish_scan_event
+from .admission import record_job_duration
+from .risk_tasks import recompute_risk_scores
+from ...core.settings import settings
 from ...core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -14,16 +22,6 @@ logger = get_logger(__name__)
 CORE_URL = os.getenv("CORE_URL", "http://core:8001")
 REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
 
-@with_redis_retry(max_retries=3, retry_delay=1.0, operation_name="enqueue_job")
-async def enqueue_job_with_retry(redis_client, function_name, *args, _queue_name=None, queue_display=None, **kwargs):
-    """Enqueue a job with retry logic"""
-    return await redis_client.enqueue_job(
-        function_name,
-        *args,
-        _queue_name=_queue_name,
-        **kwargs
-    )
-
 async def scan_asset(ctx: dict, scan_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
     """
     Main scan orchestration task
@@ -54,45 +52,11 @@ async def scan_asset(ctx: dict, scan_id: str, payload: Dict[str, Any]) -> Dict[s
     logger.info(f"[SCAN_TASK] Starting scan {scan_id} for target={target} scanner={scanner}")
     
     try:
-        # Route to appropriate scanner service
-        if scanner == "nmap":
-            # Send task to nmap scanner service with retry logic
-            await enqueue_job_with_retry(
-                ctx['redis'],
-                'run_nmap_scan', 
-                scan_id, target, options,
-                _queue_name='scanner-nmap',
-                queue_display="scanner-nmap"
-            )
-            logger.info(f"[SCAN_TASK] Delegated nmap scan {scan_id} to scanner service")
-            
-        elif scanner == "masscan":
-            # Send task to masscan scanner service with retry logic
-            await enqueue_job_with_retry(
-                ctx['redis'],
-                'run_masscan_scan', 
-                scan_id, target, options,
-                _queue_name='scanner-masscan',
-                queue_display="scanner-masscan"
-            )
-            logger.info(f"[SCAN_TASK] Delegated masscan scan {scan_id} to scanner service")
-            
-        elif scanner == "nuclei":
-            # Send task to nuclei scanner service with retry logic
-            await enqueue_job_with_retry(
-                ctx['redis'],
-                'run_nuclei_scan', 
-                scan_id, target, options,
-                _queue_name='scanner-nuclei',
-                queue_display="scanner-nuclei"
-            )
-            logger.info(f"[SCAN_TASK] Delegated nuclei scan {scan_id} to scanner service")
-            
-        else:
-            raise ValueError(f"Unknown scanner: {scanner}")
+        # Route to appropriate scanner service (shared routing table, retried enqueue)
+        job_ids = await dispatch_scan(ctx['redis'], scan_id, target, scanner, options, payload.get("priority"))
         
         # Don't report completion here - scanner will report back directly to core service
-        logger.info(f"[SCAN_TASK] Scan {scan_id} delegated successfully")
+        logger.info(f"[SCAN_TASK] Scan {scan_id} delegated successfully to {scanner} ({len(job_ids)} jobs)")
         return {"status": "delegated", "scan_id": scan_id}
         
     except Exception as e:
@@ -107,17 +71,31 @@ async def process_scan_result(ctx: dict, scan_id: str, status: str, **kwargs) ->
     """
     logger.info(f"[PROCESS] Received scan result for {scan_id} with status {status}")
     
+    if status == "completed":
+        # Job run time of the scanner queue - drives the API's backlog estimates (admission control)
+        await record_job_duration(ctx.get('redis'), kwargs.get("scanner"), (kwargs.get("results") or {}).get("scan_duration"))
+    
+    batcher = ctx.get('result_batcher')
+    if batcher is not None and status in ("completed", "failed") and kwargs.get("shard") is None:
+        # Completions and failures are written together with other pending results
+        return await process_batched_result(ctx, batcher, scan_id, status, **kwargs)
+    
     # Create database session
     db = None
     
     try:
         # Import here to avoid circular imports
         from ...services.scan_service import ScanService
-        from ...database import SessionLocal
+        from ...services.scan_cache import ScanStatusCache
+        from ...database import AsyncSessionLocal
         
-        # Create database session
-        db = SessionLocal()
-        scan_service = ScanService(db)
+        # Create async database session
+        db = AsyncSessionLocal()
+        scan_service = ScanService(db, cache=ScanStatusCache(ctx.get('redis')))
+        
+        if kwargs.get("shard") is not None:
+            # Result of one shard of a sharded masscan scan
+            return await process_shard_result(ctx, scan_service, scan_id, status, **kwargs)
         
         if status == "completed":
             results = kwargs.get("results", {})
@@ -127,6 +105,7 @@ async def process_scan_result(ctx: dict, scan_id: str, status: str, **kwargs) ->
             success = await scan_service.complete_scan(scan_id, results)
             
             if success:
+                await publish_scan_event(ctx.get('redis'), scan_id, "completed", progress=100)
                 logger.info(f"[PROCESS] Scan completion processed: {scan_id} (scanner: {scanner})")
                 return {
                     "status": "success", 
@@ -141,6 +120,32 @@ async def process_scan_result(ctx: dict, scan_id: str, status: str, **kwargs) ->
                     "message": "Scan not found"
                 }
             
+        elif status == "partial":
+            results = kwargs.get("results", {})
+            scanner = kwargs.get("scanner", "unknown")
+            
+            # Batch of findings from a scan that is still running (streaming scanners)
+            success = await scan_service.add_partial_results(scan_id, results)
+            
+            if success:
+                await publish_scan_event(
+                    ctx.get('redis'), scan_id, "findings",
+                    finding_count=len(results.get("vulnerabilities") or [])
+                )
+                logger.info(f"[PROCESS] Partial scan results processed: {scan_id} (scanner: {scanner})")
+                return {
+                    "status": "success",
+                    "scan_id": scan_id,
+                    "message": "Partial scan results processed successfully"
+                }
+            else:
+                logger.error(f"[PROCESS] Failed to process partial scan results: Scan not found")
+                return {
+                    "status": "error",
+                    "scan_id": scan_id,
+                    "message": "Scan not found"
+                }
+            
         elif status == "failed":
             error = kwargs.get("error", "Unknown error")
             scanner = kwargs.get("scanner", "unknown")
@@ -149,6 +154,7 @@ async def process_scan_result(ctx: dict, scan_id: str, status: str, **kwargs) ->
             success = await scan_service.fail_scan(scan_id, error)
             
             if success:
+                await publish_scan_event(ctx.get('redis'), scan_id, "failed", error=error)
                 logger.info(f"[PROCESS] Scan failure processed: {scan_id} (scanner: {scanner})")
                 return {
                     "status": "failed", 
@@ -168,13 +174,43 @@ async def process_scan_result(ctx: dict, scan_id: str, status: str, **kwargs) ->
             logger.error(f"[PROCESS] {error_msg}")
             return {"status": "error", "message": error_msg}
             
+    except Retry:
+        raise  # merged shard results could not be stored - ARQ runs the job again
     except Exception as e:
         logger.error(f"[PROCESS] Failed to process scan result: {e}")
         return {"status": "error", "message": f"Failed to process scan result: {str(e)}"}
     finally:
         # Close database session if it was created
         if db:
-            db.close()
+            await db.close()
+
+async def process_batched_result(ctx: dict, batcher: ResultBatcher, scan_id: str, status: str, **kwargs) -> Dict[str, Any]:
+    """Persist a scan completion or failure through the worker's result batcher"""
+    scanner = kwargs.get("scanner", "unknown")
+    item = {"scan_id": scan_id, "status": status}
+    if status == "completed":
+        item["results"] = kwargs.get("results", {})
+    else:
+        item["error"] = kwargs.get("error", "Unknown error")
+    
+    try:
+        success = await batcher.submit(item)
+    except Exception as e:
+        logger.error(f"[PROCESS] Failed to process scan result: {e}")
+        return {"status": "error", "message": f"Failed to process scan result: {str(e)}"}
+    
+    if not success:
+        logger.error(f"[PROCESS] Failed to process scan {'completion' if status == 'completed' else 'failure'}: Scan not found")
+        return {"status": "error", "scan_id": scan_id, "message": "Scan not found"}
+    
+    if status == "completed":
+        await publish_scan_event(ctx.get('redis'), scan_id, "completed", progress=100)
+        logger.info(f"[PROCESS] Scan completion processed: {scan_id} (scanner: {scanner})")
+        return {"status": "success", "scan_id": scan_id, "message": "Scan results processed successfully"}
+    
+    await publish_scan_event(ctx.get('redis'), scan_id, "failed", error=item["error"])
+    logger.info(f"[PROCESS] Scan failure processed: {scan_id} (scanner: {scanner})")
+    return {"status": "failed", "scan_id": scan_id, "message": f"Scan failure processed: {item['error']}"}
 
 async def report_scan_error(ctx: dict, scan_id: str, error_message: str):
     """
@@ -214,11 +250,35 @@ async def update_scan_status(scan_id: str, status: str):
         logger.error(f"[UPDATE] Failed to update scan status: {e}")
 
 
+async def startup(ctx: dict):
+    """Create the result batcher of this worker"""
+    from ...services.scan_cache import ScanStatusCache
+    
+    if settings.result_batch_max_items > 1:
+        ctx['result_batcher'] = ResultBatcher(
+            settings.result_batch_max_items,
+            settings.result_batch_max_wait_ms,
+            cache=ScanStatusCache(ctx.get('redis'))
+        )
+
+async def shutdown(ctx: dict):
+    """Write results still waiting in the batcher"""
+    batcher = ctx.pop('result_batcher', None)
+    if batcher is not None:
+        await batcher.close()
+
+
 # Define ARQ worker settings
 class WorkerSettings:
     """ARQ Worker configuration"""
     redis_settings = redis_settings
-    functions = [scan_asset, process_scan_result]
+    functions = [scan_asset, process_scan_result, func(recompute_risk_scores, timeout=settings.risk_recompute_timeout)]
     queue_name = 'core'
+    on_startup = startup
+    on_shutdown = shutdown
+    # Batches only fill up when many process_scan_result jobs run concurrently
+    max_jobs = settings.core_worker_max_jobs
+    job_serializer = JOB_SERIALIZER  # msgpack + zstd, shared with the scanner workers
+    job_deserializer = JOB_DESERIALIZER
     job_timeout = 300  # 5 minutes timeout for jobs
     job_timeout = 300  # 5 minutes timeout for jobs
@@ -0,0 +1,178 @@
+"""
+Benchmark: ARQ job payload size and encode/decode time per serializer
+
+Serializes the process_scan_result job a scanner enqueues (via arq's serialize_job)
+with ARQ's default pickle serializer and with the msgpack + zstd job serializer, for
+nmap, masscan and nuclei result documents.
+
+By default the result documents are generated in the shape the scanner parsers
+produce (including nuclei's raw "details" per finding). Real results can be used
+instead by passing JSON files, e.g. the "results" field of GET /api/v1/scan/{id}:
+
+Usage:
+    python -m benchmarks.bench_job_serializer [--findings 2000] [--ports 5000] [--runs 20]
+    python -m benchmarks.bench_job_serializer --results nmap.json nuclei.json
+"""
+
+import argparse
+import json
+import pickle
+import random
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from arq.jobs import deserialize_job, serialize_job
+
+from app.tasks.config.serialization import job_deserializer, job_serializer
+
+
+def build_nmap_results(hosts: int) -> Dict[str, Any]:
+    """nmap result with service/version info for a handful of ports per host"""
+    ports = [21, 22, 25, 53, 80, 110, 143, 443, 3306, 5432, 8080, 8443]
+    return {
+        "scanner": "nmap",
+        "target": "10.20.0.0/22",
+        "scan_id": "bench-nmap",
+        "scan_duration": 812.4,
+        "timestamp": time.time(),
+        "open_ports": [random.choice(ports) for _ in range(hosts * 4)],
+        "services": {
+            str(port): {"name": "http", "product": "nginx", "version": "1.25.3", "protocol": "tcp"}
+            for port in ports
+        },
+        "os_info": {"name": "Linux 5.0 - 5.14", "accuracy": "96"},
+        "vulnerabilities": []
+    }
+
+
+def build_masscan_results(port_count: int) -> Dict[str, Any]:
+    """masscan result for a /22 sweep - open ports, services and per-host ports"""
+    hosts = {
+        f"10.30.{i // 256}.{i % 256}": sorted(random.sample(range(1, 65536), 5))
+        for i in range(max(1, port_count // 5))
+    }
+    open_ports = sorted({port for ports in hosts.values() for port in ports})
+    return {
+        "scanner": "masscan",
+        "target": "10.30.0.0/22",
+        "scan_id": "bench-masscan",
+        "scan_duration": 95.1,
+        "timestamp": time.time(),
+        "open_ports": open_ports,
+        "services": {str(port): {"name": "unknown", "protocol": "tcp", "state": "open"} for port in open_ports},
+        "hosts": hosts
+    }
+
+
+WORDS = ["<div>", "</div>", "class=", "href=", "login", "token", "api", "version", "<script>", "</script>",
+         "var", "function", "return", "null", "true", "false", "session", "user", "admin", "config"]
+
+
+def body(words: int) -> str:
+    """Pseudo-random HTML-ish response body - compresses like real pages, not like a repeated byte"""
+    return " ".join(random.choice(WORDS) + str(random.randint(0, 99999)) for _ in range(words))
+
+
+def build_nuclei_results(findings: int) -> Dict[str, Any]:
+    """nuclei result - every finding carries the raw nuclei JSON (request/response) in "details" """
+    vulnerabilities = []
+    for i in range(findings):
+        severity = random.choice(["critical", "high", "medium", "low", "info"])
+        raw = {
+            "template-id": f"CVE-2023-{1000 + i}",
+            "template-path": f"/root/nuclei-templates/http/cves/2023/CVE-2023-{1000 + i}.yaml",
+            "info": {
+                "name": f"Example Product {i} - Remote Code Execution",
+                "author": ["researcher"],
+                "tags": ["cve", "cve2023", "rce", "kev"],
+                "description": "A crafted request allows unauthenticated remote code execution. " * 3,
+                "reference": [f"https://nvd.nist.gov/vuln/detail/CVE-2023-{1000 + i}"],
+                "severity": severity,
+                "classification": {"cvss-score": 9.8, "cwe-id": ["cwe-78"]}
+            },
+            "type": "http",
+            "host": "https://app.example.com",
+            "matched-at": f"https://app.example.com/api/v1/item/{i}",
+            "ip": "203.0.113.10",
+            "timestamp": "2026-10-17T10:15:00.000000Z",
+            "request": f"GET /api/v1/item/{i} HTTP/1.1\r\nHost: app.example.com\r\nUser-Agent: Mozilla/5.0\r\n\r\n",
+            "response": "HTTP/1.1 200 OK\r\nContent-Type: text/html\r\n\r\n<html><body>" + body(300) + "</body></html>",
+            "curl-command": f"curl -X 'GET' 'https://app.example.com/api/v1/item/{i}'",
+            "matcher-status": True
+        }
+        vulnerabilities.append({
+            "id": raw["template-id"],
+            "name": raw["info"]["name"],
+            "severity": severity,
+            "description": raw["info"]["description"],
+            "url": raw["matched-at"],
+            "details": raw,
+            "timestamp": time.time()
+        })
+    return {
+        "scanner": "nuclei",
+        "target": "https://app.example.com",
+        "scan_id": "bench-nuclei",
+        "scan_duration": 433.0,
+        "timestamp": time.time(),
+        "vulnerabilities": vulnerabilities,
+        "stats": {"hosts_found": 1, "total_findings": findings}
+    }
+
+
+def measure(results: Dict[str, Any], serializer: Callable, deserializer: Callable, runs: int) -> Tuple[int, float, float]:
+    """Return (payload bytes, encode ms, decode ms) for the process_scan_result job"""
+    kwargs = {"scan_id": results.get("scan_id"), "status": "completed", "results": results, "scanner": results.get("scanner")}
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        payload = serialize_job("process_scan_result", (), kwargs, None, int(time.time() * 1000), serializer=serializer)
+    encode_ms = (time.perf_counter() - start) * 1000 / runs
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        deserialize_job(payload, deserializer=deserializer)
+    decode_ms = (time.perf_counter() - start) * 1000 / runs
+
+    return len(payload), encode_ms, decode_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hosts", type=int, default=256, help="nmap hosts with open ports")
+    parser.add_argument("--ports", type=int, default=5000, help="masscan open host/port pairs")
+    parser.add_argument("--findings", type=int, default=2000, help="nuclei findings")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--results", nargs="*", help="JSON files with real scan result documents")
+    args = parser.parse_args()
+
+    random.seed(42)
+    if args.results:
+        documents: List[Tuple[str, Dict[str, Any]]] = []
+        for path in args.results:
+            with open(path) as f:
+                document = json.load(f)
+            documents.append((f"{document.get('scanner', '?')} ({path})", document))
+    else:
+        documents = [
+            (f"nmap ({args.hosts} hosts)", build_nmap_results(args.hosts)),
+            (f"masscan ({args.ports} ports)", build_masscan_results(args.ports)),
+            (f"nuclei ({args.findings} findings)", build_nuclei_results(args.findings)),
+        ]
+
+    serializers = [
+        ("pickle", pickle.dumps, pickle.loads),
+        ("msgpack+zstd", job_serializer, job_deserializer),
+    ]
+
+    print(f"{'result':<32} {'serializer':<14} {'bytes':>12} {'ratio':>7} {'encode ms':>10} {'decode ms':>10}")
+    for name, document in documents:
+        baseline = None
+        for serializer_name, serializer, deserializer in serializers:
+            size, encode_ms, decode_ms = measure(document, serializer, deserializer, args.runs)
+            baseline = baseline or size
+            print(f"{name:<32} {serializer_name:<14} {size:>12,} {baseline / size:>6.1f}x {encode_ms:>10.2f} {decode_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Benchmark: whole-portfolio risk recomputation (assets per second)
+
+Compares rescoring every asset with the per-asset loop (aggregate query,
+RiskService.calculate_aggregate_risk and one upsert per asset, as at scan completion)
+with PortfolioRiskEngine (columnar load, NumPy group-by scoring, bulk upserts),
+end to end and for the scoring step alone. Both paths must write identical scores.
+
+Usage:
+    python -m benchmarks.bench_risk_recompute [--assets 20000] [--findings 12]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime
+from typing import Dict, List, Tuple
+from uuid import uuid4
+
+from sqlalchemy import delete, insert, select
+
+from app.database import AsyncSessionLocal, create_tables
+from app.models import AssetRiskAggregate, RiskScore
+from app.services.risk_engine import PortfolioRiskEngine, FindingColumns, aggregate_rows
+from app.services.risk_service import RiskService
+from app.services.scan_service import ScanService
+
+PORTS = [21, 22, 23, 25, 53, 80, 110, 443, 445, 3306, 3389, 5432, 6379, 8080, 8443, 9200, 27017]
+SERVICES = ["http", "https", "ssh", "OpenSSH", "mysql", "redis", "ftp", "smtp", "ms-wbt-server"]
+SEVERITIES = ["critical", "high", "medium", "low", "info", "unknown"]
+SCANNERS = ["nmap", "masscan", "nuclei"]
+TARGET_PREFIX = "bench-risk-"
+
+
+def random_slice(rng: random.Random, findings_count: int) -> Dict:
+    findings = []
+    for _ in range(findings_count):
+        finding_type = rng.choice(["open_port", "open_port", "service", "vulnerability"])
+        findings.append({"finding_type": finding_type, "port": rng.choice(PORTS),
+                         "service": rng.choice(SERVICES), "severity": rng.choice(SEVERITIES)})
+    return {**RiskService.aggregate_slice(findings), "scan_id": str(uuid4())}
+
+
+async def seed(asset_count: int, findings_per_asset: int) -> int:
+    """A risk aggregate per asset with slices of 1-3 scanners, returns the finding count"""
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    finding_count = 0
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(AssetRiskAggregate).where(AssetRiskAggregate.target.like(f"{TARGET_PREFIX}%")))
+        await db.execute(delete(RiskScore).where(RiskScore.target.like(f"{TARGET_PREFIX}%")))
+
+        aggregates = []
+        for i in range(asset_count):
+            scanners = {}
+            for scanner in rng.sample(SCANNERS, rng.randint(1, len(SCANNERS))):
+                findings_count = rng.randint(0, 2 * findings_per_asset)
+                finding_count += findings_count
+                scanners[scanner] = random_slice(rng, findings_count)
+            aggregates.append({"id": str(uuid4()), "target": f"{TARGET_PREFIX}{i}", "scanners": scanners, "updated_at": now})
+
+        for start in range(0, len(aggregates), 5000):
+            await db.execute(insert(AssetRiskAggregate), aggregates[start:start + 5000])
+        await db.commit()
+    return finding_count
+
+
+async def per_asset_loop() -> None:
+    """Rescore asset by asset with the completion path's calculation and upsert"""
+    async with AsyncSessionLocal() as db:
+        service = ScanService(db)
+        targets = (await db.execute(select(AssetRiskAggregate.target))).scalars().all()
+        for target in targets:
+            scanners = (await db.execute(
+                select(AssetRiskAggregate.scanners).where(AssetRiskAggregate.target == target)
+            )).scalar_one()
+            await service._calculate_and_save_risk_score(target, scanners)
+        await db.commit()
+
+
+async def stored_scores() -> Dict[str, Tuple[int, dict]]:
+    async with AsyncSessionLocal() as db:
+        rows = await db.execute(
+            select(RiskScore.target, RiskScore.score, RiskScore.factors)
+            .where(RiskScore.target.like(f"{TARGET_PREFIX}%"))
+        )
+        return {target: (score, factors) for target, score, factors in rows}
+
+
+def loop_scores(aggregates: List[Tuple[str, Dict]]) -> List[Dict]:
+    """Scoring step of the per-asset loop on already loaded aggregates"""
+    return [RiskService.calculate_aggregate_risk(scanners) for _, scanners in aggregates]
+
+
+async def main(asset_count: int, findings_per_asset: int) -> None:
+    create_tables()
+    finding_count = await seed(asset_count, findings_per_asset)
+    print(f"seeded {asset_count:,} assets, {finding_count:,} findings")
+
+    start = time.perf_counter()
+    await per_asset_loop()
+    loop_seconds = time.perf_counter() - start
+    loop_result = await stored_scores()
+
+    start = time.perf_counter()
+    summary = await PortfolioRiskEngine().recompute()
+    engine_seconds = time.perf_counter() - start
+    engine_result = await stored_scores()
+
+    print(f"per-asset loop : {loop_seconds:8.3f}s  {asset_count / loop_seconds:12,.0f} assets/s")
+    print(f"risk engine    : {engine_seconds:8.3f}s  {asset_count / engine_seconds:12,.0f} assets/s  {summary}")
+    print(f"speedup: {loop_seconds / engine_seconds:.1f}x")
+
+    async with AsyncSessionLocal() as db:
+        aggregates = (await db.execute(select(AssetRiskAggregate.target, AssetRiskAggregate.scanners))).all()
+    start = time.perf_counter()
+    expected = loop_scores(aggregates)
+    loop_compute = time.perf_counter() - start
+    start = time.perf_counter()
+    columns = FindingColumns()
+    columns.append([row for target, scanners in aggregates for row in aggregate_rows(target, scanners)])
+    columns_built = time.perf_counter()
+    PortfolioRiskEngine.score(columns)
+    engine_compute = time.perf_counter() - columns_built
+    print(f"scoring only   : loop {loop_compute:.3f}s, columns {columns_built - start:.3f}s + numpy {engine_compute:.3f}s")
+
+    mismatches = [target for target, stored in loop_result.items() if engine_result.get(target) != stored]
+    assert len(loop_result) >= asset_count and not mismatches, f"{len(mismatches)} scores differ, e.g. {mismatches[:3]}"
+    assert all(
+        (risk["score"], risk["factors"]) == engine_result[target]
+        for (target, _), risk in zip(aggregates, expected) if target.startswith(TARGET_PREFIX)
+    )
+    print("scores identical")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--assets", type=int, default=20000, help="Assets (targets with a risk aggregate)")
+    parser.add_argument("--findings", type=int, default=12, help="Average findings per asset and scanner")
+    args = parser.parse_args()
+    asyncio.run(main(args.assets, args.findings))
@@ -0,0 +1,132 @@
+"""
+Benchmark: scan completion ingestion (rows per second)
+
+Compares the legacy completion path (scan commit, one ORM object per finding,
+separate commits for findings, asset and risk score) with the current
+single-transaction bulk path in ScanService.complete_scan.
+
+Usage:
+    python -m benchmarks.bench_scan_ingestion [--ports 5000] [--runs 3]
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict
+from uuid import uuid4
+
+from sqlalchemy import select
+
+from app.database import AsyncSessionLocal, create_tables
+from app.models import Scan, Asset, Finding, RiskScore
+from app.services.risk_service import RiskService
+from app.services.scan_service import ScanService
+
+
+def build_masscan_results(scan_id: str, target: str, port_count: int) -> Dict[str, Any]:
+    """Build a masscan-shaped result with ``port_count`` open ports"""
+    ports = list(range(1, port_count + 1))
+    return {
+        "scanner": "masscan",
+        "target": target,
+        "scan_id": scan_id,
+        "scan_duration": 12.5,
+        "timestamp": time.time(),
+        "open_ports": ports,
+        "services": {str(port): {"name": "unknown", "protocol": "tcp", "state": "open"} for port in ports}
+    }
+
+
+async def create_queued_scan(target: str) -> str:
+    """Insert a queued scan row and return its id"""
+    scan_id = str(uuid4())
+    async with AsyncSessionLocal() as db:
+        db.add(Scan(id=scan_id, target=target, scanner="masscan", status="queued",
+                    created_at=datetime.utcnow(), options={}))
+        await db.commit()
+    return scan_id
+
+
+async def legacy_complete_scan(scan_id: str, results: Dict[str, Any]) -> None:
+    """Completion path as it was before bulk ingestion (4 transactions, N ORM objects)"""
+    async with AsyncSessionLocal() as db:
+        scan = await db.get(Scan, scan_id)
+        scan.status = "completed"
+        scan.completed_at = datetime.utcnow()
+        scan.results = results
+        await db.commit()
+
+        target = results["target"]
+        scan_findings = []
+        for port in results["open_ports"]:
+            service_name = results["services"][str(port)]["name"]
+            db.add(Finding(
+                id=str(uuid4()), scan_id=scan_id, target=target, finding_type="open_port",
+                severity="medium", title=f"Open port {port}",
+                description=f"Port {port} is open and running {service_name}",
+                port=port, service=service_name, created_at=datetime.utcnow(),
+                finding_metadata={"scanner": results.get("scanner")}
+            ))
+            scan_findings.append({"finding_type": "open_port", "severity": "medium",
+                                  "port": port, "service": service_name})
+        await db.commit()
+
+        asset = (await db.execute(select(Asset).where(Asset.target == target).limit(1))).scalars().first()
+        if asset:
+            asset.updated_at = datetime.utcnow()
+            asset.asset_metadata = {**(asset.asset_metadata or {}), "last_scan_id": scan_id}
+        else:
+            db.add(Asset(id=str(uuid4()), target=target, asset_type="ip", status="active",
+                         created_at=datetime.utcnow(), asset_metadata={"first_scan_id": scan_id}))
+        await db.commit()
+
+        risk_data = RiskService.calculate_asset_risk(scan_findings)
+        risk_score = (await db.execute(select(RiskScore).where(RiskScore.target == target).limit(1))).scalars().first()
+        if risk_score:
+            risk_score.score = risk_data["score"]
+            risk_score.factors = risk_data["factors"]
+            risk_score.calculated_at = datetime.utcnow()
+        else:
+            db.add(RiskScore(id=str(uuid4()), target=target, score=risk_data["score"],
+                             factors=risk_data["factors"], calculated_at=datetime.utcnow(),
+                             expires_at=datetime.utcnow() + timedelta(days=30)))
+        await db.commit()
+
+
+async def bulk_complete_scan(scan_id: str, results: Dict[str, Any]) -> None:
+    """Current single-transaction bulk completion path"""
+    async with AsyncSessionLocal() as db:
+        await ScanService(db).complete_scan(scan_id, results)
+
+
+async def run_path(name: str, complete, port_count: int, runs: int) -> float:
+    """Run one completion path ``runs`` times and return findings rows per second"""
+    elapsed = 0.0
+    for run in range(runs):
+        target = f"10.{run}.{port_count % 256}.{hash(name) % 250 + 1}"
+        scan_id = await create_queued_scan(target)
+        results = build_masscan_results(scan_id, target, port_count)
+
+        start = time.perf_counter()
+        await complete(scan_id, results)
+        elapsed += time.perf_counter() - start
+
+    rows_per_second = (port_count * runs) / elapsed
+    print(f"{name:<8} {port_count:>7} ports x {runs} runs: {elapsed:8.3f}s  {rows_per_second:12,.0f} rows/s")
+    return rows_per_second
+
+
+async def main(port_count: int, runs: int) -> None:
+    create_tables()
+    before = await run_path("legacy", legacy_complete_scan, port_count, runs)
+    after = await run_path("bulk", bulk_complete_scan, port_count, runs)
+    print(f"speedup: {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ports", type=int, default=5000, help="Open ports (findings) per scan")
+    parser.add_argument("--runs", type=int, default=3, help="Scans per path")
+    args = parser.parse_args()
+    asyncio.run(main(args.ports, args.runs))
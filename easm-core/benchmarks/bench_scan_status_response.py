@@ -0,0 +1,111 @@
+"""
+Benchmark: GET /scan/{scan_id} response serialization time and size
+
+Encodes the status of a completed nuclei scan (raw results with per-finding "details"
+plus the finding rows) the way the endpoint used to - ScanStatus validation, FastAPI's
+response_model validation/serialization and stdlib json via JSONResponse - and the way
+it does now - the service's dict straight into ORJSONResponse. Then compresses the body
+with the response compression middleware's gzip and brotli settings.
+
+No database is needed - the status document is built in memory.
+
+Usage:
+    python -m benchmarks.bench_scan_status_response [--findings 5000] [--runs 10]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import zlib
+from datetime import datetime
+from typing import Any, Callable, Dict
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.api.compression import brotli
+from app.core.settings import settings
+from app.schemas.scan import ScanStatus
+from app.services.scan_service import ScanService
+from benchmarks.bench_job_serializer import build_nuclei_results
+
+
+def build_scan_status(findings: int) -> Dict[str, Any]:
+    """Status document as ScanService.get_scan_status returns it for a completed nuclei scan"""
+    results = build_nuclei_results(findings)
+    rows = ScanService()._build_finding_rows(results["scan_id"], results)
+    return {
+        "scan_id": results["scan_id"],
+        "target": results["target"],
+        "scanner": "nuclei",
+        "status": "completed",
+        "created_at": datetime.utcnow().isoformat(),
+        "started_at": datetime.utcnow().isoformat(),
+        "completed_at": datetime.utcnow().isoformat(),
+        "error": None,
+        "progress": 100,
+        "options": {"templates": ["cves"]},
+        "results": results,
+        "findings": [
+            {key: row[key] for key in ("id", "finding_type", "severity", "title", "description", "port", "service", "finding_metadata")}
+            for row in rows
+        ],
+        "risk_score": {"score": 87, "level": "high", "factors": {"vulnerabilities": findings}, "calculated_at": datetime.utcnow().isoformat()}
+    }
+
+
+async def legacy_body(result: Dict[str, Any], field) -> bytes:
+    """ScanStatus(**result) returned through response_model=ScanStatus and JSONResponse"""
+    content = await serialize_response(field=field, response_content=ScanStatus(**result), exclude_unset=True)
+    return JSONResponse(content).body
+
+
+async def current_body(result: Dict[str, Any], field) -> bytes:
+    """The endpoint's fast path - the service dict filtered to ScanStatus fields into ORJSONResponse"""
+    return ORJSONResponse({name: result[name] for name in ScanStatus.model_fields if name in result}).body
+
+
+def timed(function: Callable, runs: int):
+    start = time.perf_counter()
+    for _ in range(runs):
+        value = function()
+    return value, (time.perf_counter() - start) * 1000 / runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--findings", type=int, default=5000, help="nuclei findings in the scan")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    random.seed(42)
+    result = build_scan_status(args.findings)
+    field = create_response_field(name="Response_get_scan_status", type_=ScanStatus, mode="serialization")
+    loop = asyncio.new_event_loop()
+
+    print(f"{'path':<28} {'bytes':>12} {'ms':>9}")
+    bodies = {}
+    for name, encode in [("response_model + json", legacy_body), ("dict + orjson", current_body)]:
+        body, ms = timed(lambda: loop.run_until_complete(encode(result, field)), args.runs)
+        bodies[name] = body
+        print(f"{name:<28} {len(body):>12,} {ms:>9.1f}")
+
+    body = bodies["dict + orjson"]
+    compressors = [(f"gzip level {settings.response_gzip_level}",
+                    lambda: zlib.compress(body, settings.response_gzip_level, wbits=31))]
+    if brotli is not None:
+        compressors.append((f"brotli quality {settings.response_brotli_quality}",
+                            lambda: brotli.compress(body, quality=settings.response_brotli_quality)))
+    else:
+        print("(Brotli not installed - brotli skipped)")
+
+    print(f"\n{'compression':<28} {'bytes':>12} {'ms':>9}")
+    for name, compress in compressors:
+        compressed, ms = timed(compress, args.runs)
+        print(f"{name:<28} {len(compressed):>12,} {ms:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
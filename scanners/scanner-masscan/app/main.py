@@ -1,13 +1,17 @@
-import subprocess
 import json
 import os
 import time
 import logging
 import httpx
 import asyncio
+import pickle
+from datetime import date, datetime
+from enum import Enum
+import msgpack
+import zstandard
 from arq import create_pool
 from arq.connections import RedisSettings
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -17,6 +21,16 @@ logger = logging.getLogger(__name__)
 REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
 CORE_URL = os.getenv("CORE_URL", "http://core:8001")
 
+# Współbieżność workera: ile skanów masscan jeden kontener uruchamia równolegle.
+# MASSCAN_MAX_JOBS ustawia wartość wprost, w przeciwnym razie liczba CPU * MASSCAN_JOBS_PER_CPU
+MASSCAN_JOBS_PER_CPU = float(os.getenv("MASSCAN_JOBS_PER_CPU", "0.5"))
+MAX_JOBS = int(os.getenv("MASSCAN_MAX_JOBS", "0")) or max(1, int((os.cpu_count() or 1) * MASSCAN_JOBS_PER_CPU))
+
+# Domyślny timeout skanu w sekundach (może być nadpisany przez options["timeout"])
+DEFAULT_SCAN_TIMEOUT = int(os.getenv("MASSCAN_SCAN_TIMEOUT", "120"))
+# Limit ARQ dla całego zadania - musi być większy niż najdłuższy oczekiwany timeout skanu
+JOB_TIMEOUT = int(os.getenv("MASSCAN_JOB_TIMEOUT", str(DEFAULT_SCAN_TIMEOUT + 60)))
+
 def parse_redis_url(url: str):
     """Parsuje URL Redis na komponenty wymagane przez ARQ RedisSettings"""
     if url.startswith("redis://"):
@@ -38,6 +52,113 @@ def parse_redis_url(url: str):
         database=db
     )
 
+# Kompaktowy serializer zadań ARQ (msgpack + zstd) - ta sama implementacja co w easm-core
+# (app/tasks/config/serialization.py), core i wszystkie skanery muszą go używać razem.
+# Dane bez nagłówka MAGIC są traktowane jako pickle (domyślny serializer ARQ).
+JOB_MAGIC = b"EJS1"  # wyjście pickle zawsze zaczyna się od b"\x80"
+JOB_FLAG_RAW = b"\x00"
+JOB_FLAG_ZSTD = b"\x01"
+JOB_COMPRESS_MIN_BYTES = int(os.getenv("JOB_SERIALIZER_COMPRESS_MIN_BYTES", "1024"))
+_zstd_compressor = zstandard.ZstdCompressor(level=int(os.getenv("JOB_SERIALIZER_ZSTD_LEVEL", "1")))
+_zstd_decompressor = zstandard.ZstdDecompressor()
+
+
+def _msgpack_default(obj: Any) -> Any:
+    """Konwersja typów, których msgpack nie obsługuje natywnie"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return str(obj)
+
+
+def job_serializer(obj: Any) -> bytes:
+    """Serializuje zadanie/wynik ARQ - msgpack, kompresja zstd powyżej progu"""
+    packed = msgpack.packb(obj, default=_msgpack_default, use_bin_type=True)
+    if len(packed) >= JOB_COMPRESS_MIN_BYTES:
+        return JOB_MAGIC + JOB_FLAG_ZSTD + _zstd_compressor.compress(packed)
+    return JOB_MAGIC + JOB_FLAG_RAW + packed
+
+
+def job_deserializer(data: bytes) -> Any:
+    """Deserializuje dane z job_serializer (lub z domyślnego serializera pickle)"""
+    if not data.startswith(JOB_MAGIC):
+        return pickle.loads(data)
+    flag, payload = data[len(JOB_MAGIC):len(JOB_MAGIC) + 1], data[len(JOB_MAGIC) + 1:]
+    if flag == JOB_FLAG_ZSTD:
+        payload = _zstd_decompressor.decompress(payload)
+    return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+
+
+# JOB_SERIALIZER=pickle przywraca domyślny serializer ARQ (deserializer czyta oba formaty)
+JOB_SERIALIZER = None if os.getenv("JOB_SERIALIZER", "msgpack").lower() == "pickle" else job_serializer
+
+
+# Zdarzenia postępu skanu (Redis pub/sub) - ten sam format co app/tasks/tasks/scan_events.py w easm-core,
+# API serwuje je klientom jako strumień SSE GET /api/v1/scan/{scan_id}/events
+SCAN_EVENTS_CHANNEL_PREFIX = "scan-events:"
+SCAN_EVENTS_LAST_PREFIX = "scan-events-last:"
+SCAN_EVENTS_LAST_TTL = int(os.getenv("SCAN_EVENTS_LAST_TTL", "86400"))
+
+
+async def publish_scan_event(ctx: Dict, scan_id: str, event: str, **data):
+    """Publikuje zdarzenie postępu skanu (started/progress) - błąd jest tylko logowany, nigdy nie przerywa skanu"""
+    redis = ctx.get('redis')
+    if redis is None:
+        return
+    message = json.dumps(
+        {"scan_id": scan_id, "event": event, "status": "running", "timestamp": time.time(), **data},
+        default=str
+    )
+    try:
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.set(SCAN_EVENTS_LAST_PREFIX + scan_id, message, ex=SCAN_EVENTS_LAST_TTL)
+            pipe.publish(SCAN_EVENTS_CHANNEL_PREFIX + scan_id, message)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed to publish scan event {event} for {scan_id}: {e}")
+
+
+async def kill_process(process: asyncio.subprocess.Process):
+    """
+    Zabija proces, jeśli jeszcze działa, i czeka na jego zakończenie.
+    Resztki wyjścia są doczytywane - przy pełnym buforze StreamReader wstrzymuje odczyt
+    potoku, a wait() czeka też na jego zamknięcie, więc bez tego nigdy by się nie skończył.
+    """
+    if process.returncode is None:
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass  # zakończył się w międzyczasie
+    for stream in (process.stdout, process.stderr):
+        if stream is not None:
+            while await stream.read(65536):
+                pass
+    await process.wait()
+
+
+async def run_command(args: List[str], timeout: float) -> Tuple[int, str, str]:
+    """
+    Uruchamia proces jako asyncio subprocess - nie blokuje pętli zdarzeń workera ARQ,
+    więc worker może w tym czasie obsługiwać inne zadania i heartbeat.
+    Po przekroczeniu timeoutu, anulowaniu zadania przez ARQ lub dowolnym innym błędzie
+    proces jest zabijany - w długo działającym workerze nie zostają osierocone procesy.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+    finally:
+        await kill_process(process)
+    
+    return process.returncode, stdout.decode(errors="replace"), stderr.decode(errors="replace")
+
+
 async def run_masscan_scan(ctx: Dict, scan_id: str, target: str, options: Dict[str, Any] = None):
     """
     Główna funkcja wykonująca skan masscan dla podanego celu.
@@ -48,6 +169,14 @@ async def run_masscan_scan(ctx: Dict, scan_id: str, target: str, options: Dict[s
     if options is None:
         options = {}
     
+    # Numer sharda, jeśli core podzielił skan na części (wyniki są scalane w core)
+    shard = options.get("shard")
+    
+    # Timeout skanu nie może przekroczyć limitu zadania ARQ - inaczej wynik nie zostałby zgłoszony
+    scan_timeout = min(int(options.get("timeout") or DEFAULT_SCAN_TIMEOUT), JOB_TIMEOUT - 30)
+    
+    await publish_scan_event(ctx, scan_id, "started", scanner="masscan", **({'shard': shard} if shard is not None else {}))
+    
     try:
         # Rozwiąż nazwę domeny na IP (masscan wymaga adresów IP)
         import socket
@@ -55,52 +184,51 @@ async def run_masscan_scan(ctx: Dict, scan_id: str, target: str, options: Dict[s
             # Sprawdź czy target nie jest już adresem IP
             if not any(c.isdigit() for c in target.replace('.', '')):
                 logger.info(f"[MASSCAN] Resolving domain name: {target}")
-                target_ip = socket.gethostbyname(target)
+                # Asynchroniczny resolver - gethostbyname blokowałby pętlę zdarzeń
+                addr_info = await asyncio.get_running_loop().getaddrinfo(
+                    target, None, family=socket.AF_INET, type=socket.SOCK_STREAM
+                )
+                target_ip = addr_info[0][4][0]
                 logger.info(f"[MASSCAN] Resolved {target} to {target_ip}")
                 target = target_ip
         except socket.gaierror as e:
             error_msg = f"Failed to resolve hostname {target}: {e}"
             logger.error(f"[MASSCAN] {error_msg}")
-            await report_scan_failure(scan_id, error_msg)
+            await report_scan_failure(ctx, scan_id, error_msg, shard)
             return
             
         # Zbuduj komendę masscan z parametrami
         masscan_args = build_masscan_command(target, options)
         logger.info(f"[MASSCAN] Running command: {' '.join(masscan_args)}")
         
-        # Wykonaj skan masscan jako subprocess
+        # Wykonaj skan masscan jako asynchroniczny subprocess
         start_time = time.time()
-        process = subprocess.run(
-            masscan_args,
-            capture_output=True,
-            text=True,
-            timeout=120  # Timeout 2 minuty (masscan jest szybszy niż nmap)
-        )
+        returncode, stdout, stderr = await run_command(masscan_args, timeout=scan_timeout)
         scan_duration = time.time() - start_time
         
-        if process.returncode == 0:
+        if returncode == 0:
             # Parsuj wyniki masscan do struktury danych
-            scan_results = parse_masscan_output(process.stdout, target, scan_id, scan_duration)
+            scan_results = parse_masscan_output(stdout, target, scan_id, scan_duration)
             
             logger.info(f"[MASSCAN] Scan completed successfully: {scan_id}")
             
             # Wyślij wyniki do serwisu core przez Redis
-            await report_scan_completion(ctx, scan_id, scan_results)
+            await report_scan_completion(ctx, scan_id, scan_results, shard)
             
         else:
-            error_msg = f"Masscan scan failed with return code {process.returncode}: {process.stderr}"
+            error_msg = f"Masscan scan failed with return code {returncode}: {stderr}"
             logger.error(f"[MASSCAN] {error_msg}")
-            await report_scan_failure(ctx, scan_id, error_msg)
+            await report_scan_failure(ctx, scan_id, error_msg, shard)
             
-    except subprocess.TimeoutExpired:
-        error_msg = "Masscan scan timed out after 2 minutes"
+    except asyncio.TimeoutError:
+        error_msg = f"Masscan scan timed out after {scan_timeout} seconds"
         logger.error(f"[MASSCAN] {error_msg}")
-        await report_scan_failure(ctx, scan_id, error_msg)
+        await report_scan_failure(ctx, scan_id, error_msg, shard)
         
     except Exception as e:
         error_msg = f"Unexpected error during masscan scan: {str(e)}"
         logger.error(f"[MASSCAN] {error_msg}")
-        await report_scan_failure(ctx, scan_id, error_msg)
+        await report_scan_failure(ctx, scan_id, error_msg, shard)
 
 
 def build_masscan_command(target: str, options: Dict[str, Any]) -> list:
@@ -160,7 +288,8 @@ def parse_masscan_output(json_output: str, target: str, scan_id: str, duration:
             "scan_duration": duration,
             "timestamp": time.time(),
             "open_ports": [],
-            "services": {}
+            "services": {},
+            "hosts": {}
         }
         
         for line in json_output.splitlines():
@@ -174,7 +303,11 @@ def parse_masscan_output(json_output: str, target: str, scan_id: str, duration:
                     port = finding["ports"][0]
                     if port["status"] == "open":
                         port_number = port["port"]
-                        results["open_ports"].append(port_number)
+                        if port_number not in results["services"]:
+                            results["open_ports"].append(port_number)
+                        # Porty per host - przy skanach zakresów CIDR open_ports to suma ze wszystkich hostów
+                        host = finding.get("ip", target)
+                        results["hosts"].setdefault(host, []).append(port_number)
                         
                         # Podstawowa identyfikacja usługi na podstawie portu
                         service_name = identify_service_by_port(port_number)
@@ -228,36 +361,42 @@ def identify_service_by_port(port: int) -> str:
     return common_ports.get(port, "unknown")
 
 
-async def report_scan_completion(ctx: Dict, scan_id: str, results: Dict[str, Any]):
-    """Wysyła wyniki ukończonego skanu do serwisu core przez kolejkę Redis"""
+async def report_scan_completion(ctx: Dict, scan_id: str, results: Dict[str, Any], shard: Optional[int] = None):
+    """Wysyła wyniki ukończonego skanu (lub sharda) do serwisu core przez kolejkę Redis"""
     try:
         # Wyślij wiadomość z wynikami skanu do kolejki core
-        redis_pool = ctx.get('redis') or await create_pool(parse_redis_url(REDIS_URL))
+        redis_pool = ctx.get('redis') or await create_pool(
+            parse_redis_url(REDIS_URL), job_serializer=JOB_SERIALIZER, job_deserializer=job_deserializer
+        )
         await redis_pool.enqueue_job(
             'process_scan_result',
             scan_id=scan_id,
             status='completed',
             results=results,
             scanner='masscan',
-            _queue_name='core'
+            _queue_name='core',
+            **({'shard': shard} if shard is not None else {})
         )
         logger.info(f"[MASSCAN] Scan completion message sent: {scan_id}")
     except Exception as e:
         logger.error(f"[MASSCAN] Failed to send completion message: {e}")
 
 
-async def report_scan_failure(ctx: Dict, scan_id: str, error: str):
-    """Wysyła informację o błędzie skanu do serwisu core przez kolejkę Redis"""
+async def report_scan_failure(ctx: Dict, scan_id: str, error: str, shard: Optional[int] = None):
+    """Wysyła informację o błędzie skanu (lub sharda) do serwisu core przez kolejkę Redis"""
     try:
         # Wyślij wiadomość o błędzie skanu do kolejki core
-        redis_pool = ctx.get('redis') or await create_pool(parse_redis_url(REDIS_URL))
+        redis_pool = ctx.get('redis') or await create_pool(
+            parse_redis_url(REDIS_URL), job_serializer=JOB_SERIALIZER, job_deserializer=job_deserializer
+        )
         await redis_pool.enqueue_job(
             'process_scan_result',
             scan_id=scan_id,
             status='failed',
             error=error,
             scanner='masscan',
-            _queue_name='core'
+            _queue_name='core',
+            **({'shard': shard} if shard is not None else {})
         )
         logger.info(f"[MASSCAN] Scan failure message sent: {scan_id}")
     except Exception as e:
@@ -268,7 +407,11 @@ class WorkerSettings:
     """Konfiguracja ARQ worker'a - definiuje funkcje, połączenie Redis i nazwę kolejki"""
     functions = [run_masscan_scan]
     redis_settings = parse_redis_url(REDIS_URL)
+    job_serializer = JOB_SERIALIZER  # msgpack + zstd, wspólny z easm-core
+    job_deserializer = job_deserializer
     queue_name = 'scanner-masscan'
+    max_jobs = MAX_JOBS  # równoległe procesy masscan w jednym kontenerze
+    job_timeout = JOB_TIMEOUT
 
 
 if __name__ == "__main__":
@@ -1,13 +1,17 @@
-import subprocess
 import json
 import os
 import time
 import logging
 import httpx
 import asyncio
+import pickle
+from datetime import date, datetime
+from enum import Enum
+import msgpack
+import zstandard
 from arq import create_pool
 from arq.connections import RedisSettings
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple, Union
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -17,6 +21,22 @@ logger = logging.getLogger(__name__)
 REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
 CORE_URL = os.getenv("CORE_URL", "http://core:8001")
 
+# Współbieżność workera: ile skanów nmap jeden kontener uruchamia równolegle.
+# NMAP_MAX_JOBS ustawia wartość wprost, w przeciwnym razie liczba CPU * NMAP_JOBS_PER_CPU
+NMAP_JOBS_PER_CPU = float(os.getenv("NMAP_JOBS_PER_CPU", "2"))
+MAX_JOBS = int(os.getenv("NMAP_MAX_JOBS", "0")) or max(1, int((os.cpu_count() or 1) * NMAP_JOBS_PER_CPU))
+
+# Faza głęboka skanu dwufazowego: ile procesów nmap jedno zadanie uruchamia równolegle
+# (łącznie z MAX_JOBS daje górną granicę procesów nmap w kontenerze) i ile maksymalnie
+# procesów tworzy - przy większej liczbie grup hosty są łączone w mniej partii
+NMAP_DEEP_CONCURRENCY = max(1, int(os.getenv("NMAP_DEEP_CONCURRENCY", "2")))
+NMAP_DEEP_MAX_PROCESSES = max(1, int(os.getenv("NMAP_DEEP_MAX_PROCESSES", "16")))
+
+# Domyślny timeout skanu w sekundach (może być nadpisany przez options["timeout"])
+DEFAULT_SCAN_TIMEOUT = int(os.getenv("NMAP_SCAN_TIMEOUT", "300"))
+# Limit ARQ dla całego zadania - musi być większy niż najdłuższy oczekiwany timeout skanu
+JOB_TIMEOUT = int(os.getenv("NMAP_JOB_TIMEOUT", str(DEFAULT_SCAN_TIMEOUT + 60)))
+
 # Parse Redis URL
 def parse_redis_url(url: str):
     """Parsuje URL Redis na komponenty wymagane przez ARQ RedisSettings"""
@@ -39,6 +59,113 @@ def parse_redis_url(url: str):
         database=db
     )
 
+# Kompaktowy serializer zadań ARQ (msgpack + zstd) - ta sama implementacja co w easm-core
+# (app/tasks/config/serialization.py), core i wszystkie skanery muszą go używać razem.
+# Dane bez nagłówka MAGIC są traktowane jako pickle (domyślny serializer ARQ).
+JOB_MAGIC = b"EJS1"  # wyjście pickle zawsze zaczyna się od b"\x80"
+JOB_FLAG_RAW = b"\x00"
+JOB_FLAG_ZSTD = b"\x01"
+JOB_COMPRESS_MIN_BYTES = int(os.getenv("JOB_SERIALIZER_COMPRESS_MIN_BYTES", "1024"))
+_zstd_compressor = zstandard.ZstdCompressor(level=int(os.getenv("JOB_SERIALIZER_ZSTD_LEVEL", "1")))
+_zstd_decompressor = zstandard.ZstdDecompressor()
+
+
+def _msgpack_default(obj: Any) -> Any:
+    """Konwersja typów, których msgpack nie obsługuje natywnie"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return str(obj)
+
+
+def job_serializer(obj: Any) -> bytes:
+    """Serializuje zadanie/wynik ARQ - msgpack, kompresja zstd powyżej progu"""
+    packed = msgpack.packb(obj, default=_msgpack_default, use_bin_type=True)
+    if len(packed) >= JOB_COMPRESS_MIN_BYTES:
+        return JOB_MAGIC + JOB_FLAG_ZSTD + _zstd_compressor.compress(packed)
+    return JOB_MAGIC + JOB_FLAG_RAW + packed
+
+
+def job_deserializer(data: bytes) -> Any:
+    """Deserializuje dane z job_serializer (lub z domyślnego serializera pickle)"""
+    if not data.startswith(JOB_MAGIC):
+        return pickle.loads(data)
+    flag, payload = data[len(JOB_MAGIC):len(JOB_MAGIC) + 1], data[len(JOB_MAGIC) + 1:]
+    if flag == JOB_FLAG_ZSTD:
+        payload = _zstd_decompressor.decompress(payload)
+    return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+
+
+# JOB_SERIALIZER=pickle przywraca domyślny serializer ARQ (deserializer czyta oba formaty)
+JOB_SERIALIZER = None if os.getenv("JOB_SERIALIZER", "msgpack").lower() == "pickle" else job_serializer
+
+
+# Zdarzenia postępu skanu (Redis pub/sub) - ten sam format co app/tasks/tasks/scan_events.py w easm-core,
+# API serwuje je klientom jako strumień SSE GET /api/v1/scan/{scan_id}/events
+SCAN_EVENTS_CHANNEL_PREFIX = "scan-events:"
+SCAN_EVENTS_LAST_PREFIX = "scan-events-last:"
+SCAN_EVENTS_LAST_TTL = int(os.getenv("SCAN_EVENTS_LAST_TTL", "86400"))
+
+
+async def publish_scan_event(ctx: Dict, scan_id: str, event: str, **data):
+    """Publikuje zdarzenie postępu skanu (started/progress) - błąd jest tylko logowany, nigdy nie przerywa skanu"""
+    redis = ctx.get('redis')
+    if redis is None:
+        return
+    message = json.dumps(
+        {"scan_id": scan_id, "event": event, "status": "running", "timestamp": time.time(), **data},
+        default=str
+    )
+    try:
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.set(SCAN_EVENTS_LAST_PREFIX + scan_id, message, ex=SCAN_EVENTS_LAST_TTL)
+            pipe.publish(SCAN_EVENTS_CHANNEL_PREFIX + scan_id, message)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed to publish scan event {event} for {scan_id}: {e}")
+
+
+async def kill_process(process: asyncio.subprocess.Process):
+    """
+    Zabija proces, jeśli jeszcze działa, i czeka na jego zakończenie.
+    Resztki wyjścia są doczytywane - przy pełnym buforze StreamReader wstrzymuje odczyt
+    potoku, a wait() czeka też na jego zamknięcie, więc bez tego nigdy by się nie skończył.
+    """
+    if process.returncode is None:
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass  # zakończył się w międzyczasie
+    for stream in (process.stdout, process.stderr):
+        if stream is not None:
+            while await stream.read(65536):
+                pass
+    await process.wait()
+
+
+async def run_command(args: List[str], timeout: float) -> Tuple[int, str, str]:
+    """
+    Uruchamia proces jako asyncio subprocess - nie blokuje pętli zdarzeń workera ARQ,
+    więc worker może w tym czasie obsługiwać inne zadania i heartbeat.
+    Po przekroczeniu timeoutu, anulowaniu zadania przez ARQ lub dowolnym innym błędzie
+    proces jest zabijany - w długo działającym workerze nie zostają osierocone procesy.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+    finally:
+        await kill_process(process)
+    
+    return process.returncode, stdout.decode(errors="replace"), stderr.decode(errors="replace")
+
+
 async def run_nmap_scan(ctx: Dict, scan_id: str, target: str, options: Dict[str, Any] = None):
     """
     Główna funkcja wykonująca zaawansowany skan nmap z detekcją OS i usług.
@@ -49,24 +176,29 @@ async def run_nmap_scan(ctx: Dict, scan_id: str, target: str, options: Dict[str,
     if options is None:
         options = {}
     
+    # Timeout skanu nie może przekroczyć limitu zadania ARQ - inaczej wynik nie zostałby zgłoszony
+    scan_timeout = min(int(options.get("timeout") or DEFAULT_SCAN_TIMEOUT), JOB_TIMEOUT - 30)
+    
+    await publish_scan_event(ctx, scan_id, "started", scanner="nmap", profile=options.get("profile") or "default")
+    
     try:
+        if options.get("profile") == "two_phase":
+            # Najpierw szybkie wykrycie otwartych portów, potem -sV/-sC/-O tylko na nich
+            await run_two_phase_scan(ctx, scan_id, target, options, scan_timeout)
+            return
+        
         # Zbuduj komendę nmap z parametrami skanowania
         nmap_args = build_nmap_command(target, options)
         logger.info(f"[NMAP] Running command: {' '.join(nmap_args)}")
         
-        # Wykonaj skan nmap (subprocess bo nmap nie wspiera async)
+        # Wykonaj skan nmap jako asynchroniczny subprocess (nmap nie wspiera async)
         start_time = time.time()
-        process = subprocess.run(
-            nmap_args,
-            capture_output=True,
-            text=True,
-            timeout=300  # Timeout 5 minut (nmap jest wolniejszy)
-        )
+        returncode, stdout, stderr = await run_command(nmap_args, timeout=scan_timeout)
         scan_duration = time.time() - start_time
         
-        if process.returncode == 0:
+        if returncode == 0:
             # Parsuj wyjście XML z nmap do struktury danych
-            scan_results = parse_nmap_output(process.stdout, target, scan_id, scan_duration)
+            scan_results = parse_nmap_output(stdout, target, scan_id, scan_duration)
             
             logger.info(f"[NMAP] Scan completed successfully: {scan_id}")
             
@@ -74,12 +206,12 @@ async def run_nmap_scan(ctx: Dict, scan_id: str, target: str, options: Dict[str,
             await report_scan_completion(ctx, scan_id, scan_results)
             
         else:
-            error_msg = f"Nmap scan failed with return code {process.returncode}: {process.stderr}"
+            error_msg = f"Nmap scan failed with return code {returncode}: {stderr}"
             logger.error(f"[NMAP] {error_msg}")
             await report_scan_failure(ctx, scan_id, error_msg)
             
-    except subprocess.TimeoutExpired:
-        error_msg = "Nmap scan timed out after 5 minutes"
+    except asyncio.TimeoutError:
+        error_msg = f"Nmap scan timed out after {scan_timeout} seconds"
         logger.error(f"[NMAP] {error_msg}")
         await report_scan_failure(ctx, scan_id, error_msg)
         
@@ -89,6 +221,190 @@ async def run_nmap_scan(ctx: Dict, scan_id: str, target: str, options: Dict[str,
         await report_scan_failure(ctx, scan_id, error_msg)
 
 
+async def run_two_phase_scan(ctx: Dict, scan_id: str, target: str, options: Dict[str, Any], scan_timeout: float):
+    """
+    Skan dwufazowy:
+    1. szybki skan SYN (bez detekcji usług, OS i skryptów NSE) wykrywa otwarte porty,
+    2. głęboki skan -sV -sC -O uruchamiany tylko na hostach i portach otwartych w fazie 1.
+    Hosty z tym samym zestawem otwartych portów są skanowane jednym procesem nmap; przy
+    więcej niż NMAP_DEEP_MAX_PROCESSES grupach podobne grupy są łączone w partie, a
+    równolegle działa najwyżej NMAP_DEEP_CONCURRENCY procesów.
+    Na rzadko obsadzonych celach prawie cały czas skanu przypadał wcześniej na fazę 2
+    wykonywaną na wszystkich portach - teraz dotyczy ona tylko kilku portów.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + scan_timeout
+    start_time = time.time()
+    
+    # Faza 1 - wykrywanie
+    discovery_args = build_nmap_discovery_command(target, options)
+    logger.info(f"[NMAP] Discovery phase: {' '.join(discovery_args)}")
+    returncode, discovery_xml, stderr = await run_command(discovery_args, timeout=scan_timeout)
+    discovery_duration = time.time() - start_time
+    
+    if returncode != 0:
+        error_msg = f"Nmap discovery phase failed with return code {returncode}: {stderr}"
+        logger.error(f"[NMAP] {error_msg}")
+        await report_scan_failure(ctx, scan_id, error_msg)
+        return
+    
+    open_ports = collect_open_ports(discovery_xml)
+    
+    # Grupuj hosty po identycznym zestawie portów - jeden proces nmap na grupę
+    groups: Dict[Tuple[int, ...], List[str]] = {}
+    for host, ports in open_ports.items():
+        groups.setdefault(tuple(sorted(ports)), []).append(host)
+    
+    logger.info(
+        f"[NMAP] Discovery finished in {discovery_duration:.2f}s: "
+        f"{len(open_ports)} hosts with open ports, {len(groups)} deep scan groups"
+    )
+    
+    await publish_scan_event(
+        ctx, scan_id, "progress",
+        progress=50, phase="deep", hosts_with_open_ports=len(open_ports), deep_scan_groups=len(groups)
+    )
+    
+    # Faza 2 - głęboki skan tylko otwartych portów
+    deep_xml: List[str] = []
+    batches = plan_deep_scan_batches(groups, NMAP_DEEP_MAX_PROCESSES)
+    if batches:
+        if deadline - loop.time() <= 0:
+            raise asyncio.TimeoutError()
+        
+        semaphore = asyncio.Semaphore(NMAP_DEEP_CONCURRENCY)
+        
+        async def run_batch(hosts: List[str], ports: List[int]) -> Tuple[int, str, str]:
+            async with semaphore:
+                # Czas oczekiwania na semafor liczy się do wspólnego limitu skanu
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                return await run_command(build_nmap_deep_command(hosts, ports, options), timeout=remaining)
+        
+        # return_exceptions - błąd jednej partii nie porzuca wyników pozostałych
+        deep_results = await asyncio.gather(
+            *[run_batch(hosts, ports) for hosts, ports in batches], return_exceptions=True
+        )
+        for result in deep_results:
+            if isinstance(result, BaseException):
+                if isinstance(result, asyncio.CancelledError):
+                    raise result
+                # Wynik fazy 1 dla tych hostów i tak trafia do rezultatu
+                logger.warning(f"[NMAP] Deep scan batch failed: {type(result).__name__}: {result}")
+                continue
+            returncode, xml_output, stderr = result
+            if returncode == 0:
+                deep_xml.append(xml_output)
+            else:
+                logger.warning(f"[NMAP] Deep scan batch failed with return code {returncode}: {stderr}")
+    
+    scan_duration = time.time() - start_time
+    
+    # Obie fazy w jednym wyniku - faza 2 nadpisuje informacje o usługach z fazy 1
+    scan_results = parse_nmap_output([discovery_xml] + deep_xml, target, scan_id, scan_duration)
+    scan_results["profile"] = "two_phase"
+    scan_results["phases"] = {
+        "discovery_duration": discovery_duration,
+        "deep_duration": scan_duration - discovery_duration,
+        "hosts_with_open_ports": len(open_ports),
+        "deep_scan_groups": len(groups),
+        "deep_scan_batches": len(batches),
+        "deep_scan_batches_failed": len(batches) - len(deep_xml)
+    }
+    
+    logger.info(f"[NMAP] Two-phase scan completed successfully: {scan_id}")
+    await report_scan_completion(ctx, scan_id, scan_results)
+
+
+def plan_deep_scan_batches(groups: Dict[Tuple[int, ...], List[str]], max_batches: int) -> List[Tuple[List[str], List[int]]]:
+    """
+    Dzieli grupy (zestaw portów -> hosty) na partie (hosty, porty) fazy głębokiej.
+    Do max_batches grup każda jest osobną partią. Powyżej tego grupy posortowane po
+    zestawie portów (podobne zestawy obok siebie) są łączone w max_batches partii
+    o zbliżonej liczbie hostów - partia skanuje sumę portów swoich grup.
+    """
+    if len(groups) <= max_batches:
+        return [(hosts, list(ports)) for ports, hosts in groups.items()]
+    
+    ordered = sorted(groups.items())
+    total_hosts = sum(len(hosts) for _, hosts in ordered)
+    batches: List[Tuple[List[str], List[int]]] = []
+    hosts_batch: List[str] = []
+    ports_batch: set = set()
+    for index, (ports, hosts) in enumerate(ordered):
+        hosts_batch.extend(hosts)
+        ports_batch.update(ports)
+        groups_left = len(ordered) - index - 1
+        batches_left = max_batches - len(batches) - 1
+        # Zamknij partię po osiągnięciu jej udziału w hostach albo gdy każda kolejna grupa musi mieć własną
+        if groups_left <= batches_left or len(hosts_batch) * max_batches >= total_hosts:
+            if batches_left > 0 or groups_left == 0:
+                batches.append((hosts_batch, sorted(ports_batch)))
+                hosts_batch, ports_batch = [], set()
+    if hosts_batch:
+        batches.append((hosts_batch, sorted(ports_batch)))
+    return batches
+
+
+def build_nmap_discovery_command(target: str, options: Dict[str, Any]) -> list:
+    """Buduje komendę fazy wykrywania - sam skan SYN, bez -sV/-sC/-O"""
+    cmd = [
+        "nmap",
+        "-sS",  # TCP SYN scan (stealth)
+        "-n",   # Bez rozwiązywania nazw DNS
+        "--open",  # Pokazuj tylko otwarte porty
+        "-oX", "-",  # Wyjście XML na stdout
+        "-p", options.get("ports") or "1-10000",
+        "-T", str(options.get("timing") or 4)
+    ]
+    
+    cmd.append(target)
+    
+    return cmd
+
+
+def build_nmap_deep_command(hosts: List[str], ports: List[int], options: Dict[str, Any]) -> list:
+    """Buduje komendę fazy głębokiej - detekcja usług, OS i skrypty NSE tylko na wskazanych portach"""
+    cmd = [
+        "nmap",
+        "-sS",  # TCP SYN scan (stealth)
+        "-O",   # Detekcja systemu operacyjnego
+        "-sV",  # Detekcja wersji usług
+        "-sC",  # Domyślne skrypty NSE
+        "-Pn",  # Hosty są już potwierdzone w fazie 1
+        "--open",  # Pokazuj tylko otwarte porty
+        "-oX", "-",  # Wyjście XML na stdout
+        "-p", ",".join(str(port) for port in ports),
+        "-T", str(options.get("timing") or 4)
+    ]
+    
+    if options.get("aggressive", False):
+        cmd.append("-A")  # Agresywne skanowanie (wszystko naraz)
+    
+    cmd.extend(hosts)
+    
+    return cmd
+
+
+def collect_open_ports(xml_output: str) -> Dict[str, List[int]]:
+    """Zwraca otwarte porty per adres hosta z wyjścia XML nmap"""
+    import xml.etree.ElementTree as ET
+    root = ET.fromstring(xml_output)
+    
+    open_ports: Dict[str, List[int]] = {}
+    for host in root.findall("host"):
+        address = host.find("address")
+        if address is None:
+            continue
+        for port in host.findall("ports/port"):
+            state = port.find("state")
+            if state is not None and state.get("state") == "open" and port.get("protocol") == "tcp":
+                open_ports.setdefault(address.get("addr"), []).append(int(port.get("portid")))
+    
+    return open_ports
+
+
 def build_nmap_command(target: str, options: Dict[str, Any]) -> list:
     """Buduje zaawansowaną komendę nmap z flagami do detekcji OS i usług"""
     cmd = ["nmap"]
@@ -123,11 +439,16 @@ def build_nmap_command(target: str, options: Dict[str, Any]) -> list:
     return cmd
 
 
-def parse_nmap_output(xml_output: str, target: str, scan_id: str, duration: float) -> Dict[str, Any]:
-    """Parsuje wyjście XML z nmap i wyciąga szczegółowe informacje o portach, usługach i OS"""
+def parse_nmap_output(xml_output: Union[str, List[str]], target: str, scan_id: str, duration: float) -> Dict[str, Any]:
+    """
+    Parsuje wyjście XML z nmap i wyciąga szczegółowe informacje o portach, usługach i OS.
+    Przyjmuje też listę dokumentów XML (np. z kilku faz skanu) - kolejne dokumenty
+    uzupełniają i nadpisują informacje z poprzednich.
+    """
     try:
         import xml.etree.ElementTree as ET
-        root = ET.fromstring(xml_output)
+        documents = [xml_output] if isinstance(xml_output, str) else xml_output
+        seen_ports = set()
         
         results = {
             "scanner": "nmap",
@@ -141,8 +462,9 @@ def parse_nmap_output(xml_output: str, target: str, scan_id: str, duration: floa
             "vulnerabilities": []
         }
         
-        # Parsuj informacje o hoście
-        for host in root.findall("host"):
+        # Parsuj informacje o hoście (ze wszystkich dokumentów)
+        hosts = [host for document in documents for host in ET.fromstring(document).findall("host")]
+        for host in hosts:
             # Sprawdź status hosta
             status = host.find("status")
             if status is not None and status.get("state") == "up":
@@ -156,7 +478,12 @@ def parse_nmap_output(xml_output: str, target: str, scan_id: str, duration: floa
                         
                         state = port.find("state")
                         if state is not None and state.get("state") == "open":
-                            results["open_ports"].append(int(port_id))
+                            # Ten sam port hosta może wystąpić w kilku dokumentach
+                            address = host.find("address")
+                            host_port = (address.get("addr") if address is not None else None, port_id)
+                            if host_port not in seen_ports:
+                                seen_ports.add(host_port)
+                                results["open_ports"].append(int(port_id))
                             
                             # Pobierz informacje o usłudze
                             service = port.find("service")
@@ -200,7 +527,9 @@ async def report_scan_completion(ctx: Dict, scan_id: str, results: Dict[str, Any
     """Wysyła wyniki ukończonego skanu nmap do serwisu core przez kolejkę Redis"""
     try:
         # Wyślij wiadomość z wynikami skanu do kolejki core
-        redis_pool = ctx.get('redis') or await create_pool(parse_redis_url(REDIS_URL))
+        redis_pool = ctx.get('redis') or await create_pool(
+            parse_redis_url(REDIS_URL), job_serializer=JOB_SERIALIZER, job_deserializer=job_deserializer
+        )
         await redis_pool.enqueue_job(
             'process_scan_result',
             scan_id=scan_id,
@@ -218,7 +547,9 @@ async def report_scan_failure(ctx: Dict, scan_id: str, error: str):
     """Wysyła informację o błędzie skanu nmap do serwisu core przez kolejkę Redis"""
     try:
         # Wyślij wiadomość o błędzie skanu do kolejki core
-        redis_pool = ctx.get('redis') or await create_pool(parse_redis_url(REDIS_URL))
+        redis_pool = ctx.get('redis') or await create_pool(
+            parse_redis_url(REDIS_URL), job_serializer=JOB_SERIALIZER, job_deserializer=job_deserializer
+        )
         await redis_pool.enqueue_job(
             'process_scan_result',
             scan_id=scan_id,
@@ -236,7 +567,11 @@ class WorkerSettings:
     """Konfiguracja ARQ worker'a dla skannera nmap - definiuje funkcje i kolejkę"""
     functions = [run_nmap_scan]
     redis_settings = parse_redis_url(REDIS_URL)
+    job_serializer = JOB_SERIALIZER  # msgpack + zstd, wspólny z easm-core
+    job_deserializer = job_deserializer
     queue_name = 'scanner-nmap'
+    max_jobs = MAX_JOBS  # równoległe procesy nmap w jednym kontenerze
+    job_timeout = JOB_TIMEOUT
 
 
 if __name__ == "__main__":
@@ -1,13 +1,17 @@
-import subprocess
 import json
 import os
 import time
 import logging
 import httpx
 import asyncio
+import pickle
+from datetime import date, datetime
+from enum import Enum
+import msgpack
+import zstandard
 from arq import create_pool
 from arq.connections import RedisSettings
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -17,6 +21,22 @@ logger = logging.getLogger(__name__)
 REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
 CORE_URL = os.getenv("CORE_URL", "http://core:8001")
 
+# Współbieżność workera: ile skanów nuclei jeden kontener uruchamia równolegle.
+# NUCLEI_MAX_JOBS ustawia wartość wprost, w przeciwnym razie liczba CPU * NUCLEI_JOBS_PER_CPU
+NUCLEI_JOBS_PER_CPU = float(os.getenv("NUCLEI_JOBS_PER_CPU", "0.5"))
+MAX_JOBS = int(os.getenv("NUCLEI_MAX_JOBS", "0")) or max(1, int((os.cpu_count() or 1) * NUCLEI_JOBS_PER_CPU))
+
+# Domyślny timeout skanu w sekundach (może być nadpisany przez options["timeout"])
+DEFAULT_SCAN_TIMEOUT = int(os.getenv("NUCLEI_SCAN_TIMEOUT", "600"))
+# Tryb strumieniowy: wyniki wysyłane do core w partiach w trakcie skanu
+STREAM_BATCH_SIZE = int(os.getenv("NUCLEI_STREAM_BATCH_SIZE", "50"))
+STREAM_FLUSH_INTERVAL = float(os.getenv("NUCLEI_STREAM_FLUSH_INTERVAL", "5"))
+# Maksymalna długość pojedynczej linii JSONL (szczegóły findingu potrafią być duże)
+STREAM_LINE_LIMIT = int(os.getenv("NUCLEI_STREAM_LINE_LIMIT", str(16 * 1024 * 1024)))
+
+# Limit ARQ dla całego zadania - musi być większy niż najdłuższy oczekiwany timeout skanu
+JOB_TIMEOUT = int(os.getenv("NUCLEI_JOB_TIMEOUT", str(DEFAULT_SCAN_TIMEOUT + 60)))
+
 # Parse Redis URL
 def parse_redis_url(url: str):
     """Parsuje URL Redis na komponenty wymagane przez ARQ RedisSettings"""
@@ -39,6 +59,113 @@ def parse_redis_url(url: str):
         database=db
     )
 
+# Kompaktowy serializer zadań ARQ (msgpack + zstd) - ta sama implementacja co w easm-core
+# (app/tasks/config/serialization.py), core i wszystkie skanery muszą go używać razem.
+# Dane bez nagłówka MAGIC są traktowane jako pickle (domyślny serializer ARQ).
+JOB_MAGIC = b"EJS1"  # wyjście pickle zawsze zaczyna się od b"\x80"
+JOB_FLAG_RAW = b"\x00"
+JOB_FLAG_ZSTD = b"\x01"
+JOB_COMPRESS_MIN_BYTES = int(os.getenv("JOB_SERIALIZER_COMPRESS_MIN_BYTES", "1024"))
+_zstd_compressor = zstandard.ZstdCompressor(level=int(os.getenv("JOB_SERIALIZER_ZSTD_LEVEL", "1")))
+_zstd_decompressor = zstandard.ZstdDecompressor()
+
+
+def _msgpack_default(obj: Any) -> Any:
+    """Konwersja typów, których msgpack nie obsługuje natywnie"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return str(obj)
+
+
+def job_serializer(obj: Any) -> bytes:
+    """Serializuje zadanie/wynik ARQ - msgpack, kompresja zstd powyżej progu"""
+    packed = msgpack.packb(obj, default=_msgpack_default, use_bin_type=True)
+    if len(packed) >= JOB_COMPRESS_MIN_BYTES:
+        return JOB_MAGIC + JOB_FLAG_ZSTD + _zstd_compressor.compress(packed)
+    return JOB_MAGIC + JOB_FLAG_RAW + packed
+
+
+def job_deserializer(data: bytes) -> Any:
+    """Deserializuje dane z job_serializer (lub z domyślnego serializera pickle)"""
+    if not data.startswith(JOB_MAGIC):
+        return pickle.loads(data)
+    flag, payload = data[len(JOB_MAGIC):len(JOB_MAGIC) + 1], data[len(JOB_MAGIC) + 1:]
+    if flag == JOB_FLAG_ZSTD:
+        payload = _zstd_decompressor.decompress(payload)
+    return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+
+
+# JOB_SERIALIZER=pickle przywraca domyślny serializer ARQ (deserializer czyta oba formaty)
+JOB_SERIALIZER = None if os.getenv("JOB_SERIALIZER", "msgpack").lower() == "pickle" else job_serializer
+
+
+# Zdarzenia postępu skanu (Redis pub/sub) - ten sam format co app/tasks/tasks/scan_events.py w easm-core,
+# API serwuje je klientom jako strumień SSE GET /api/v1/scan/{scan_id}/events
+SCAN_EVENTS_CHANNEL_PREFIX = "scan-events:"
+SCAN_EVENTS_LAST_PREFIX = "scan-events-last:"
+SCAN_EVENTS_LAST_TTL = int(os.getenv("SCAN_EVENTS_LAST_TTL", "86400"))
+
+
+async def publish_scan_event(ctx: Dict, scan_id: str, event: str, **data):
+    """Publikuje zdarzenie postępu skanu (started/progress) - błąd jest tylko logowany, nigdy nie przerywa skanu"""
+    redis = ctx.get('redis')
+    if redis is None:
+        return
+    message = json.dumps(
+        {"scan_id": scan_id, "event": event, "status": "running", "timestamp": time.time(), **data},
+        default=str
+    )
+    try:
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.set(SCAN_EVENTS_LAST_PREFIX + scan_id, message, ex=SCAN_EVENTS_LAST_TTL)
+            pipe.publish(SCAN_EVENTS_CHANNEL_PREFIX + scan_id, message)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed to publish scan event {event} for {scan_id}: {e}")
+
+
+async def kill_process(process: asyncio.subprocess.Process):
+    """
+    Zabija proces, jeśli jeszcze działa, i czeka na jego zakończenie.
+    Resztki wyjścia są doczytywane - przy pełnym buforze StreamReader wstrzymuje odczyt
+    potoku, a wait() czeka też na jego zamknięcie, więc bez tego nigdy by się nie skończył.
+    """
+    if process.returncode is None:
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass  # zakończył się w międzyczasie
+    for stream in (process.stdout, process.stderr):
+        if stream is not None:
+            while await stream.read(65536):
+                pass
+    await process.wait()
+
+
+async def run_command(args: List[str], timeout: float) -> Tuple[int, str, str]:
+    """
+    Uruchamia proces jako asyncio subprocess - nie blokuje pętli zdarzeń workera ARQ,
+    więc worker może w tym czasie obsługiwać inne zadania i heartbeat.
+    Po przekroczeniu timeoutu, anulowaniu zadania przez ARQ lub dowolnym innym błędzie
+    proces jest zabijany - w długo działającym workerze nie zostają osierocone procesy.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+    finally:
+        await kill_process(process)
+    
+    return process.returncode, stdout.decode(errors="replace"), stderr.decode(errors="replace")
+
+
 async def run_nuclei_scan(ctx: Dict, scan_id: str, target: str, options: Dict[str, Any] = None):
     """
     Główna funkcja wykonująca skan podatności z nuclei.
@@ -49,45 +176,50 @@ async def run_nuclei_scan(ctx: Dict, scan_id: str, target: str, options: Dict[st
     if options is None:
         options = {}
     
+    # Timeout skanu nie może przekroczyć limitu zadania ARQ - inaczej wynik nie zostałby zgłoszony
+    scan_timeout = min(int(options.get("timeout") or DEFAULT_SCAN_TIMEOUT), JOB_TIMEOUT - 30)
+    
+    await publish_scan_event(ctx, scan_id, "started", scanner="nuclei", streaming=bool(options.get("streaming")))
+    
     try:
         # Zbuduj komendę nuclei z parametrami skanowania podatności
         nuclei_args = build_nuclei_command(target, options)
         logger.info(f"[NUCLEI] Running command: {' '.join(nuclei_args)}")
         
-        # Wykonaj skan nuclei
+        if options.get("streaming"):
+            # Tryb strumieniowy - parsowanie linia po linii i wysyłanie partii findingów
+            await run_nuclei_streaming(ctx, scan_id, target, nuclei_args, scan_timeout, options)
+            return
+        
+        # Wykonaj skan nuclei jako asynchroniczny subprocess
         start_time = time.time()
-        process = subprocess.run(
-            nuclei_args,
-            capture_output=True,
-            text=True,
-            timeout=int(options.get("timeout", 600))  # timeout w sekundach
-        )
+        returncode, stdout, stderr = await run_command(nuclei_args, timeout=scan_timeout)
         scan_duration = time.time() - start_time
-        logger.info(f"[NUCLEI] Scan finished in {scan_duration:.2f} seconds with return code {process.returncode}")
+        logger.info(f"[NUCLEI] Scan finished in {scan_duration:.2f} seconds with return code {returncode}")
         
-        if process.returncode == 0 or process.stdout:  # Sprawdź czy mamy wynik nawet przy błędzie
+        if returncode == 0 or stdout:  # Sprawdź czy mamy wynik nawet przy błędzie
             # Parsuj wyjście nuclei do struktury danych
-            logger.info(f"[NUCLEI] Got output of {len(process.stdout)} bytes")
-            if len(process.stdout) > 100:
-                logger.info(f"[NUCLEI] Sample output: {process.stdout[:100]}...")
+            logger.info(f"[NUCLEI] Got output of {len(stdout)} bytes")
+            if len(stdout) > 100:
+                logger.info(f"[NUCLEI] Sample output: {stdout[:100]}...")
             else:
-                logger.info(f"[NUCLEI] Complete output: {process.stdout}")
+                logger.info(f"[NUCLEI] Complete output: {stdout}")
                 
-            scan_results = parse_nuclei_output(process.stdout, target, scan_id, scan_duration)
+            scan_results = parse_nuclei_output(stdout, target, scan_id, scan_duration)
             logger.info(f"[NUCLEI] Scan completed successfully: {scan_id}")
             
             # Wyślij wyniki do serwisu core przez Redis
             await report_scan_completion(ctx, scan_id, scan_results)
         else:
-            error_msg = f"Nuclei scan failed with return code {process.returncode}: {process.stderr}"
+            error_msg = f"Nuclei scan failed with return code {returncode}: {stderr}"
             logger.error(f"[NUCLEI] {error_msg}")
             # Loguj więcej szczegółów o błędzie
-            logger.error(f"[NUCLEI] Stdout: {process.stdout}")
-            logger.error(f"[NUCLEI] Stderr: {process.stderr}")
+            logger.error(f"[NUCLEI] Stdout: {stdout}")
+            logger.error(f"[NUCLEI] Stderr: {stderr}")
             await report_scan_failure(ctx, scan_id, error_msg)
             
-    except subprocess.TimeoutExpired:
-        error_msg = "Nuclei scan timed out after specified timeout"
+    except asyncio.TimeoutError:
+        error_msg = f"Nuclei scan timed out after {scan_timeout} seconds"
         logger.error(f"[NUCLEI] {error_msg}")
         await report_scan_failure(ctx, scan_id, error_msg)
         
@@ -99,6 +231,142 @@ async def run_nuclei_scan(ctx: Dict, scan_id: str, target: str, options: Dict[st
         await report_scan_failure(ctx, scan_id, error_msg)
 
 
+async def run_nuclei_streaming(ctx: Dict, scan_id: str, target: str, nuclei_args: List[str],
+                               scan_timeout: float, options: Dict[str, Any]):
+    """
+    Wykonuje skan nuclei w trybie strumieniowym.
+    Wyjście JSONL jest parsowane linia po linii w trakcie działania procesu, a findingi
+    trafiają do core w partiach (po stream_batch_size findingów lub co stream_flush_interval
+    sekund). W pamięci trzymana jest tylko bieżąca partia i liczniki, więc zużycie pamięci
+    nie rośnie z rozmiarem wyniku. Ostatnia partia jest wysyłana razem z komunikatem o ukończeniu.
+    """
+    batch_size = max(1, int(options.get("stream_batch_size") or STREAM_BATCH_SIZE))
+    flush_interval = float(options.get("stream_flush_interval") or STREAM_FLUSH_INTERVAL)
+    
+    loop = asyncio.get_running_loop()
+    start_time = time.time()
+    deadline = loop.time() + scan_timeout
+    
+    process = await asyncio.create_subprocess_exec(
+        *nuclei_args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        limit=STREAM_LINE_LIMIT
+    )
+    # stderr czytany równolegle (żeby bufor potoku się nie zapełnił), trzymamy tylko końcówkę
+    stderr_tail = bytearray()
+    
+    async def drain_stderr():
+        while True:
+            chunk = await process.stderr.read(65536)
+            if not chunk:
+                break
+            stderr_tail.extend(chunk)
+            del stderr_tail[:-4096]
+    
+    stderr_task = asyncio.create_task(drain_stderr())
+    
+    batch: List[Dict[str, Any]] = []
+    severity_counts: Dict[str, int] = {}
+    total_findings = 0
+    processed_lines = 0
+    error_count = 0
+    batches_sent = 0
+    last_flush = loop.time()
+    next_attempt = 0.0  # po nieudanym wysłaniu partii kolejna próba najwcześniej po flush_interval
+    
+    try:
+        while True:
+            now = loop.time()
+            if now >= deadline:
+                raise asyncio.TimeoutError()
+            
+            # Czekaj na kolejną linię najdłużej do następnego flush-a lub końca timeoutu
+            wait = min(deadline, last_flush + flush_interval) - now
+            try:
+                line = await asyncio.wait_for(process.stdout.readline(), timeout=max(wait, 0.01))
+            except asyncio.TimeoutError:
+                line = None
+            
+            if line == b"":
+                break  # EOF - proces zamknął stdout
+            
+            if line:
+                text = line.decode(errors="replace").strip()
+                if text:
+                    processed_lines += 1
+                    try:
+                        vuln = parse_nuclei_finding(text, target)
+                        batch.append(vuln)
+                        total_findings += 1
+                        severity = str(vuln["severity"]).lower()
+                        severity_counts[severity] = severity_counts.get(severity, 0) + 1
+                    except Exception as e:
+                        error_count += 1
+                        logger.warning(f"[NUCLEI] Failed to parse JSON line {processed_lines}: {text[:100]}... - {e}")
+            
+            if batch and loop.time() >= next_attempt and (len(batch) >= batch_size or loop.time() - last_flush >= flush_interval):
+                try:
+                    await report_scan_progress(ctx, scan_id, {
+                        "scanner": "nuclei",
+                        "target": target,
+                        "scan_id": scan_id,
+                        "vulnerabilities": batch
+                    })
+                    batches_sent += 1
+                    batch = []
+                except Exception:
+                    # Partia nie przepada - zostaje w pamięci i trafi do core z kolejną partią
+                    # albo z komunikatem o ukończeniu
+                    next_attempt = loop.time() + flush_interval
+                    last_flush = loop.time()
+            if not batch:
+                last_flush = loop.time()
+        
+        returncode = await asyncio.wait_for(process.wait(), timeout=max(deadline - loop.time(), 0.01))
+        await stderr_task
+    finally:
+        # Każdy błąd (timeout, anulowanie, za długa linia - ValueError z readline, błąd potoku)
+        # kończy proces nuclei i odczyt stderr
+        stderr_task.cancel()
+        await asyncio.gather(stderr_task, return_exceptions=True)
+        await kill_process(process)
+    
+    scan_duration = time.time() - start_time
+    logger.info(
+        f"[NUCLEI] Streaming scan finished in {scan_duration:.2f} seconds with return code {returncode} "
+        f"({total_findings} findings, {batches_sent} batches sent during scan)"
+    )
+    
+    if returncode != 0 and processed_lines == 0:
+        error_msg = f"Nuclei scan failed with return code {returncode}: {stderr_tail.decode(errors='replace')}"
+        logger.error(f"[NUCLEI] {error_msg}")
+        await report_scan_failure(ctx, scan_id, error_msg)
+        return
+    
+    stats = {
+        "hosts_found": 1,
+        "total_findings": total_findings,
+        "processed_lines": processed_lines,
+        "error_count": error_count,
+        "risk_score": 0
+    }
+    if total_findings:
+        stats.update(calculate_risk_factors_from_counts(severity_counts))
+    
+    await report_scan_completion(ctx, scan_id, {
+        "scanner": "nuclei",
+        "target": target,
+        "scan_id": scan_id,
+        "scan_duration": scan_duration,
+        "timestamp": time.time(),
+        "streaming": True,
+        "batches_sent": batches_sent,  # core porównuje zapisane findingi z stats.total_findings
+        "vulnerabilities": batch,  # ostatnia, jeszcze niewysłana partia
+        "stats": stats
+    })
+
+
 def build_nuclei_command(target: str, options: Dict[str, Any]) -> list:
     """Buduje komendę nuclei z odpowiednimi flagami do skanowania podatności"""
     cmd = ["nuclei"]
@@ -228,16 +496,7 @@ def parse_nuclei_output(json_output: str, target: str, scan_id: str, duration: f
             finding_count += 1
             
             try:
-                finding = json.loads(line)
-                vuln = {
-                    "id": finding.get("template-id", "unknown"),
-                    "name": finding.get("info", {}).get("name", "Unknown Vulnerability"),
-                    "severity": finding.get("info", {}).get("severity", "unknown"),
-                    "description": finding.get("info", {}).get("description", "No description"),
-                    "url": finding.get("matched-at", target),
-                    "details": finding,
-                    "timestamp": time.time()
-                }
+                vuln = parse_nuclei_finding(line, target)
                 
                 results["vulnerabilities"].append(vuln)
                 logger.info(f"[NUCLEI] Found vulnerability: {vuln['name']} (severity: {vuln['severity']})")
@@ -285,31 +544,55 @@ def parse_nuclei_output(json_output: str, target: str, scan_id: str, duration: f
         }
 
 
+def parse_nuclei_finding(line: str, target: str) -> Dict[str, Any]:
+    """Parsuje pojedynczą linię JSONL z nuclei do słownika podatności (rzuca JSONDecodeError)"""
+    finding = json.loads(line)
+    return {
+        "id": finding.get("template-id", "unknown"),
+        "name": finding.get("info", {}).get("name", "Unknown Vulnerability"),
+        "severity": finding.get("info", {}).get("severity", "unknown"),
+        "description": finding.get("info", {}).get("description", "No description"),
+        "url": finding.get("matched-at", target),
+        "details": finding,
+        "timestamp": time.time()
+    }
+
+
+# Wagi ważności dla kalkulacji ryzyka
+SEVERITY_WEIGHTS = {
+    "critical": 10.0,
+    "high": 7.5,
+    "medium": 5.0,
+    "low": 2.5,
+    "info": 0.5,
+    "unknown": 1.0
+}
+
+
 def calculate_risk_factors(vulnerabilities: List[Dict[str, Any]]) -> Dict[str, float]:
     """Oblicza czynniki ryzyka na podstawie znalezionych podatności"""
-    # Wagi ważności dla kalkulacji ryzyka
-    severity_weights = {
-        "critical": 10.0,
-        "high": 7.5,
-        "medium": 5.0,
-        "low": 2.5,
-        "info": 0.5,
-        "unknown": 1.0
-    }
-    
     # Policz podatności według ważności
-    severity_counts = {k: 0 for k in severity_weights.keys()}
+    severity_counts: Dict[str, int] = {}
     
     for vuln in vulnerabilities:
         severity = vuln.get("severity", "unknown").lower()
         severity_counts[severity] = severity_counts.get(severity, 0) + 1
     
+    return calculate_risk_factors_from_counts(severity_counts)
+
+
+def calculate_risk_factors_from_counts(severity_counts: Dict[str, int]) -> Dict[str, float]:
+    """Oblicza czynniki ryzyka z liczników podatności według ważności (używane też w trybie strumieniowym)"""
+    counts = {k: 0 for k in SEVERITY_WEIGHTS.keys()}
+    for severity, count in severity_counts.items():
+        counts[severity] = counts.get(severity, 0) + count
+    
     # Oblicz wynik ryzyka (suma ważona)
-    risk_score = sum(severity_counts[sev] * severity_weights[sev] for sev in severity_counts)
+    risk_score = sum(count * SEVERITY_WEIGHTS.get(sev, SEVERITY_WEIGHTS["unknown"]) for sev, count in counts.items())
     
     return {
         "risk_score": risk_score,
-        "severity_counts": severity_counts
+        "severity_counts": counts
     }
 
 
@@ -317,7 +600,9 @@ async def report_scan_completion(ctx: Dict, scan_id: str, results: Dict[str, Any
     """Wysyła wyniki ukończonego skanu podatności do serwisu core przez kolejkę Redis"""
     try:
         # Wyślij wiadomość z wynikami skanu do kolejki core
-        redis_pool = ctx.get('redis') or await create_pool(parse_redis_url(REDIS_URL))
+        redis_pool = ctx.get('redis') or await create_pool(
+            parse_redis_url(REDIS_URL), job_serializer=JOB_SERIALIZER, job_deserializer=job_deserializer
+        )
         await redis_pool.enqueue_job(
             'process_scan_result',
             scan_id=scan_id,
@@ -331,11 +616,36 @@ async def report_scan_completion(ctx: Dict, scan_id: str, results: Dict[str, Any
         logger.error(f"[NUCLEI] Failed to send completion message: {e}")
 
 
+async def report_scan_progress(ctx: Dict, scan_id: str, results: Dict[str, Any]):
+    """
+    Wysyła partię findingów z trwającego skanu do serwisu core przez kolejkę Redis.
+    Błąd wysłania jest zgłaszany dalej - wywołujący zachowuje partię i ponawia próbę.
+    """
+    try:
+        redis_pool = ctx.get('redis') or await create_pool(
+            parse_redis_url(REDIS_URL), job_serializer=JOB_SERIALIZER, job_deserializer=job_deserializer
+        )
+        await redis_pool.enqueue_job(
+            'process_scan_result',
+            scan_id=scan_id,
+            status='partial',
+            results=results,
+            scanner='nuclei',
+            _queue_name='core'
+        )
+        logger.info(f"[NUCLEI] Partial results sent: {scan_id} ({len(results.get('vulnerabilities', []))} findings)")
+    except Exception as e:
+        logger.error(f"[NUCLEI] Failed to send partial results: {e}")
+        raise
+
+
 async def report_scan_failure(ctx: Dict, scan_id: str, error: str):
     """Wysyła informację o błędzie skanu podatności do serwisu core przez kolejkę Redis"""
     try:
         # Wyślij wiadomość o błędzie skanu do kolejki core
-        redis_pool = ctx.get('redis') or await create_pool(parse_redis_url(REDIS_URL))
+        redis_pool = ctx.get('redis') or await create_pool(
+            parse_redis_url(REDIS_URL), job_serializer=JOB_SERIALIZER, job_deserializer=job_deserializer
+        )
         await redis_pool.enqueue_job(
             'process_scan_result',
             scan_id=scan_id,
@@ -353,7 +663,11 @@ class WorkerSettings:
     """Konfiguracja ARQ worker'a dla skannera nuclei - obsługuje skanowanie podatności"""
     functions = [run_nuclei_scan]
     redis_settings = parse_redis_url(REDIS_URL)
+    job_serializer = JOB_SERIALIZER  # msgpack + zstd, wspólny z easm-core
+    job_deserializer = job_deserializer
     queue_name = 'scanner-nuclei'
+    max_jobs = MAX_JOBS  # równoległe procesy nuclei w jednym kontenerze
+    job_timeout = JOB_TIMEOUT
 
 
 if __name__ == "__main__":